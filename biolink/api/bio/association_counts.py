@@ -1,6 +1,12 @@
+from functools import partial
+
 from ontobio.golr.golr_associations import search_associations
+from ontobio.golr.golr_query import solr_quotify
 from ontobio.vocabulary.relations import HomologyTypes
 
+from biolink.executor import run_concurrently
+from biolink.settings import get_biolink_config
+
 HOMOLOG_TYPES = [
     HomologyTypes.Ortholog.value,
     HomologyTypes.LeastDivergedOrtholog.value,
@@ -168,98 +174,159 @@ CATEGORY_NAME_MAP = {
 
 EXCLUDE_LIST = ['ortholog-homolog']
 
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_MAX_IDS = 500
+DOMAINS = ['subject', 'object', 'ortholog']
+
+
+def get_batch_config():
+    return get_biolink_config().get('association_counts_batch') or {}
+
+
+def get_batch_max_ids():
+    """
+    Maximum number of ids per batch counts request, configured under
+    association_counts_batch.max_ids
+    """
+    return get_batch_config().get('max_ids', DEFAULT_MAX_IDS)
+
 
 def get_association_counts(bioentity_id, bioentity_type=None, distinct_counts=False):
     """
     For a given CURIE, get the number of associations by each category.
+
+    Subject, object and (for genes) ortholog counts are computed in a
+    single Solr request using the JSON Facet API, see count_facets
     """
-    count_map = {}
-    source_count = {}
-    # get counts where bioentity_id is the subject
+    results = search_associations(
+        rows=0,
+        facet_fields=[],
+        json_facet=count_facets(bioentity_id, bioentity_type, distinct_counts)
+    )
+    return parse_count_facets(results.get('facets', {}), bioentity_type, distinct_counts)
 
-    if distinct_counts:
-        subject_associations = search_associations(
-            fq={'subject_closure': bioentity_id},
-            facet_pivot_fields=['{!stats=piv1}association_type', 'object_taxon'],
-            stats=True,
-            rows=0,
-            facet_fields=['is_defined_by'],
-            facet_limit='100',
-            stats_field=['{!tag=piv1 calcdistinct=true distinctValues=false}object']
-        )
-    else:
-        subject_associations = search_associations(
-            fq={'subject_closure': bioentity_id},
-            facet_pivot_fields=['{!stats=piv1}association_type', 'object_taxon'],
-            stats=True,
-            rows=0,
-            facet_fields=['is_defined_by'],
-            facet_limit='100',
-            stats_field=['{!tag=piv1 countDistinct=false}object']
+
+def get_batch_association_counts(bioentity_ids, bioentity_type=None, distinct_counts=False, batch_size=None):
+    """
+    Association counts for many CURIEs of the same type
+
+    The count_facets domains of up to batch_size entities are combined
+    in the json.facet of one Solr request, the requests for the batches
+    running concurrently. Returns a map of each id to its count map, as
+    returned by get_association_counts
+    """
+    if batch_size is None:
+        batch_size = get_batch_config().get('batch_size', DEFAULT_BATCH_SIZE)
+    bioentity_ids = list(dict.fromkeys(id for id in bioentity_ids if id))
+    batches = [bioentity_ids[i:i + batch_size] for i in range(0, len(bioentity_ids), batch_size)]
+    count_maps = {}
+    for batch_counts in run_concurrently([
+        partial(_get_batch_counts, batch, bioentity_type, distinct_counts) for batch in batches
+    ]):
+        count_maps.update(batch_counts)
+    return count_maps
+
+
+def _get_batch_counts(bioentity_ids, bioentity_type=None, distinct_counts=False):
+    json_facet = {}
+    for i, bioentity_id in enumerate(bioentity_ids):
+        for domain, facet in count_facets(bioentity_id, bioentity_type, distinct_counts).items():
+            json_facet['{}_{}'.format(domain, i)] = facet
+    results = search_associations(
+        rows=0,
+        facet_fields=[],
+        json_facet=json_facet
+    )
+    facets = results.get('facets', {})
+    return {
+        bioentity_id: parse_count_facets(
+            {domain: facets.get('{}_{}'.format(domain, i), {}) for domain in DOMAINS},
+            bioentity_type, distinct_counts
         )
-    source_count = subject_associations['facet_counts']['is_defined_by']
-    subject_facet_pivot = subject_associations['facet_pivot']['association_type,object_taxon']
-    parse_facet_pivot(subject_facet_pivot, bioentity_type, count_map, distinct_counts=distinct_counts)
+        for i, bioentity_id in enumerate(bioentity_ids)
+    }
 
-    # get counts where bioentity_id is the object
+
+def count_facets(bioentity_id, bioentity_type=None, distinct_counts=False):
+    """
+    Build the json.facet request body for get_association_counts
+
+    Each domain is a query facet restricting the documents to those where
+    bioentity_id is in the subject, object or subject ortholog closure,
+    with association_type and taxon terms facets nested beneath it
+    """
+    facets = {
+        'subject': _domain_facet('subject_closure', bioentity_id, 'object', 100, distinct_counts, sources=True),
+        'object': _domain_facet('object_closure', bioentity_id, 'subject', 100, distinct_counts, sources=True)
+    }
+    if bioentity_type == 'gene':
+        facets['ortholog'] = _domain_facet('subject_ortholog_closure', bioentity_id, 'object', 25, distinct_counts)
+    return facets
+
+
+def _domain_facet(closure_field, bioentity_id, counted_field, limit, distinct_counts=False, sources=False):
+    stats = {}
     if distinct_counts:
-        object_associations = search_associations(
-            fq={'object_closure': bioentity_id},
-            facet_pivot_fields=['{!stats=piv1}association_type', 'subject_taxon'],
-            stats=True,
-            rows=0,
-            facet_fields=['is_defined_by'],
-            facet_limit='100',
-            stats_field=['{!tag=piv1 calcdistinct=true distinctValues=false}subject']
-        )
-    else:
-        object_associations = search_associations(
-            fq={'object_closure': bioentity_id},
-            facet_pivot_fields=['{!stats=piv1}association_type', 'subject_taxon'],
-            stats=True,
-            rows=0,
-            facet_fields=['is_defined_by'],
-            facet_limit='100',
-            stats_field=['{!tag=piv1 countDistinct=false}subject']
-        )
+        stats['distinct'] = 'unique({})'.format(counted_field)
 
-    for src, count in object_associations['facet_counts']['is_defined_by'].items():
-        if src in source_count:
-            source_count[src] += count
-        else:
-            source_count[src] = count
+    taxon_facet = {
+        'type': 'terms',
+        'field': '{}_taxon'.format(counted_field),
+        'limit': limit
+    }
+    if stats:
+        taxon_facet['facet'] = dict(stats)
+
+    domain = {
+        'type': 'query',
+        'q': '{}:{}'.format(closure_field, solr_quotify(bioentity_id)),
+        'facet': {
+            'association_type': {
+                'type': 'terms',
+                'field': 'association_type',
+                'limit': limit,
+                'facet': {**stats, 'taxon': taxon_facet}
+            }
+        }
+    }
+    if sources:
+        domain['facet']['sources'] = {
+            'type': 'terms',
+            'field': 'is_defined_by',
+            'limit': 100
+        }
+    return domain
 
-    object_facet_pivot = object_associations['facet_pivot']['association_type,subject_taxon']
-    parse_facet_pivot(
-        object_facet_pivot, bioentity_type, count_map,
+
+def parse_count_facets(facets, bioentity_type=None, distinct_counts=False):
+    """
+    Parse a json.facet response built from count_facets into a count map
+    """
+    count_map = {}
+    subject_facets = facets.get('subject', {})
+    object_facets = facets.get('object', {})
+
+    source_count = parse_term_buckets(_buckets(subject_facets, 'sources'))
+    source_count = merge_counts(source_count, parse_term_buckets(_buckets(object_facets, 'sources')))
+
+    parse_facet_buckets(
+        _buckets(subject_facets, 'association_type'), bioentity_type, count_map,
+        distinct_counts=distinct_counts
+    )
+    parse_facet_buckets(
+        _buckets(object_facets, 'association_type'), bioentity_type, count_map,
         distinct_counts=distinct_counts,
         exclude_cats=('gene_interaction',)
     )
 
     if bioentity_type == 'gene':
-        # get counts for ortholog-x associations
+        # counts for ortholog-x associations
         bioentity_type = type_prefix = 'ortholog'
         ortholog_count_map = {}
-        if distinct_counts:
-            ortholog_associations = search_associations(
-                fq={'subject_ortholog_closure': bioentity_id},
-                facet_pivot_fields=['{!stats=piv1}association_type', 'object_taxon'],
-                stats=True,
-                rows=0,
-                facet_fields=[],
-                stats_field=['{!tag=piv1 calcdistinct=true distinctValues=false}object']
-            )
-        else:
-            ortholog_associations = search_associations(
-                fq={'subject_ortholog_closure': bioentity_id},
-                facet_pivot_fields=['{!stats=piv1}association_type', 'object_taxon'],
-                stats=True,
-                rows=0,
-                facet_fields=[],
-                stats_field=['{!tag=piv1 countDistinct=false}object']
-            )
-        ortholog_facet_pivot = ortholog_associations['facet_pivot']['association_type,object_taxon']
-        parse_facet_pivot(ortholog_facet_pivot, bioentity_type, ortholog_count_map, type_prefix, distinct_counts=distinct_counts)
+        parse_facet_buckets(
+            _buckets(facets.get('ortholog', {}), 'association_type'), bioentity_type,
+            ortholog_count_map, type_prefix, distinct_counts=distinct_counts
+        )
         final_count_map = {**count_map, **ortholog_count_map}
     else:
         final_count_map = count_map
@@ -273,8 +340,8 @@ def get_association_counts(bioentity_id, bioentity_type=None, distinct_counts=Fa
     return final_count_map
 
 
-def parse_facet_pivot(
-        facet_pivot,
+def parse_facet_buckets(
+        buckets,
         bioentity_type,
         count_map,
         type_prefix=None,
@@ -285,9 +352,9 @@ def parse_facet_pivot(
     if count_map is None:
         count_map = {}
 
-    for category_pivot in facet_pivot:
+    for category_bucket in buckets:
 
-        type = category_pivot['value']
+        type = category_bucket['val']
         if type in exclude_cats:
             continue
 
@@ -304,16 +371,7 @@ def parse_facet_pivot(
             # ignore, to avoid double counting
             continue
 
-        category_stats = category_pivot['stats']['stats_fields']
-        key = None
-        if 'subject' in category_stats:
-            key = 'subject'
-        elif 'object' in category_stats:
-            key = 'object'
-        if distinct_counts:
-            category_counts = category_stats[key]['countDistinct']
-        else:
-            category_counts = category_pivot['count']
+        category_counts = _bucket_count(category_bucket, distinct_counts)
 
         if 'counts' in count_map[k]:
             count_map[k]['counts'] += category_counts
@@ -322,10 +380,9 @@ def parse_facet_pivot(
                 'counts': category_counts
             }
 
-        if 'pivot' in category_pivot:
-            # taxon pivot
-            taxon_pivot = category_pivot['pivot']
-            taxon_counts = parse_taxon_pivot(taxon_pivot, key, distinct_counts)
+        taxon_buckets = _buckets(category_bucket, 'taxon')
+        if taxon_buckets:
+            taxon_counts = parse_term_buckets(taxon_buckets, distinct_counts)
             if 'counts_by_taxon' in count_map[k]:
                 taxon_counts = merge_counts(count_map[k]['counts_by_taxon'], taxon_counts)
             count_map[k]['counts_by_taxon'] = taxon_counts
@@ -333,24 +390,26 @@ def parse_facet_pivot(
     return count_map
 
 
-def parse_taxon_pivot(taxon_pivot, key, distinct_counts=False):
+def parse_term_buckets(buckets, distinct_counts=False):
     counts_map = {}
-    for t in taxon_pivot:
-        taxon = t['value']
-        if distinct_counts:
-            counts = t['stats']['stats_fields'][key]['countDistinct']
-        else:
-            counts = t['count']
-        counts_map[taxon] = counts
+    for bucket in buckets:
+        counts_map[bucket['val']] = _bucket_count(bucket, distinct_counts)
     return counts_map
 
 
+def _buckets(facet, name):
+    return facet.get(name, {}).get('buckets', [])
+
+
+def _bucket_count(bucket, distinct_counts=False):
+    if distinct_counts:
+        return bucket.get('distinct', 0)
+    return bucket['count']
+
+
 def merge_counts(d1, d2):
     d = {}
-    d1_key_set = set(x for x in d1.keys())
-    d2_key_set = set(x for x in d2.keys())
-    all_keys = d1_key_set | d2_key_set
-    for k in all_keys:
+    for k in list(d1.keys()) + [k for k in d2.keys() if k not in d1]:
         count = 0
         if k in d1:
             count += d1[k]
@@ -0,0 +1,78 @@
+"""
+Lookup of many bioentities in one request
+
+Each id is looked up with SciGraph bioobject, as for /bioentity/<id>,
+the lookups running concurrently on the bounded pool of
+biolink.executor. An id that cannot be found, or whose lookup fails,
+is reported in the errors of the result rather than failing the batch.
+
+get_clique_leaders resolves many ids to their SciGraph clique leaders
+in the same way, e.g. for /bioentity/association_counts/batch.
+"""
+import logging
+from functools import partial
+
+from requests import HTTPError
+
+from biolink.executor import run_concurrently
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDS = 500
+
+
+def get_max_ids():
+    """
+    Maximum number of ids in a batch, configured under bioentity_batch.max_ids
+    """
+    batch_config = get_biolink_config().get('bioentity_batch') or {}
+    return batch_config.get('max_ids', DEFAULT_MAX_IDS)
+
+
+def unique_ids(ids):
+    """
+    ids without duplicates or empty values, in the order given
+    """
+    return list(dict.fromkeys(id for id in ids if id))
+
+
+def get_bioobjects(lookup, ids, type=None, max_workers=None):
+    """
+    Look up each of ids with lookup(id, type)
+
+    :return: (objects, errors) dicts keyed by id; errors values are
+             {'message', 'code'} dicts
+    """
+    ids = unique_ids(ids)
+    found = run_concurrently([partial(lookup_one, lookup, id, type) for id in ids], max_workers)
+
+    objects = {}
+    errors = {}
+    for id, (obj, error) in zip(ids, found):
+        if error is None:
+            objects[id] = obj
+        else:
+            errors[id] = error
+    return objects, errors
+
+
+def get_clique_leaders(lookup, ids, max_workers=None):
+    """
+    Map each of ids to the id of its clique leader, found with lookup(id)
+
+    Ids that cannot be resolved map to themselves
+    """
+    ids = unique_ids(ids)
+    found = run_concurrently([partial(lookup_one, lookup, id) for id in ids], max_workers)
+    return {id: leader if error is None else id for id, (leader, error) in zip(ids, found)}
+
+
+def lookup_one(lookup, id, type=None):
+    try:
+        return lookup(id, type), None
+    except HTTPError:
+        return None, {'message': 'No result found for {}'.format(id), 'code': 404}
+    except Exception as e:
+        log.warning("Could not look up {}: {}".format(id, e))
+        return None, {'message': 'Lookup of {} failed: {}'.format(id, e), 'code': 500}
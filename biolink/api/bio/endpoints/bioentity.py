@@ -1,19 +1,27 @@
 import logging
 
+from flask import request
 from flask_restplus import Resource, inputs, marshal
 from biolink.datamodel.serializers import named_object, bio_object,\
-    association_results, association, disease_object, d2p_association_results
+    association_results, association, disease_object, d2p_association_results,\
+    bioentity_batch_input, bioentity_batch_results, association_counts_batch_input
 from biolink.api.restplus import api
+from biolink.datamodel.compiled import marshal_with
+from biolink.datamodel.fieldsets import FIELDS_HELP, with_fieldset
+from biolink.pagination import CURSOR_HELP, with_cursor
 from ontobio.golr.golr_associations import search_associations, select_distinct_subjects
-from ontobio.util.scigraph_util import SciGraph
 from biowikidata.wd_sparql import condition_to_drug
 from ontobio.vocabulary.relations import HomologyTypes
 from ..closure_bins import create_closure_bin
-from ..association_counts import get_association_counts
+from ..association_counts import get_association_counts, get_batch_association_counts, get_batch_max_ids
+from ..bioentity_batch import get_bioobjects, get_clique_leaders, get_max_ids
 from biolink import USER_AGENT
 
-from biolink.settings import get_biolink_config, get_identifier_converter
-from biolink.error_handlers import UnrecognizedBioentityTypeException, NoResultFoundException
+from biolink.settings import get_identifier_converter
+from biolink.cache import cached
+from biolink.transport import get_scigraph
+from biolink.error_handlers import UnrecognizedBioentityTypeException, NoResultFoundException,\
+    BadRequestException
 
 from ontobio.golr.golr_query import run_solr_text_on, ESOLR, ESOLRDoc
 from ontobio.config import get_config
@@ -44,6 +52,8 @@ core_parser.add_argument('direct', type=inputs.boolean, default=False,
                          help='Set true to only include direct associations, and '
                               'false to include inferred (via subclass or '
                               'subclass|part of), default=False')
+core_parser.add_argument('fields', help=FIELDS_HELP)
+core_parser.add_argument('cursor', help=CURSOR_HELP)
 
 
 INVOLVED_IN = 'involved_in'
@@ -94,12 +104,37 @@ gene_disease_parser.add_argument(
     'association_type', type=str, choices=('causal', 'non_causal', 'both'),
     default='both', help='Additional filters: causal, non_causal, both')
 
-scigraph = SciGraph(get_biolink_config()['scigraph_data']['url'])
+scigraph = get_scigraph('scigraph_data')
 
 homol_rel = HomologyTypes.Homolog.value
 
 identifier_converter = get_identifier_converter()
 
+# association lookups are cached per route and arguments, see biolink.cache
+search_associations = cached('bioentity')(with_fieldset(with_cursor(search_associations)))
+select_distinct_subjects = cached('bioentity')(select_distinct_subjects)
+run_solr_text_on = cached('bioentity')(run_solr_text_on)
+get_association_counts = cached('association_counts')(get_association_counts)
+get_batch_association_counts = cached('association_counts')(get_batch_association_counts)
+
+
+@cached('bioobject', per_route=False)
+def get_bioobject(id, type=None):
+    """
+    SciGraph bioobject, cached across /bioentity/<id>, /bioentity/<type>/<id>
+    and /bioentity/batch
+    """
+    return scigraph.bioobject(id, type)
+
+
+@cached('clique_leader', per_route=False)
+def get_clique_leader(id, type=None):
+    """
+    Id of the SciGraph clique leader of id, as bioobject resolves it
+    """
+    return scigraph.get_clique_leader(id).id
+
+
 @api.doc(params={'id': 'id, e.g. NCBIGene:84570'})
 class GenericObject(Resource):
 
@@ -110,7 +145,7 @@ class GenericObject(Resource):
         Returns basic info on object of any type
         """
         args = core_parser.parse_args()
-        obj = scigraph.bioobject(id)
+        obj = get_bioobject(id, None)
         return obj
 
 @api.param('id', 'id, e.g. NCBIGene:84570')
@@ -133,10 +168,10 @@ class GenericObjectByType(Resource):
             raise UnrecognizedBioentityTypeException("{} is not a valid Bioentity type".format(type))
 
         if type == TYPE_DISEASE:
-            bio_entity = scigraph.bioobject(id, type)
+            bio_entity = get_bioobject(id, type)
             ret_val = marshal(bio_entity, disease_object), 200
         else:
-            bio_entity = scigraph.bioobject(id, type)
+            bio_entity = get_bioobject(id, type)
             ret_val = marshal(bio_entity, bio_object), 200
         if args['get_association_counts']:
             # *_ortholog_closure requires clique leader, so use
@@ -145,10 +180,69 @@ class GenericObjectByType(Resource):
         return ret_val
 
 
+class GenericObjectBatch(Resource):
+
+    @api.expect(bioentity_batch_input)
+    @api.marshal_with(bioentity_batch_results)
+    def post(self):
+        """
+        Returns basic info on many objects, optionally of a given type
+
+        Objects are keyed by the ids given; ids that could not be
+        found or looked up are listed under errors instead
+        """
+        data = request.json or {}
+        ids = data.get('ids') or []
+        type = data.get('type')
+
+        if type is not None and type not in categories:
+            raise UnrecognizedBioentityTypeException("{} is not a valid Bioentity type".format(type))
+        if not isinstance(ids, list):
+            raise BadRequestException("ids must be a list of CURIEs")
+        if len(ids) > get_max_ids():
+            raise BadRequestException("At most {} ids can be looked up at once".format(get_max_ids()))
+
+        objects, errors = get_bioobjects(get_bioobject, ids, type)
+        model = disease_object if type == TYPE_DISEASE else bio_object
+        return {
+            'objects': {id: marshal(obj, model) for id, obj in objects.items()},
+            'errors': errors
+        }
+
+
+class AssociationCountsBatch(Resource):
+
+    @api.expect(association_counts_batch_input)
+    def post(self):
+        """
+        Returns association counts for many objects of a given type
+
+        Counts are keyed by the ids given, in the format of the
+        association_counts of /bioentity/<type>/<id>, and like those
+        are counted for the clique leader of each id
+        """
+        data = request.json or {}
+        ids = data.get('ids') or []
+        type = data.get('type')
+
+        if type not in categories:
+            raise UnrecognizedBioentityTypeException("{} is not a valid Bioentity type".format(type))
+        if not isinstance(ids, list):
+            raise BadRequestException("ids must be a list of CURIEs")
+        if len(ids) > get_batch_max_ids():
+            raise BadRequestException("At most {} ids can be counted at once".format(get_batch_max_ids()))
+
+        leaders = get_clique_leaders(get_clique_leader, ids)
+        counts = get_batch_association_counts(
+            list(leaders.values()), type, distinct_counts=bool(data.get('distinct_counts'))
+        )
+        return {id: counts[leader] for id, leader in leaders.items()}
+
+
 class GenericAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns associations for an entity regardless of the type
@@ -166,7 +260,7 @@ class GenericAssociations(Resource):
 class GeneInteractions(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns interactions for a gene
@@ -186,7 +280,7 @@ class GeneInteractions(Resource):
 class GeneHomologAssociations(Resource):
 
     @api.expect(homolog_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns homologs for a gene
@@ -213,7 +307,7 @@ class GeneHomologAssociations(Resource):
 class GenePhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with gene
@@ -240,7 +334,7 @@ class GenePhenotypeAssociations(Resource):
 class GeneDiseaseAssociations(Resource):
 
     @api.expect(gene_disease_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with gene
@@ -264,7 +358,7 @@ class GeneDiseaseAssociations(Resource):
 class GenePathwayAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns pathways associated with gene
@@ -282,7 +376,7 @@ class GenePathwayAssociations(Resource):
 class GeneExpressionAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns expression events for a gene
@@ -300,7 +394,7 @@ class GeneExpressionAssociations(Resource):
 class GeneAnatomyAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns anatomical entities associated with a gene
@@ -318,7 +412,7 @@ class GeneAnatomyAssociations(Resource):
 class GeneGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a gene
@@ -337,7 +431,7 @@ class GeneGenotypeAssociations(Resource):
 class GeneFunctionAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns function associations for a gene.
@@ -368,25 +462,27 @@ class GeneFunctionAssociations(Resource):
 
         # If there are no associations for the given ID, try other IDs.
         # Note the AmiGO instance does *not* support equivalent IDs
-        if len(assocs['associations']) == 0:
+        # A page past the last (e.g. the empty last cursor page) has
+        # numFound set, and is returned as is
+        if len(assocs['associations']) == 0 and not assocs.get('numFound'):
             # Note that GO currently uses UniProt as primary ID for some sources: https://github.com/biolink/biolink-api/issues/66
             # https://github.com/monarch-initiative/dipper/issues/461
+            # All proteins are queried at once, subjects being disjunctive
             prots = identifier_converter.convert_gene_to_protein(id)
-            for prot in prots:
-                pr_assocs = search_associations(
+            if prots:
+                assocs = search_associations(
                     object_category='function',
-                    subject=prot,
+                    subjects=prots,
                     user_agent=USER_AGENT,
                     **core_parser.parse_args()
                 )
-                assocs = pr_assocs
         return assocs
 
 @api.doc(params={'id': 'CURIE identifier of gene, e.g. NCBIGene:4750'})
 class GenePublicationAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns publications associated with a gene
@@ -405,7 +501,7 @@ class GenePublicationAssociations(Resource):
 class GeneModelAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns models associated with a gene
@@ -426,7 +522,7 @@ class GeneModelAssociations(Resource):
 class GeneOrthologPhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
 
@@ -458,7 +554,7 @@ class GeneOrthologPhenotypeAssociations(Resource):
 class GeneOrthologDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Return diseases associated with orthologs of a gene
@@ -489,7 +585,7 @@ class GeneOrthologDiseaseAssociations(Resource):
 class GeneVariantAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns variants associated with a gene
@@ -510,7 +606,7 @@ class GeneVariantAssociations(Resource):
 class GeneCaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns cases associated with a gene
@@ -528,7 +624,7 @@ class GeneCaseAssociations(Resource):
 class DiseasePhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(d2p_association_results)
+    @marshal_with(d2p_association_results)
     def get(self, id):
         """
         Returns phenotypes associated with disease
@@ -555,7 +651,7 @@ class DiseasePhenotypeAssociations(Resource):
 class DiseaseGeneAssociations(Resource):
 
     @api.expect(gene_disease_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a disease
@@ -597,7 +693,7 @@ class DiseaseSubstanceAssociations(Resource):
 class DiseaseModelAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """Returns associations to models of the disease
 
@@ -634,7 +730,7 @@ class DiseaseModelAssociations(Resource):
 class DiseaseModelTaxonAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id, taxon):
         """
         Returns associations to models of the disease constrained by taxon
@@ -658,7 +754,7 @@ class DiseaseModelTaxonAssociations(Resource):
 class DiseaseGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a disease
@@ -680,7 +776,7 @@ class DiseaseGenotypeAssociations(Resource):
 class DiseasePublicationAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns publications associated with a disease
@@ -700,7 +796,7 @@ class DiseasePublicationAssociations(Resource):
 class DiseasePathwayAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns pathways associated with a disease
@@ -719,7 +815,7 @@ class DiseasePathwayAssociations(Resource):
 class DiseaseVariantAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns variants associated with a disease
@@ -741,7 +837,7 @@ class DiseaseVariantAssociations(Resource):
 class DiseaseCaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns cases associated with a disease
@@ -782,7 +878,7 @@ class PhenotypeAnatomyAssociations(Resource):
 class PhenotypeDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(d2p_association_results)
+    @marshal_with(d2p_association_results)
     def get(self, id):
         """
         Returns diseases associated with a phenotype
@@ -809,7 +905,7 @@ class PhenotypeDiseaseAssociations(Resource):
 class PhenotypeGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a phenotype
@@ -857,7 +953,7 @@ class PhenotypeGeneByTaxonAssociations(Resource):
 class PhenotypeGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a phenotype
@@ -879,7 +975,7 @@ class PhenotypeGenotypeAssociations(Resource):
 class PhenotypePublicationAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns publications associated with a phenotype
@@ -899,7 +995,7 @@ class PhenotypePublicationAssociations(Resource):
 class PhenotypePathwayAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns pathways associated with a phenotype
@@ -919,7 +1015,7 @@ class PhenotypePathwayAssociations(Resource):
 class PhenotypeVariantAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns variants associated with a phenotype
@@ -941,7 +1037,7 @@ class PhenotypeVariantAssociations(Resource):
 class PhenotypeCaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns cases associated with a phenotype
@@ -970,7 +1066,7 @@ class GotermGeneAssociations(Resource):
     )
 
     @api.expect(parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns associations to GO terms for a gene
@@ -1016,7 +1112,7 @@ class FunctionGeneAssociations(Resource):
     )
 
     @api.expect(parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated to a GO term
@@ -1186,7 +1282,7 @@ class FunctionPublicationAssociations(Resource):
 class PathwayGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a pathway
@@ -1207,7 +1303,7 @@ class PathwayGeneAssociations(Resource):
 class PathwayDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with a pathway
@@ -1228,7 +1324,7 @@ class PathwayDiseaseAssociations(Resource):
 class PathwayPhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with a pathway
@@ -1248,7 +1344,7 @@ class PathwayPhenotypeAssociations(Resource):
 class AnatomyGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a given anatomy
@@ -1345,7 +1441,7 @@ class SubstanceTreatsAssociations(Resource):
 class GenotypeGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes-genotype associations.
@@ -1365,7 +1461,7 @@ class GenotypeGenotypeAssociations(Resource):
 class GenotypeVariantAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes-variant associations.
@@ -1384,7 +1480,7 @@ class GenotypeVariantAssociations(Resource):
 class GenotypePhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with a genotype
@@ -1412,7 +1508,7 @@ class GenotypePhenotypeAssociations(Resource):
 class GenotypeDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with a genotype
@@ -1431,7 +1527,7 @@ class GenotypeDiseaseAssociations(Resource):
 class GenotypeGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a genotype
@@ -1449,7 +1545,7 @@ class GenotypeGeneAssociations(Resource):
 class GenotypeModelAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns models associated with a genotype
@@ -1470,7 +1566,7 @@ class GenotypeModelAssociations(Resource):
 class GenotypePublicationAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns publications associated with a genotype
@@ -1489,7 +1585,7 @@ class GenotypePublicationAssociations(Resource):
 class GenotypeCaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns cases associated with a genotype
@@ -1508,7 +1604,7 @@ class GenotypeCaseAssociations(Resource):
 class VariantGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a variant
@@ -1526,7 +1622,7 @@ class VariantGenotypeAssociations(Resource):
 class VariantDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with a variant
@@ -1545,7 +1641,7 @@ class VariantDiseaseAssociations(Resource):
 class VariantPhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with a variant
@@ -1573,7 +1669,7 @@ class VariantPhenotypeAssociations(Resource):
 class VariantGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a variant
@@ -1591,7 +1687,7 @@ class VariantGeneAssociations(Resource):
 class VariantPublicationAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns publications associated with a variant
@@ -1610,7 +1706,7 @@ class VariantPublicationAssociations(Resource):
 class VariantModelAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns models associated with a variant
@@ -1629,7 +1725,7 @@ class VariantModelAssociations(Resource):
 class VariantCaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns cases associated with a variant
@@ -1648,7 +1744,7 @@ class VariantCaseAssociations(Resource):
 class ModelDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with a model
@@ -1667,7 +1763,7 @@ class ModelDiseaseAssociations(Resource):
 class ModelGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a model
@@ -1687,7 +1783,7 @@ class ModelGeneAssociations(Resource):
 class ModelGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a model
@@ -1707,7 +1803,7 @@ class ModelGenotypeAssociations(Resource):
 class ModelPublicationAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns publications associated with a model
@@ -1726,7 +1822,7 @@ class ModelPublicationAssociations(Resource):
 class ModelPhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with a model
@@ -1754,7 +1850,7 @@ class ModelPhenotypeAssociations(Resource):
 class ModelVariantAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns variants associated with a model
@@ -1774,7 +1870,7 @@ class ModelVariantAssociations(Resource):
 class ModelCaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns cases associated with a model
@@ -1792,7 +1888,7 @@ class ModelCaseAssociations(Resource):
 class PublicationVariantAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns variants associated with a publication
@@ -1812,7 +1908,7 @@ class PublicationVariantAssociations(Resource):
 class PublicationPhenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with a publication
@@ -1831,7 +1927,7 @@ class PublicationPhenotypeAssociations(Resource):
 class PublicationModelAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns models associated with a publication
@@ -1851,7 +1947,7 @@ class PublicationModelAssociations(Resource):
 class PublicationGenotypeAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a publication
@@ -1871,7 +1967,7 @@ class PublicationGenotypeAssociations(Resource):
 class PublicationGeneAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genes associated with a publication
@@ -1891,7 +1987,7 @@ class PublicationGeneAssociations(Resource):
 class PublicationDiseaseAssociations(Resource):
 
     @api.expect(core_parser_with_filters)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with a publication
@@ -1910,7 +2006,7 @@ class PublicationDiseaseAssociations(Resource):
 class CaseModelAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns models associated with a case
@@ -1929,7 +2025,7 @@ class CaseModelAssociations(Resource):
 class CaseDiseaseAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns diseases associated with a case
@@ -1948,7 +2044,7 @@ class CaseDiseaseAssociations(Resource):
 class CaseVariantAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns variants associated with a case
@@ -1966,7 +2062,7 @@ class CaseVariantAssociations(Resource):
 class CaseGenotypeAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns genotypes associated with a case
@@ -1984,7 +2080,7 @@ class CaseGenotypeAssociations(Resource):
 class CasePhenotypeAssociations(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_with(association_results)
+    @marshal_with(association_results)
     def get(self, id):
         """
         Returns phenotypes associated with a case
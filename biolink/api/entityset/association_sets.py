@@ -0,0 +1,216 @@
+"""
+Process-wide cache of AssociationSets for over-representation analysis
+
+Creating an AssociationSet fetches every association of a category for
+a taxon from Solr and indexes them against the ontology, which takes
+far longer than the enrichment test itself. Sets are kept here, keyed
+by (ontology, subject_category, object_category, taxon), and shared by
+all requests, together with the EnrichmentIndex used to test them:
+
+ - a set is built on first use; concurrent requests for the same key
+   wait for the one build
+ - once older than refresh_interval seconds, or when the data release
+   changes, a set is rebuilt on a background OS thread (not a greenlet,
+   as building is CPU bound) while requests keep using the current one;
+   a failed rebuild is retried once refresh_interval has passed
+ - the approximate size of each set is tracked, and the least recently
+   used sets are dropped when the total exceeds max_bytes
+ - the sets listed under warm_up, none by default, are built in the
+   background when a worker starts
+
+Configured under association_sets in config.yaml.
+"""
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from ontobio.assoc_factory import AssociationSetFactory
+
+from biolink.api.entityset.enrichment import EnrichmentIndex
+from biolink.coalesce import SingleFlight
+from biolink.executor import run_in_background
+from biolink.release import get_data_release
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+Key = namedtuple('Key', ['ontology', 'subject_category', 'object_category', 'taxon'])
+
+
+class Entry(object):
+    def __init__(self, aset, release):
+        self.aset = aset
+        self.index = EnrichmentIndex(aset)
+        self.release = release
+        self.built_at = time.time()
+        self.nbytes = estimate_size(aset) + self.index.nbytes
+        self.refreshing = False
+        self.last_attempt = None
+
+
+def get_config():
+    return get_biolink_config().get('association_sets') or {}
+
+
+def estimate_size(aset):
+    """
+    Approximate memory used by the association and inferred maps of an
+    AssociationSet, not counting its ontology
+    """
+    size = 0
+    for mapping in (aset.association_map, aset.subject_to_inferred_map, aset.subject_label_map):
+        if not mapping:
+            continue
+        size += sys.getsizeof(mapping)
+        for key, value in mapping.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+            if isinstance(value, (list, set, frozenset)):
+                size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+def create_association_set(key):
+    from biolink.ontology.ontology_manager import get_ontology
+    started = time.perf_counter()
+    aset = AssociationSetFactory().create(
+        ontology=get_ontology(key.ontology),
+        subject_category=key.subject_category,
+        object_category=key.object_category,
+        taxon=key.taxon
+    )
+    log.info("Built association set {} in {:.1f}s".format(key, time.perf_counter() - started))
+    return aset
+
+
+class AssociationSetCache(object):
+    """
+    AssociationSets by Key, with background refresh and a memory budget
+    """
+    def __init__(self, create=create_association_set, max_bytes=DEFAULT_MAX_BYTES,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.create = create
+        self.max_bytes = max_bytes
+        self.refresh_interval = refresh_interval
+        self.builds = SingleFlight()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get the AssociationSet for a key, building it if needed
+        """
+        return self.get_entry(key).aset
+
+    def get_entry(self, key):
+        """
+        Get the cache Entry, holding the AssociationSet and its
+        EnrichmentIndex, for a key
+        """
+        release = get_data_release()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if not entry.refreshing and not self.is_backing_off(entry) and self.is_stale(entry, release):
+                    entry.refreshing = True
+                    run_in_background(self.refresh, key, release)
+                return entry
+        return self.builds.do(key, lambda: self.build(key, release))
+
+    def is_stale(self, entry, release):
+        return entry.release != release or time.time() - entry.built_at > self.refresh_interval
+
+    def is_backing_off(self, entry):
+        # a failed refresh is not retried until the interval has passed
+        return entry.last_attempt is not None and time.time() - entry.last_attempt < self.refresh_interval
+
+    def build(self, key, release):
+        entry = Entry(self.create(key), release)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.evict()
+            log.info("Cached association set {} ({} bytes, {} in total)".format(key, entry.nbytes, self.nbytes))
+        return entry
+
+    def refresh(self, key, release):
+        try:
+            self.build(key, release)
+        except Exception as e:
+            log.warning("Could not refresh association set {}: {}".format(key, e))
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+                    entry.last_attempt = time.time()
+
+    def evict(self):
+        # the most recently used set is kept even if it alone is over budget
+        while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            key, entry = self._entries.popitem(last=False)
+            log.info("Dropped association set {} ({} bytes)".format(key, entry.nbytes))
+
+    @property
+    def nbytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sets': [
+                    {'key': key._asdict(), 'bytes': entry.nbytes, 'age': time.time() - entry.built_at}
+                    for key, entry in self._entries.items()
+                ],
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+cache = None
+lock = threading.Lock()
+
+
+def get_cache():
+    global cache
+    with lock:
+        if cache is None:
+            config = get_config()
+            cache = AssociationSetCache(
+                max_bytes=config.get('max_bytes', DEFAULT_MAX_BYTES),
+                refresh_interval=config.get('refresh_interval', DEFAULT_REFRESH_INTERVAL)
+            )
+        return cache
+
+
+def get_association_set(ontology, subject_category, object_category, taxon):
+    return get_cache().get(Key(ontology, subject_category, object_category, taxon))
+
+
+def get_enrichment_index(ontology, subject_category, object_category, taxon):
+    return get_cache().get_entry(Key(ontology, subject_category, object_category, taxon)).index
+
+
+def warm_up(background=True):
+    """
+    Build the association sets listed under association_sets.warm_up
+    """
+    def build_all():
+        for spec in get_config().get('warm_up') or []:
+            key = Key(spec['ontology'], spec.get('subject_category', 'gene'), spec['object_category'], spec.get('taxon'))
+            try:
+                get_cache().get(key)
+            except Exception as e:
+                log.warning("Could not warm up association set {}: {}".format(key, e))
+
+    if background:
+        run_in_background(build_all)
+    else:
+        build_all()
@@ -2,12 +2,12 @@ import logging
 
 from flask import request
 from flask_restplus import Resource
-from biolink.ontology.ontology_manager import get_ontology
+from biolink.api.entityset.association_sets import get_enrichment_index
+from biolink.api.entityset.enrichment import CORRECTIONS, BONFERRONI
 from biolink.datamodel.serializers import compact_association_set, association_results
 from ontobio.golr.golr_associations import search_associations, GolrFields
 from ontobio.ontol_factory import OntologyFactory
 from ontobio.config import get_config
-from ontobio.assoc_factory import AssociationSetFactory
 
 from biolink.api.restplus import api
 from biolink import USER_AGENT
@@ -23,6 +23,7 @@ parser.add_argument('subject_category', default='gene', help='Default: gene. Oth
 parser.add_argument('max_p_value', default='0.05', help='Exclude results with p-value greater than this')
 parser.add_argument('ontology', help='ontology id. Must be obo id. Examples: go, mp, hp, uberon (optional: will be inferred if left blank)')
 parser.add_argument('taxon', help='must be NCBITaxon CURIE. Example: NCBITaxon:9606')
+parser.add_argument('correction', choices=CORRECTIONS, default=BONFERRONI, help='Multiple testing correction: bonferroni, or bh (Benjamini-Hochberg)')
 
 @api.doc(params={'object_category': 'CATEGORY of entity at link OBJECT (target), e.g. function, phenotype, disease'})
 class OverRepresentation(Resource):
@@ -36,7 +37,6 @@ class OverRepresentation(Resource):
         args = parser.parse_args()
 
         M=GolrFields()
-        ont = None
         ocat = args.get('object_category')
         ontid = args.get('ontology')
         if ontid is None:
@@ -46,14 +46,12 @@ class OverRepresentation(Resource):
                 # TODO: other phenotype ontologies
                 ontid = 'hp'
 
-        print("Loading: {}".format(ontid))
-        ont = get_ontology(ontid)
         taxid = args.get('taxon')
         max_p_value = float(args.max_p_value)
         
         subjects = args.get('subject')
         background = args.get('background')
-        afactory = AssociationSetFactory()
-        aset = afactory.create(ontology=ont, subject_category='gene', object_category=ocat, taxon=taxid)
-        enr = aset.enrichment_test(subjects=subjects, background=background, threshold=max_p_value, labels=True)
+        index = get_enrichment_index(ontid, 'gene', ocat, taxid)
+        enr = index.enrichment_test(subjects=subjects, background=background, threshold=max_p_value, labels=True,
+                                    correction=args.get('correction'))
         return {'results': enr }
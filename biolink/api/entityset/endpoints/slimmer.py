@@ -47,15 +47,13 @@ class EntitySetFunctionSlimmer(Resource):
         #sg_dev = SciGraph(get_biolink_config()['scigraph_data']['url'])
 
         subjects = [x.replace('WormBase:', 'WB:') if 'WormBase:' in x else x for x in subjects]
+        # ids are converted in one batch each way, see IdentifierConverter
+        proteins = identifier_converter.convert_genes_to_proteins(
+            [s for s in subjects if 'HGNC:' in s or 'NCBIGene:' in s or 'ENSEMBL:' in s]
+        )
         slimmer_subjects = []
         for s in subjects:
-            if 'HGNC:' in s or 'NCBIGene:' in s or 'ENSEMBL:' in s:
-                prots = identifier_converter.convert_gene_to_protein(s)
-                if len(prots) == 0:
-                    prots = [s]
-                slimmer_subjects += prots
-            else:
-                slimmer_subjects.append(s)
+            slimmer_subjects += proteins.get(s) or [s]
 
         results = map2slim(
             subjects=slimmer_subjects,
@@ -66,20 +64,22 @@ class EntitySetFunctionSlimmer(Resource):
         )
 
         # To the fullest extent possible return HGNC ids
-        checked = {}
+        human_proteins = [
+            association['subject']['id']
+            for result in results for association in result['assocs']
+            if association['subject']['taxon']['id'] == 'NCBITaxon:9606'
+            and association['subject']['id'].startswith('UniProtKB:')
+        ]
+        hgnc_ids = {}
+        for proteinId, genes in identifier_converter.convert_proteins_to_genes(human_proteins).items():
+            for gene in genes:
+                if gene.startswith('HGNC'):
+                    hgnc_ids[proteinId] = gene
         for result in results:
             for association in result['assocs']:
-                taxon = association['subject']['taxon']['id']
                 proteinId = association['subject']['id']
-                if taxon == 'NCBITaxon:9606' and proteinId.startswith('UniProtKB:'):
-                    if proteinId not in checked:
-                        genes = identifier_converter.convert_protein_to_gene(proteinId)
-                        for gene in genes:
-                            if gene.startswith('HGNC'):
-                                association['subject']['id'] = gene
-                                checked[proteinId] = gene
-                    else:
-                        association['subject']['id'] = checked[proteinId]
+                if proteinId in hgnc_ids and association['subject']['taxon']['id'] == 'NCBITaxon:9606':
+                    association['subject']['id'] = hgnc_ids[proteinId]
 
         return results
 
@@ -0,0 +1,136 @@
+"""
+Vectorized term enrichment over an AssociationSet
+
+AssociationSet.enrichment_test runs a Fisher exact test per term in a
+Python loop. EnrichmentIndex holds the inferred annotations of an
+association set as a subject x term CSR incidence matrix, built once
+per set (see biolink.api.entityset.association_sets), so that a test
+is two sparse column sums and a single scipy.stats.hypergeom call.
+
+As in ontobio, the hypotheses are the terms annotated to at least one
+sample subject and more than one background subject, and the test is
+one-sided (over-representation). p-values are corrected with
+Bonferroni or Benjamini-Hochberg. Terms that cannot pass max_p_value
+are pruned before the (comparatively slow) survival function is
+computed: those observed no more often than expected, whose p-values
+are at least 0.5, and those whose probability of the observed count
+alone is over the threshold.
+"""
+import logging
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.stats import hypergeom
+
+log = logging.getLogger(__name__)
+
+BONFERRONI = 'bonferroni'
+BENJAMINI_HOCHBERG = 'bh'
+CORRECTIONS = [BONFERRONI, BENJAMINI_HOCHBERG]
+
+
+class EnrichmentIndex(object):
+    """
+    Subject x term incidence matrix of the inferred annotations of an
+    AssociationSet
+    """
+    def __init__(self, aset):
+        self.ontology = aset.ontology
+        self.subjects = list(aset.subjects)
+        self.subject_index = {s: i for i, s in enumerate(self.subjects)}
+        self.terms = sorted(aset.objects)
+        self.term_index = {t: j for j, t in enumerate(self.terms)}
+
+        indptr = [0]
+        indices = []
+        for subject in self.subjects:
+            indices.extend(self.term_index[t] for t in aset.inferred_types(subject))
+            indptr.append(len(indices))
+        self.matrix = csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(self.subjects), len(self.terms))
+        )
+        self.counts = np.asarray(self.matrix.sum(axis=0)).ravel()
+
+    @property
+    def nbytes(self):
+        return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes + self.counts.nbytes
+
+    def term_counts(self, subjects):
+        rows = [self.subject_index[s] for s in subjects if s in self.subject_index]
+        if not rows:
+            return np.zeros(len(self.terms), dtype=np.int64)
+        return np.asarray(self.matrix[rows].sum(axis=0)).ravel()
+
+    def enrichment_test(self, subjects=None, background=None, threshold=0.05, labels=False,
+                        correction=BONFERRONI):
+        """
+        Over-represented terms in a sample of subjects, as
+        AssociationSet.enrichment_test
+
+        :return: list of {'c': term, 'p': corrected p, 'p_uncorrected': p}
+                 dicts (plus 'n', the term label, if labels is set),
+                 ordered by p
+        """
+        if correction not in CORRECTIONS:
+            raise ValueError("Unknown correction {}, expected one of {}".format(correction, CORRECTIONS))
+        subjects = set(subjects or [])
+        sample_size = len(subjects)
+        sample_counts = self.term_counts(subjects)
+
+        if background is None:
+            # unknown sample subjects add to the background size only
+            bg_size = len(set(self.subjects) | subjects)
+            bg_counts = self.counts
+        else:
+            background = set(background) | subjects
+            bg_size = len(background)
+            bg_counts = self.term_counts(background)
+
+        hypotheses = np.flatnonzero((sample_counts > 0) & (bg_counts > 1))
+        num_hypotheses = len(hypotheses)
+        if num_hypotheses == 0:
+            return []
+
+        tested = hypotheses
+        if threshold < 0.5:
+            # P(X >= k) >= 0.5 for k at or below the median, which is
+            # within one of the mean n * K / N
+            expected = sample_size * bg_counts[tested] / bg_size
+            tested = tested[sample_counts[tested] + 1 > expected]
+        # P(X >= k) >= P(X = k), and both corrections only increase p
+        bound = threshold / num_hypotheses if correction == BONFERRONI else threshold
+        with np.errstate(divide='ignore'):
+            log_pmf = hypergeom.logpmf(sample_counts[tested], bg_size, bg_counts[tested], sample_size)
+            tested = tested[log_pmf < np.log(bound)]
+
+        p_uncorrected = hypergeom.sf(sample_counts[tested] - 1, bg_size, bg_counts[tested], sample_size)
+        if correction == BONFERRONI:
+            p = np.minimum(p_uncorrected * num_hypotheses, 1.0)
+        else:
+            p = benjamini_hochberg(p_uncorrected, num_hypotheses)
+
+        results = []
+        for j in np.flatnonzero(p < threshold)[np.argsort(p[p < threshold], kind='stable')]:
+            term = self.terms[tested[j]]
+            result = {'c': term, 'p': float(p[j]), 'p_uncorrected': float(p_uncorrected[j])}
+            if labels:
+                result['n'] = self.ontology.label(term)
+            results.append(result)
+        return results
+
+
+def benjamini_hochberg(p_values, num_hypotheses=None):
+    """
+    Benjamini-Hochberg adjusted p-values
+
+    num_hypotheses may be larger than the number of p-values given, if
+    the others are known to be larger than all of these
+    """
+    m = len(p_values) if num_hypotheses is None else num_hypotheses
+    order = np.argsort(p_values, kind='stable')
+    ranked = p_values[order] * m / np.arange(1, len(p_values) + 1)
+    adjusted = np.minimum.accumulate(ranked[::-1])[::-1]
+    result = np.empty(len(p_values))
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
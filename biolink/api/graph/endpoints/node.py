@@ -3,17 +3,16 @@ import logging
 from flask_restplus import Resource, inputs
 from biolink.datamodel.serializers import bbop_graph, bio_object
 from biolink.error_handlers import NoResultFoundException, UnhandledException
-from ontobio.util.scigraph_util import SciGraph
 from ontobio.model.bbop_graph import BBOPGraph
 from biolink.api.restplus import api
-from biolink.settings import get_biolink_config
+from biolink.transport import get_scigraph
 
 from requests import HTTPError
 
 log = logging.getLogger(__name__)
 
-sg_data = SciGraph(get_biolink_config()['scigraph_data']['url'])
-sg_ont = SciGraph(get_biolink_config()['scigraph_ontology']['url'])
+sg_data = get_scigraph('scigraph_data')
+sg_ont = get_scigraph('scigraph_ontology')
 
 @api.doc(params={'id': 'CURIE e.g. HP:0000465'})
 class NodeResource(Resource):
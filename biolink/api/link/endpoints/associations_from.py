@@ -4,12 +4,17 @@ from flask import request
 from flask_restplus import Resource, inputs
 from biolink.datamodel.serializers import association, association_results
 from biolink.api.restplus import api
+from biolink.datamodel.compiled import marshal_with
+from biolink.datamodel.fieldsets import FIELDS_HELP, with_fieldset
+from biolink.pagination import CURSOR_HELP, with_cursor
 from ontobio.golr.golr_associations import get_association, search_associations
 
 from biolink import USER_AGENT
 
 log = logging.getLogger(__name__)
 
+search_associations = with_fieldset(with_cursor(search_associations))
+
 core_parser = api.parser()
 core_parser.add_argument('rows', type=int, required=False, default=100, help='number of rows')
 core_parser.add_argument('start', type=int, required=False, help='beginning row')
@@ -17,6 +22,8 @@ core_parser.add_argument('evidence', help='Object id, e.g. ECO:0000501 (for IEA;
 core_parser.add_argument('unselect_evidence', type=inputs.boolean, default=False, help='If true, excludes evidence objects in response')
 core_parser.add_argument('exclude_automatic_assertions', type=inputs.boolean, default=False, help='If true, excludes associations that involve IEAs (ECO:0000501)')
 core_parser.add_argument('use_compact_associations', type=inputs.boolean, default=False, help='If true, returns results in compact associations format')
+core_parser.add_argument('fields', help=FIELDS_HELP)
+core_parser.add_argument('cursor', help=CURSOR_HELP)
 
 @api.doc(params={'subject': 'Return associations emanating from this node, e.g. NCBIGene:84570, ZFIN:ZDB-GENE-050417-357 (If ID is from an ontology then results would include inferred associations, by default)'})
 class AssociationsFrom(Resource):
@@ -26,7 +33,7 @@ class AssociationsFrom(Resource):
     parser.add_argument('relation', help='Filter by relation CURIE, e.g. RO:0002200 (has_phenotype), RO:0002607 (is marker for), RO:HOM0000017 (orthologous to), etc.')
 
     @api.expect(parser)
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, subject):
         """
         Returns list of matching associations starting from a given subject (source)
@@ -42,7 +49,7 @@ class AssociationsTo(Resource):
     parser.add_argument('relation', help='Filter by relation CURIE, e.g. RO:0002200 (has_phenotype), RO:0002607 (is marker for), RO:HOM0000017 (orthologous to), etc.')
 
     @api.expect(core_parser)
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, object):
         """
         Returns list of matching associations pointing to a given object (target)
@@ -55,7 +62,7 @@ class AssociationsTo(Resource):
 class AssociationsBetween(Resource):
 
     @api.expect(core_parser)
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, subject, object):
         """
         Returns associations connecting two entities
@@ -76,7 +83,7 @@ class AssociationBySubjectAndAssocType(Resource):
     parser.add_argument('object', help='Object CURIE')
 
     @api.expect(parser)
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, association_type):
         """
         Returns list of matching associations of a given type
@@ -4,12 +4,17 @@ from flask import request
 from flask_restplus import Resource, inputs
 from biolink.datamodel.serializers import association, association_results
 from biolink.api.restplus import api
+from biolink.datamodel.compiled import marshal_with
+from biolink.datamodel.fieldsets import FIELDS_HELP, with_fieldset
+from biolink.pagination import CURSOR_HELP, with_cursor
 from ontobio.golr.golr_associations import get_association, search_associations, GolrFields
 
 from biolink import USER_AGENT
 
 log = logging.getLogger(__name__)
 
+search_associations = with_fieldset(with_cursor(search_associations))
+
 M=GolrFields()
 
 core_parser = api.parser()
@@ -19,12 +24,14 @@ core_parser.add_argument('evidence', help='Object id, e.g. ECO:0000501 (for IEA;
 core_parser.add_argument('unselect_evidence', type=inputs.boolean, default=False, help='If true, excludes evidence objects in response')
 core_parser.add_argument('exclude_automatic_assertions', type=inputs.boolean, default=False, help='If true, excludes associations that involve IEAs (ECO:0000501)')
 core_parser.add_argument('use_compact_associations', type=inputs.boolean, default=False, help='If true, returns results in compact associations format')
+core_parser.add_argument('fields', help=FIELDS_HELP)
+core_parser.add_argument('cursor', help=CURSOR_HELP)
 
 
 @api.doc(params={'id': 'identifier for an association, e.g. f5ba436c-f851-41b3-9d9d-bb2b5fc879d4'}, required=True)
 class AssociationObject(Resource):
 
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, id):
         """
         Returns the association with a given identifier.
@@ -43,7 +50,7 @@ class AssociationBySubjectCategorySearch(Resource):
     parser.add_argument('relation', help='Filter by relation CURIE, e.g. RO:0002200 (has_phenotype), RO:0002607 (is marker for), RO:HOM0000017 (orthologous to), etc.')
 
     @api.expect(parser)
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, subject_category):
         """
         Returns list of matching associations for a given subject category.
@@ -63,7 +70,7 @@ class AssociationBySubjectAndObjectCategorySearch(Resource):
     parser.add_argument('relation', help='Filter by relation CURIE, e.g. RO:0002200 (has_phenotype), RO:0002607 (is marker for), RO:HOM0000017 (orthologous to), etc.')
 
     @api.expect(parser)
-    @api.marshal_list_with(association_results)
+    @marshal_with(association_results, as_list=True)
     def get(self, subject_category, object_category):
         """
         Returns list of matching associations between a given subject and object category
@@ -2,9 +2,10 @@ import logging
 
 from flask import request
 from flask import abort
+from flask import Response, stream_with_context
 from flask_restplus import Resource
 from biolink.api.restplus import api
-from ontobio.golr.golr_associations import bulk_fetch
+from biolink.api.mart.export import export, FORMATS, START_CURSOR
 from ontobio.golr.golr_associations import search_associations
 from ontobio.golr.golr_associations import MAX_ROWS
 from biolink.datamodel.serializers import compact_association_set
@@ -29,9 +30,22 @@ limiter = Limiter(
 
 log = logging.getLogger(__name__)
 
-parser = api.parser()
+export_parser = api.parser()
+export_parser.add_argument('format', choices=list(FORMATS.keys()), default='json', help='json (compact associations), ndjson or tsv (one association per line)')
+export_parser.add_argument('cursor', default=START_CURSOR, help='resume an ndjson or tsv download from the last cursor line received')
+
+parser = export_parser.copy()
 parser.add_argument('slim', action='append', help='Map objects up (slim) to a higher level category. Value can be ontology class ID or subset ID')
 
+
+def stream_associations(args, **kwargs):
+    """
+    Stream the associations matching a search_associations query in the
+    requested format, see biolink.api.mart.export
+    """
+    body = export(format=args.format, cursor=args.cursor, user_agent=USER_AGENT, **kwargs)
+    return Response(stream_with_context(body), mimetype=FORMATS[args.format])
+
 #@limiter.limit("1 per minute")
 @api.doc(params={'object_category': 'Category of entity at link Object (target), e.g. phenotype, disease'})
 @api.doc(params={'taxon': 'taxon of gene, must be of form NCBITaxon:9606'})
@@ -45,13 +59,12 @@ class MartGeneAssociationsResource(Resource):
 
         NOTE: this route has a limiter on it, you may be restricted in the number of downloads per hour. Use carefully.
         """
-        assocs = bulk_fetch(
+        return stream_associations(
+            parser.parse_args(),
             subject_category='gene',
             object_category=object_category,
-            taxon=taxon,
-            user_agent=USER_AGENT
+            subject_taxon=taxon
         )
-        return assocs
 
 #@limiter.limit("1 per minute")
 @api.doc(params={'object_category': 'Category of entity at link Subject (target), e.g. phenotype, disease'})
@@ -71,13 +84,12 @@ class MartCaseAssociationsResource(Resource):
         if taxon == "NCBITaxon:9606":
             taxon = None
 
-        assocs = bulk_fetch(
+        return stream_associations(
+            parser.parse_args(),
             subject_category='case',
             object_category=object_category,
-            taxon=taxon,
-            user_agent=USER_AGENT
+            subject_taxon=taxon
         )
-        return assocs
 
 #@limiter.limit("1 per minute")
 @api.doc(params={'object_category': 'Category of entity at link Object (target), e.g. phenotype, disease'})
@@ -97,46 +109,45 @@ class MartDiseaseAssociationsResource(Resource):
         if taxon == "NCBITaxon:9606":
             taxon = None
 
-        assocs = bulk_fetch(
+        return stream_associations(
+            parser.parse_args(),
             subject_category='disease',
             object_category=object_category,
-            taxon=taxon,
-            user_agent=USER_AGENT
+            subject_taxon=taxon
         )
-        return assocs
 
 @api.doc(params={'taxon1': 'subject taxon, e.g. NCBITaxon:9606'})
 @api.doc(params={'taxon2': 'object taxon, e.g. NCBITaxon:9606'})
 class MartParalogAssociationsResource(Resource):
 
+    @api.expect(export_parser)
     def get(self, taxon1, taxon2):
         """
         Bulk download of paralogs
         """
-        assocs = bulk_fetch(
+        return stream_associations(
+            export_parser.parse_args(),
             subject_category='gene',
             object_category='gene',
             relation=paralog_rel,
-            taxon=taxon1,
-            object_taxon=taxon2,
-            user_agent=USER_AGENT
+            subject_taxon=taxon1,
+            object_taxon=taxon2
         )
-        return assocs
 
 @api.doc(params={'taxon1': 'subject taxon, e.g. NCBITaxon:9606'})
 @api.doc(params={'taxon2': 'object taxon, e.g. NCBITaxon:10090'})
 class MartOrthologAssociationsResource(Resource):
 
+    @api.expect(export_parser)
     def get(self, taxon1, taxon2):
         """
         Bulk download of orthologs
         """
-        assocs = bulk_fetch(
+        return stream_associations(
+            export_parser.parse_args(),
             subject_category='gene',
             object_category='gene',
             relation=ortholog_rel,
-            taxon=taxon1,
-            object_taxon=taxon2,
-            user_agent=USER_AGENT
-        )
-        return assocs
\ No newline at end of file
+            subject_taxon=taxon1,
+            object_taxon=taxon2
+        )
\ No newline at end of file
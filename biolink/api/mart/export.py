@@ -0,0 +1,154 @@
+"""
+Streaming bulk export of associations, paged with Solr cursorMark
+
+Associations are fetched page_size documents at a time, sorted by
+subject then id, so memory use does not grow with the size of the
+export and the first records can be sent as soon as the first page
+arrives. Formats:
+
+ - json: a JSON array of compact associations (subject, subject_label,
+   relation, objects), as previously returned by bulk_fetch
+ - ndjson: one association per line, with a {"cursor": ...} line after
+   each page
+ - tsv: one association per row, with a "#cursor<TAB>..." row after
+   each page
+
+A cursor line marks the point up to which all associations have been
+sent; passing it back as the cursor parameter resumes the export from
+there.
+"""
+import json
+import logging
+
+from ontobio.golr.golr_query import GolrAssociationQuery, GolrFields
+
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+M = GolrFields()
+
+FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'tsv': 'text/tab-separated-values'
+}
+START_CURSOR = '*'
+DEFAULT_PAGE_SIZE = 5000
+TSV_COLUMNS = ['subject', 'subject_label', 'relation', 'object']
+
+
+def get_page_size():
+    mart_config = get_biolink_config().get('mart') or {}
+    return mart_config.get('page_size', DEFAULT_PAGE_SIZE)
+
+
+def iterate_pages(cursor=START_CURSOR, page_size=None, **kwargs):
+    """
+    Yield (raw solr docs, query, next cursor) for each page of the
+    associations matching a search_associations query
+    """
+    query = GolrAssociationQuery(facet=False, facet_fields=[], rows=page_size or get_page_size(), **kwargs)
+    params = query.solr_params()
+    params.pop('start', None)
+    # cursorMark needs a total order; subject first keeps compact groups contiguous
+    subject_field = M.OBJECT if query.invert_subject_object else M.SUBJECT
+    params['sort'] = '{} asc,{} asc'.format(subject_field, M.ID)
+
+    while True:
+        results = query.solr.search(cursorMark=cursor, **params)
+        next_cursor = results.nextCursorMark
+        yield results.docs, query, next_cursor
+        if next_cursor is None or next_cursor == cursor:
+            break
+        cursor = next_cursor
+
+
+def compact(docs, query):
+    return query.translate_docs_compact(
+        docs,
+        field_mapping=query.field_mapping,
+        slim=query.slim,
+        map_identifiers=query.map_identifiers,
+        invert_subject_object=query.invert_subject_object
+    )
+
+
+def compact_associations(pages):
+    """
+    Compact associations (one per subject and relation) from pages of
+    docs sorted by subject
+    """
+    pending = []
+    subject = None
+    last_query = None
+    for docs, query, next_cursor in pages:
+        for doc in docs:
+            doc_subject = doc.get(M.OBJECT if query.invert_subject_object else M.SUBJECT)
+            if doc_subject != subject and pending:
+                yield from compact(pending, query)
+                pending = []
+            subject = doc_subject
+            pending.append(doc)
+        last_query = query
+    if pending:
+        yield from compact(pending, last_query)
+
+
+def flat_associations(docs, query):
+    for association in compact(docs, query):
+        for obj in association['objects']:
+            yield {
+                'subject': association['subject'],
+                'subject_label': association['subject_label'],
+                'relation': association['relation'],
+                'object': obj
+            }
+
+
+def tsv_row(values):
+    return '\t'.join('' if v is None else str(v).replace('\t', ' ').replace('\n', ' ') for v in values) + '\n'
+
+
+def generate(pages, format):
+    """
+    Serialize pages of docs from iterate_pages in the given format
+    """
+    if format == 'json':
+        yield '['
+        for i, association in enumerate(compact_associations(pages)):
+            yield (',' if i else '') + json.dumps(association)
+        yield ']'
+        return
+
+    if format == 'tsv':
+        yield tsv_row(TSV_COLUMNS)
+    for docs, query, next_cursor in pages:
+        for association in flat_associations(docs, query):
+            if format == 'tsv':
+                yield tsv_row(association[column] for column in TSV_COLUMNS)
+            else:
+                yield json.dumps(association) + '\n'
+        if next_cursor is not None:
+            if format == 'tsv':
+                yield tsv_row(['#cursor', next_cursor])
+            else:
+                yield json.dumps({'cursor': next_cursor}) + '\n'
+
+
+def export(format='json', cursor=START_CURSOR, **kwargs):
+    """
+    Generator of the serialized export of the associations matching a
+    search_associations query
+    """
+    pages = iterate_pages(cursor=cursor, **kwargs)
+    # fetch the first page before the response starts, so that upstream
+    # errors get an error status rather than a truncated body
+    first = next(pages, None)
+
+    def all_pages():
+        if first is not None:
+            yield first
+            yield from pages
+
+    return generate(all_pages(), format)
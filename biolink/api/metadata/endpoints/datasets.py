@@ -1,9 +1,8 @@
 from flask_restplus import Resource
-from biolink.settings import get_biolink_config
-from ontobio.util.scigraph_util import SciGraph
+from biolink.transport import get_scigraph
 
 
-scigraph = SciGraph(get_biolink_config()['scigraph_data']['url'])
+scigraph = get_scigraph('scigraph_data')
 
 
 class MetadataForDatasets(Resource):
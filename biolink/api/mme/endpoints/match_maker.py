@@ -5,15 +5,11 @@ from flask import request, make_response
 from marshmallow import ValidationError
 
 from biolink.api.restplus import api
-from biolink.api.sim.endpoints.owlsim import get_owlsim_api
+from biolink.api.sim.endpoints.owlsim import get_sim_engine
 from biolink.datamodel.mme_serializers import mme_request_marshmallow
 from biolink.datamodel.serializers import mme
 
 from ontobio.sim.mme import query_owlsim
-from ontobio.sim.phenosim_engine import PhenoSimEngine
-
-
-sim_engine = PhenoSimEngine(get_owlsim_api())
 
 
 def get_mme_response(data, taxon: str = None):
@@ -28,7 +24,7 @@ def get_mme_response(data, taxon: str = None):
                    }
                }, 400
 
-    match_data = query_owlsim(mme_request, sim_engine, taxon=taxon)
+    match_data = query_owlsim(mme_request, get_sim_engine(), taxon=taxon)
     # Filter out Nones
     match_response = asdict(match_data, dict_factory=lambda x: {k: v for (k, v) in x if v is not None})
 
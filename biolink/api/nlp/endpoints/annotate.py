@@ -3,8 +3,7 @@ import logging
 from flask_restplus import Resource, inputs
 from biolink.datamodel.serializers import entity_annotation_result
 from biolink.api.restplus import api
-from biolink.settings import get_biolink_config
-from ontobio.util.scigraph_util import SciGraph
+from biolink.transport import get_scigraph
 
 log = logging.getLogger(__name__)
 
@@ -18,7 +17,7 @@ parser.add_argument('include_abbreviation', type=inputs.boolean, default=False,
 parser.add_argument('include_acronym', type=inputs.boolean, default=False, help='Should acronyms be included')
 parser.add_argument('include_numbers', type=inputs.boolean, default=False, help='Should numbers be included')
 
-scigraph = SciGraph(get_biolink_config()['scigraph_ontology']['url'])
+scigraph = get_scigraph('scigraph_ontology')
 
 def parse_args_for_annotator(parser):
     """
@@ -5,10 +5,14 @@ from flask_restplus import Resource
 from biolink.datamodel.serializers import association
 from biolink.api.restplus import api
 from ontobio.sparql.sparql_ontol_utils import batch_fetch_labels
+from biolink.metrics import instrumented
+from biolink.resilience import guarded
 import pysolr
 
 log = logging.getLogger(__name__)
 
+batch_fetch_labels = guarded('sparql')(instrumented('sparql')(batch_fetch_labels))
+
 parser = api.parser()
 parser.add_argument('id', action='append', help='List of ids', required=True)
 
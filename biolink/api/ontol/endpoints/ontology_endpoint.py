@@ -12,11 +12,15 @@ from ontobio.sparql.sparql_ontol_utils import run_sparql_on, EOntology, transfor
 from ontobio.golr.golr_query import GolrSearchQuery, run_solr_on, ESOLR, ESOLRDoc, replace
 
 from ontobio.ontol_factory import OntologyFactory
-from biolink.ontology.ontology_manager import get_ontology
+from biolink.ontology.ontology_manager import get_ontology, get_closure_index
+from biolink.metrics import instrumented
+from biolink.resilience import guarded
 from ontobio.io.ontol_renderers import OboJsonGraphRenderer
 
 import json
 
+run_sparql_on = guarded('sparql')(instrumented('sparql')(run_sparql_on))
+
 
 ### Some query parameters & parsers
 IS_A = "isa"
@@ -115,10 +119,10 @@ class OntologyTermSubgraph(Resource):
         ont = get_ontology("go")
         relations = args.relation
         print("Traversing: {} using {}".format(qnodes,relations))
-        nodes = ont.traverse_nodes(qnodes,
-                                   up=args.include_ancestors,
-                                   down=args.include_descendants,
-                                   relations=relations)
+        nodes = get_closure_index("go").traverse_nodes(qnodes,
+                                                       up=args.include_ancestors,
+                                                       down=args.include_descendants,
+                                                       relations=relations)
 
         subont = ont.subontology(nodes, relations=relations)
         # TODO: meta is included regardless of whether include_meta is True or False
@@ -3,7 +3,7 @@ import logging
 from flask import request
 from flask_restplus import Resource, inputs
 from biolink.api.restplus import api
-from biolink.ontology.ontology_manager import get_ontology
+from biolink.ontology.ontology_manager import get_ontology, get_closure_index
 from ontobio.io.ontol_renderers import OboJsonGraphRenderer
 from ontobio.config import get_config
 import networkx as nx
@@ -36,10 +36,10 @@ class ExtractOntologySubgraphResource(Resource):
         ont = get_ontology(ontology)
         relations = args.relation
         log.info("Traversing: {} using {}".format(qnodes,relations))
-        nodes = ont.traverse_nodes(qnodes,
-                                   up=args.include_ancestors,
-                                   down=args.include_descendants,
-                                   relations=relations)
+        nodes = get_closure_index(ontology).traverse_nodes(qnodes,
+                                                           up=args.include_ancestors,
+                                                           down=args.include_descendants,
+                                                           relations=relations)
 
         subont = ont.subontology(nodes, relations=relations)
         ojr = OboJsonGraphRenderer()
@@ -60,10 +60,10 @@ class ExtractOntologySubgraphResource(Resource):
         ont = get_ontology(ontology)
         relations = args.relation
         log.info("Traversing: {} using {}".format(qnodes,relations))
-        nodes = ont.traverse_nodes(qnodes,
-                                   up=args.include_ancestors,
-                                   down=args.include_descendants,
-                                   relations=relations)
+        nodes = get_closure_index(ontology).traverse_nodes(qnodes,
+                                                           up=args.include_ancestors,
+                                                           down=args.include_descendants,
+                                                           relations=relations)
 
         subont = ont.subontology(nodes, relations=relations)
         ojr = OboJsonGraphRenderer()
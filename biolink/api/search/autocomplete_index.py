@@ -0,0 +1,397 @@
+"""
+In-process prefix index for /search/entity/autocomplete
+
+Autocomplete is the busiest route, and sending every keystroke to Solr
+is its whole cost. Instead the ids, labels, synonyms, categories, taxa
+and equivalent ids of the search core are exported and indexed once,
+ahead of deployment, with
+
+    python -m biolink.api.search.autocomplete_index /path/to/index
+
+which writes a directory holding the documents (docs.jsonl) and, as
+.npy arrays and one buffer of keys, the lowercased keys of the index
+in sorted order with their postings and the fields filtered on. Workers
+memory-map these, so loading takes no time and all workers share one
+copy in the page cache. Keys are the labels and synonyms from each of
+their words on, so "atro" matches "muscle atrophy", and the ids and
+equivalent ids; the keys starting with a term are found by binary
+search.
+
+The postings of those keys are filtered (category, taxon, prefix,
+groups) as they are scanned, and matches ranked exact first, then label
+before synonym before id matches, then shorter matches first. Terms
+with more than MAX_CANDIDATES postings are ranked among the matches of
+their first MAX_CANDIDATES postings, or sent to Solr if those hold
+fewer than start + rows matches. Requests with parameters the index
+cannot answer (fq, boosts, min_match, minimal_tokenizer) go to Solr,
+as does everything when no index is configured.
+"""
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+FIELDS = ['id', 'label', 'synonym', 'category', 'taxon', 'taxon_label', 'equivalent_curie', 'prefix', 'leaf']
+# parameters of simple_parser answered by Solr only
+UNSUPPORTED_PARAMS = ['fq', 'boost_fx', 'boost_q', 'min_match', 'minimal_tokenizer']
+
+LABEL = 0
+SYNONYM = 1
+IDENTIFIER = 2
+
+# postings scanned per query, in key order, before ranking
+MAX_CANDIDATES = 10000
+HIGHLIGHT_CLASS = 'hilite'
+EXPORT_PAGE_SIZE = 10000
+
+DOCS = 'docs.jsonl'
+KEYS = 'keys.bin'
+# written last: a directory without it is not loaded
+META = 'index.json'
+# per document: offset in docs.jsonl, and the fields filtered on
+DOC_ARRAYS = ['doc_offsets', 'leaf', 'taxon', 'prefix', 'category_indptr', 'category_indices',
+              'eq_prefix_indptr', 'eq_prefix_indices']
+# per key: offset in keys.bin, document, kind, index of the value of
+# that kind it is from, character offset in that value, value length
+POSTING_ARRAYS = ['key_offsets', 'posting_doc', 'posting_kind', 'posting_value', 'posting_offset',
+                  'posting_length']
+
+WORD_START = re.compile(r'(?<![^\W_])[^\W_]')
+
+index = None
+failed = False
+lock = threading.Lock()
+
+
+def get_index_config():
+    return get_biolink_config().get('autocomplete') or {}
+
+
+def normalize(text):
+    return text.lower()
+
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def read_doc(line):
+    """
+    A document of docs.jsonl, with missing fields filled in
+    """
+    doc = json.loads(line)
+    return {
+        'id': doc['id'],
+        'label': as_list(doc.get('label')),
+        'synonym': as_list(doc.get('synonym')),
+        'category': as_list(doc.get('category')),
+        'taxon': doc.get('taxon') or '',
+        'taxon_label': doc.get('taxon_label') or '',
+        'equivalent_curie': as_list(doc.get('equivalent_curie')),
+        'prefix': doc.get('prefix') or doc['id'].split(':', 1)[0],
+        'leaf': doc.get('leaf'),
+    }
+
+
+def doc_values(doc, kind):
+    if kind == LABEL:
+        return doc['label']
+    if kind == SYNONYM:
+        return doc['synonym']
+    return [doc['id']] + doc['equivalent_curie']
+
+
+def is_leaf(doc):
+    return str(doc['leaf']) in ('1', 'True', 'true')
+
+
+def intern(vocabulary, value):
+    return vocabulary.setdefault(value, len(vocabulary))
+
+
+def build_index(path):
+    """
+    Index the docs.jsonl of a directory written by export_index,
+    writing the arrays AutocompleteIndex.load memory-maps next to it
+    """
+    started = time.perf_counter()
+    docs = []
+    with open(os.path.join(path, DOCS), 'rb') as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                docs.append((offset, read_doc(line)))
+            offset += len(line)
+    # documents are numbered in id order, the last tie breaker of ranking
+    docs.sort(key=lambda entry: entry[1]['id'])
+
+    taxa, prefixes, categories = {}, {}, {}
+    columns = {name: [] for name in DOC_ARRAYS}
+    columns['category_indptr'].append(0)
+    columns['eq_prefix_indptr'].append(0)
+    postings = []
+    for i, (offset, doc) in enumerate(docs):
+        columns['doc_offsets'].append(offset)
+        columns['leaf'].append(is_leaf(doc))
+        columns['taxon'].append(intern(taxa, doc['taxon']) if doc['taxon'] else -1)
+        columns['prefix'].append(intern(prefixes, doc['prefix']))
+        columns['category_indices'] += [intern(categories, c) for c in doc['category']]
+        columns['category_indptr'].append(len(columns['category_indices']))
+        columns['eq_prefix_indices'] += [intern(prefixes, eq.split(':', 1)[0]) for eq in doc['equivalent_curie']]
+        columns['eq_prefix_indptr'].append(len(columns['eq_prefix_indices']))
+        for kind in (LABEL, SYNONYM, IDENTIFIER):
+            for value, text in enumerate(doc_values(doc, kind)):
+                key = normalize(text)
+                starts = [0] if kind == IDENTIFIER else [word.start() for word in WORD_START.finditer(key)]
+                for start in starts:
+                    postings.append((key[start:].encode('utf-8'), i, kind, value, start, len(text)))
+    # UTF-8 byte order is code point order, so prefixes stay contiguous
+    postings.sort(key=lambda p: p[0])
+
+    with open(os.path.join(path, KEYS), 'wb') as f:
+        for posting in postings:
+            f.write(posting[0])
+    arrays = {
+        'doc_offsets': np.array(columns['doc_offsets'], dtype=np.int64),
+        'leaf': np.array(columns['leaf'], dtype=np.bool_),
+        'taxon': np.array(columns['taxon'], dtype=np.int32),
+        'prefix': np.array(columns['prefix'], dtype=np.int32),
+        'category_indptr': np.array(columns['category_indptr'], dtype=np.int64),
+        'category_indices': np.array(columns['category_indices'], dtype=np.int32),
+        'eq_prefix_indptr': np.array(columns['eq_prefix_indptr'], dtype=np.int64),
+        'eq_prefix_indices': np.array(columns['eq_prefix_indices'], dtype=np.int32),
+        'key_offsets': np.cumsum([0] + [len(p[0]) for p in postings], dtype=np.int64),
+        'posting_doc': np.array([p[1] for p in postings], dtype=np.int32),
+        'posting_kind': np.array([p[2] for p in postings], dtype=np.int8),
+        'posting_value': np.array([p[3] for p in postings], dtype=np.int32),
+        'posting_offset': np.array([p[4] for p in postings], dtype=np.int32),
+        'posting_length': np.array([p[5] for p in postings], dtype=np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), array)
+    with open(os.path.join(path, META), 'w') as f:
+        json.dump({'taxa': list(taxa), 'prefixes': list(prefixes), 'categories': list(categories)}, f)
+    log.info("Indexed {} documents ({} keys) for autocomplete in {:.1f}s".format(
+        len(docs), len(postings), time.perf_counter() - started))
+
+
+def map_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Keys(object):
+    """
+    Sorted keys of an index, stored end to end in one buffer
+    """
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+
+class AutocompleteIndex(object):
+    """
+    Memory-mapped index written by build_index, see the module docstring
+    """
+    @classmethod
+    def load(cls, path):
+        """
+        Map the index in a directory written by export_index
+        """
+        index = cls()
+        with open(os.path.join(path, META), 'r') as f:
+            meta = json.load(f)
+        index.taxon_ids = {taxon: i for i, taxon in enumerate(meta['taxa'])}
+        index.prefix_ids = {prefix: i for i, prefix in enumerate(meta['prefixes'])}
+        index.category_ids = {category: i for i, category in enumerate(meta['categories'])}
+        for name in DOC_ARRAYS + POSTING_ARRAYS:
+            setattr(index, name, np.load(os.path.join(path, name + '.npy'), mmap_mode='r'))
+        index.docs = map_file(os.path.join(path, DOCS))
+        index.keys = Keys(map_file(os.path.join(path, KEYS)), index.key_offsets)
+        return index
+
+    def __len__(self):
+        return len(self.doc_offsets)
+
+    def doc(self, i):
+        start = int(self.doc_offsets[i])
+        end = self.docs.find(b'\n', start)
+        return read_doc(self.docs[start:end if end >= 0 else len(self.docs)])
+
+    @staticmethod
+    def supports(args):
+        return not any(args.get(param) for param in UNSUPPORTED_PARAMS)
+
+    def autocomplete(self, term, category=None, prefix=None, include_eqs=False, taxon=None, rows=20,
+                     start=0, exclude_groups=False, highlight_class=None, **kwargs):
+        """
+        Autocomplete results for term, in the shape of
+        GolrSearchQuery.autocomplete, or None if they are left to Solr
+        """
+        query = normalize(term.strip())
+        start = int(start or 0)
+        matches = {}
+        if query:
+            key_prefix = query.encode('utf-8')
+            first = bisect_left(self.keys, key_prefix)
+            # 0xff never occurs in UTF-8, so this is past every key starting with the prefix
+            last = bisect_left(self.keys, key_prefix + b'\xff', first)
+            accepts = self.filter(category, prefix, include_eqs, taxon, exclude_groups)
+            accepted = {}
+            for n in range(first, min(last, first + MAX_CANDIDATES)):
+                i = int(self.posting_doc[n])
+                if i not in accepted:
+                    accepted[i] = accepts(i)
+                if not accepted[i]:
+                    continue
+                exact = int(self.posting_offset[n]) == 0 and len(self.keys[n]) == len(key_prefix)
+                rank = (not exact, int(self.posting_kind[n]), int(self.posting_length[n]), i)
+                if i not in matches or rank < matches[i][0]:
+                    matches[i] = (rank, n)
+            if last - first > MAX_CANDIDATES and len(matches) < start + rows:
+                return None
+
+        docs = []
+        for rank, n in sorted(matches.values())[start:start + rows]:
+            doc = self.doc(rank[-1])
+            text = doc_values(doc, int(self.posting_kind[n]))[int(self.posting_value[n])]
+            offset = int(self.posting_offset[n])
+            end = offset + len(query)
+            docs.append({
+                'id': doc['id'],
+                'label': doc['label'],
+                'match': text,
+                'category': doc['category'],
+                'taxon': doc['taxon'],
+                'taxon_label': doc['taxon_label'],
+                'highlight': '{}<em class="{}">{}</em>{}'.format(
+                    text[:offset], highlight_class or HIGHLIGHT_CLASS, text[offset:end], text[end:]),
+                'has_highlight': True,
+                'equivalent_ids': doc['equivalent_curie'],
+            })
+        return {'docs': docs}
+
+    def filter(self, category=None, prefix=None, include_eqs=False, taxon=None, exclude_groups=False):
+        """
+        Predicate on document numbers applying the filters
+        GolrSearchQuery turns into fq
+        """
+        categories = {self.category_ids.get(c) for c in category or []}
+        taxa = {self.taxon_ids.get(t) for t in taxon or []}
+        positive = {self.prefix_ids.get(p) for p in prefix or [] if not p.startswith('-')}
+        negative = {self.prefix_ids.get(p[1:]) for p in prefix or [] if p.startswith('-')}
+
+        def accepts(i):
+            if category and categories.isdisjoint(self.category_indices[
+                    self.category_indptr[i]:self.category_indptr[i + 1]].tolist()):
+                return False
+            if taxon and int(self.taxon[i]) not in taxa:
+                return False
+            if exclude_groups and not self.leaf[i]:
+                return False
+            if prefix:
+                doc_prefix = int(self.prefix[i])
+                eq_prefixes = set(self.eq_prefix_indices[
+                    self.eq_prefix_indptr[i]:self.eq_prefix_indptr[i + 1]].tolist()) if include_eqs else set()
+                if positive and doc_prefix not in positive and positive.isdisjoint(eq_prefixes):
+                    return False
+                if doc_prefix in negative and (not include_eqs or doc_prefix in eq_prefixes):
+                    return False
+            return True
+        return accepts
+
+
+def load_index(path):
+    try:
+        return AutocompleteIndex.load(path)
+    except Exception as e:
+        log.error("Could not load autocomplete index {}: {}".format(path, e))
+        return None
+
+
+def get_autocomplete_index():
+    """
+    The configured index, or None if there is none, the first call
+    mapping it
+    """
+    global index, failed
+    path = get_index_config().get('index')
+    if not path:
+        return None
+    with lock:
+        if index is None and not failed and os.path.exists(os.path.join(path, META)):
+            index = load_index(path)
+            failed = index is None
+        return index
+
+
+def export_index(path, page_size=EXPORT_PAGE_SIZE):
+    """
+    Write the documents of the search Solr, one JSON object per line,
+    and their index to the directory path, replacing any existing one
+    """
+    from biolink.transport import get_service_config, get_solr
+
+    config = get_service_config('solr_search')
+    solr = get_solr(config['url'], config.get('timeout', 2))
+    staging = path.rstrip('/') + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    cursor = '*'
+    count = 0
+    with open(os.path.join(staging, DOCS), 'w') as f:
+        while True:
+            results = solr.search('*:*', fl=','.join(FIELDS), sort='id asc', rows=page_size, cursorMark=cursor)
+            for doc in results.docs:
+                f.write(json.dumps(doc) + '\n')
+            count += len(results.docs)
+            log.info("Exported {} documents".format(count))
+            if results.nextCursorMark is None or results.nextCursorMark == cursor:
+                break
+            cursor = results.nextCursorMark
+    build_index(staging)
+    # workers keep the files they have mapped until they reload
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(staging, path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export and index the search Solr for autocomplete')
+    parser.add_argument('path', help='directory to write')
+    parser.add_argument('--build-only', action='store_true',
+                        help='only rebuild the index of the docs.jsonl already in path')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.build_only:
+        build_index(args.path)
+    else:
+        export_index(args.path)
+
+
+if __name__ == "__main__":
+    main()
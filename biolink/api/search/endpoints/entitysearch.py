@@ -5,6 +5,7 @@ from flask_restplus import Resource, inputs
 from biolink.api.restplus import api
 from biolink.datamodel.serializers import search_result, autocomplete_results, lay_results
 from ontobio.golr.golr_query import GolrSearchQuery, GolrLayPersonSearch
+from biolink.api.search.autocomplete_index import get_autocomplete_index
 from biolink import USER_AGENT
 
 log = logging.getLogger(__name__)
@@ -145,6 +146,11 @@ class Autocomplete(Resource):
         Returns list of matching concepts or entities using lexical search
         """
         args = simple_parser.parse_args()
+        index = get_autocomplete_index()
+        if index is not None and index.supports(args):
+            results = index.autocomplete(term, **args)
+            if results is not None:
+                return results
         args['fq_string'] = copy.copy(args['fq'])
         args['fq'] = {}
         q = GolrSearchQuery(term, user_agent=USER_AGENT, **args)
@@ -0,0 +1,90 @@
+"""
+Comparison of a reference profile with many query profiles
+
+PhenoSimEngine.compare resolves, scores and labels query profiles one
+at a time. Here the upstream lookups for all profiles (resolving
+genes or diseases to phenotypes, labelling the profiles) run
+concurrently. Sim apis with a compare_profiles method, such as
+LocalSimApi, then score every profile in one pass over the reference.
+Other sim apis are called concurrently, once per profile. Matches are
+returned best first, with their ranks.
+"""
+from functools import partial
+
+from ontobio.model.similarity import TypedNode
+from ontobio.sim.phenosim_engine import PhenoSimEngine
+from ontobio.util.scigraph_util import typed_node_from_id
+
+from biolink.executor import run_concurrently
+
+
+def profile_node(ids):
+    """
+    Node for a profile, as set by PhenoSimEngine.compare
+    """
+    if len(ids) == 1:
+        return typed_node_from_id(ids[0])
+    id = " + ".join(ids)
+    return TypedNode(id=id, label=id, type='unknown')
+
+
+def rank_matches(result):
+    """
+    Sort the matches of a compare result, and their target ids, best
+    first; equal scores share a rank
+    """
+    ranked = sorted(zip(result.matches, result.query.target_ids), key=lambda pair: -pair[0].score)
+    rank = 0
+    previous = None
+    for match, _ in ranked:
+        if previous is None or match.score < previous:
+            rank += 1
+        match.rank = rank
+        previous = match.score
+    result.matches = [match for match, _ in ranked]
+    result.query.target_ids = [target_ids for _, target_ids in ranked]
+    return result
+
+
+def compare(engine, reference_ids, query_profiles, method, is_feature_set=True):
+    """
+    Compare reference_ids with each of query_profiles using a PhenoSimEngine
+
+    :return: SimResult with one match per query profile, ranked by score
+    :raises NotImplementedError: If the sim method is not supported
+    """
+    sim_api = engine.sim_api
+    if method not in sim_api.matchers():
+        raise NotImplementedError("Sim method not implemented in {}".format(str(sim_api)))
+
+    compare_profiles = getattr(sim_api, 'compare_profiles', None)
+    if compare_profiles is None:
+        if len(query_profiles) < 2:
+            return rank_matches(engine.compare(reference_ids, query_profiles, method, is_feature_set))
+        results = run_concurrently([
+            partial(engine.compare, reference_ids, [profile], method, is_feature_set)
+            for profile in query_profiles
+        ])
+        result = results[0]
+        for other in results[1:]:
+            result.matches.extend(other.matches)
+            result.query.target_ids.extend(other.query.target_ids)
+        return rank_matches(result)
+
+    profiles = [reference_ids] + list(query_profiles)
+    calls = [partial(profile_node, ids) for ids in profiles]
+    if not is_feature_set:
+        calls += [partial(PhenoSimEngine._resolve_nodes_to_phenotypes, ids) for ids in profiles]
+    found = run_concurrently(calls)
+    nodes = found[:len(profiles)]
+    phenotypes = found[len(profiles):] if not is_feature_set else profiles
+
+    result = compare_profiles(phenotypes[0], phenotypes[1:], method)
+    for match, ids, node in zip(result.matches, query_profiles, nodes[1:]):
+        match.id = node.id
+        match.label = node.label
+        if len(ids) == 1:
+            match.type = node.type
+            match.taxon = node.taxon
+    result.query.reference = nodes[0]
+    return rank_matches(result)
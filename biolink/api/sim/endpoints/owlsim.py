@@ -9,9 +9,17 @@ TODO revisit this design decision as it feels wrong
 possibly use https://flask.palletsprojects.com/en/2.0.x/appcontext/
 """
 from ontobio.sim.api.owlsim2 import OwlSim2Api
+from ontobio.sim.phenosim_engine import PhenoSimEngine
+
+from biolink.coalesce import SingleFlight
+from biolink.settings import get_biolink_config
 
 
 owlsim_api = None
+sim_engine = None
+# the local engine reads every profile on creation: one creation at a
+# time in this process, its waiters always released when it ends
+engine_builds = SingleFlight(wait_timeout=None)
 
 
 def get_owlsim_api():
@@ -22,3 +30,40 @@ def get_owlsim_api():
         owlsim_api = OwlSim2Api()
 
     return owlsim_api
+
+
+def use_local_sim():
+    """
+    True if sim.engine in config.yaml selects the in-process engine
+    rather than the OwlSim2 service
+    """
+    sim_config = get_biolink_config().get('sim') or {}
+    return sim_config.get('engine', 'owlsim2') == 'local'
+
+
+def get_sim_api_class():
+    if use_local_sim():
+        from biolink.api.sim.local_sim import LocalSimApi
+        return LocalSimApi
+    return OwlSim2Api
+
+
+def get_sim_engine():
+    """
+    PhenoSimEngine over the configured similarity api
+    """
+    if sim_engine is None:
+        engine_builds.do('sim_engine', create_sim_engine)
+    return sim_engine
+
+
+def create_sim_engine():
+    global sim_engine
+
+    if sim_engine is not None:
+        return
+    if use_local_sim():
+        from biolink.api.sim.local_sim import LocalSimApi
+        sim_engine = PhenoSimEngine(LocalSimApi.from_config())
+    else:
+        sim_engine = PhenoSimEngine(get_owlsim_api())
@@ -1,13 +1,12 @@
 from flask_restplus import Resource, inputs
 from flask import request
-from ontobio.sim.api.owlsim2 import OwlSim2Api
-from ontobio.sim.phenosim_engine import PhenoSimEngine
 from ontobio.vocabulary.similarity import SimAlgorithm
 from biolink.api.restplus import api
-from biolink.api.sim.endpoints.owlsim import get_owlsim_api
+from biolink.api.sim.compare import compare
+from biolink.api.sim.endpoints.owlsim import get_sim_api_class, get_sim_engine
 from biolink.datamodel.sim_serializers import sim_result, compare_input
 
-metrics = [matcher.value for matcher in OwlSim2Api.matchers()]
+metrics = [matcher.value for matcher in get_sim_api_class().matchers()]
 
 # Common args
 sim_parser = api.parser()
@@ -73,8 +72,6 @@ sim_search_parser = get_search_parser()
 
 class SimSearch(Resource):
 
-    sim_engine = PhenoSimEngine(get_owlsim_api())
-
     @api.expect(sim_search_parser)
     @api.marshal_with(sim_result)
     def get(self):
@@ -86,7 +83,7 @@ class SimSearch(Resource):
         if input_args['limit'] > 500:
             input_args['limit'] = 500
 
-        return SimCompare.sim_engine.search(
+        return get_sim_engine().search(
             id_list=input_args['id'],
             limit=input_args['limit'],
             taxon_filter=input_args['taxon'],
@@ -97,13 +94,11 @@ class SimSearch(Resource):
 
 class SimCompare(Resource):
 
-    sim_engine = PhenoSimEngine(get_owlsim_api())
-
     @api.expect(compare_input)
     @api.marshal_with(sim_result)
     def post(self):
         """
-        Compare a reference profile vs one or more profiles
+        Compare a reference profile vs one or more profiles, best match first
         """
         data = request.json
         if 'metric' not in data:
@@ -112,7 +107,8 @@ class SimCompare(Resource):
         if 'is_feature_set' not in data:
             data['is_feature_set'] = True
 
-        return SimCompare.sim_engine.compare(
+        return compare(
+            get_sim_engine(),
             reference_ids=data['reference_ids'],
             query_profiles=data['query_ids'],
             method=SimAlgorithm(data['metric']),
@@ -127,7 +123,8 @@ class SimCompare(Resource):
         """
         input_args = sim_compare_parser.parse_args()
 
-        return SimCompare.sim_engine.compare(
+        return compare(
+            get_sim_engine(),
             reference_ids=input_args['ref_id'],
             query_profiles=[input_args['query_id']],
             method=SimAlgorithm(input_args['metric']),
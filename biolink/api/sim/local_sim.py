@@ -0,0 +1,425 @@
+"""
+In-process phenotype similarity over locally loaded annotation profiles
+
+An alternative to the OwlSim2 service for /sim/search and /sim/compare,
+selected with sim.engine: local in config.yaml. Profiles (diseases,
+genes, ...) and their phenotypes are read from a TSV file written by
+
+    python -m biolink.api.sim.local_sim profiles.tsv
+
+and expanded over the subClassOf closure of the configured ontology
+(a combined ontology such as upheno is needed to compare across
+species) into a term x profile sparse matrix. The information content
+(IC) of a term is -log2 of the fraction of profiles annotated to it or
+one of its descendants. A query is scored against all profiles at once:
+
+ - jaccard: |Q & P| / |Q | P| over the closures of query and profile
+ - simGIC: the same ratio over the summed IC of the terms
+ - resnik: the mean over query terms of the IC of their most informative
+   ancestor in the profile closure, as owlsim2 bmaAsymIC
+ - phenodigm: the mean of the best and the average of those IC values,
+   each as a percentage of the query matched against itself, as the
+   owlsim2 combinedScore
+"""
+import csv
+import logging
+import time
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix, identity
+from ontobio.golr.golr_query import GolrFields
+from ontobio.model.similarity import SimResult, SimMatch, SimQuery, SimMetadata, \
+    PairwiseMatch, ICNode, Node
+from ontobio.sim.api.interfaces import SimApi, FilteredSearchable
+from ontobio.vocabulary.similarity import SimAlgorithm
+
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+M = GolrFields()
+
+RELATIONS = ['subClassOf']
+COLUMNS = ['id', 'label', 'category', 'taxon', 'taxon_label', 'phenotype']
+HUMAN = 'NCBITaxon:9606'
+
+# profiles exported by default: human diseases and model organism genes
+DEFAULT_SOURCES = [
+    ('disease', HUMAN),
+    ('gene', HUMAN),
+    ('gene', 'NCBITaxon:10090'),
+    ('gene', 'NCBITaxon:7955'),
+    ('gene', 'NCBITaxon:7227'),
+    ('gene', 'NCBITaxon:6239'),
+    ('gene', 'NCBITaxon:8353'),
+]
+
+Profile = namedtuple('Profile', ['id', 'label', 'category', 'taxon', 'taxon_label', 'phenotypes'])
+
+
+def read_profiles(path):
+    """
+    Read profiles from a TSV file with one row per profile and phenotype
+    """
+    profiles = OrderedDict()
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f, delimiter='\t'):
+            profile = profiles.get(row['id'])
+            if profile is None:
+                profile = Profile(row['id'], row['label'], row['category'],
+                                  row['taxon'], row['taxon_label'], [])
+                profiles[row['id']] = profile
+            profile.phenotypes.append(row['phenotype'])
+    return list(profiles.values())
+
+
+def annotation_matrix(annotations, n_terms):
+    """
+    profiles x terms matrix of the terms each profile is annotated with
+    """
+    indptr = np.cumsum([0] + [len(terms) for terms in annotations])
+    indices = np.concatenate(annotations) if annotations else np.empty(0)
+    matrix = csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices.astype(np.int32), indptr),
+        shape=(len(annotations), n_terms)
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+class ProfileSet(object):
+    """
+    The closures of a set of profiles, as the CSR arrays of a term x
+    profile matrix: the profiles annotated to term i, directly or through
+    a descendant, are indices[indptr[i]:indptr[i + 1]]
+    """
+    def __init__(self, annotations, ancestors, ic=None):
+        closure = annotation_matrix(annotations, ancestors.shape[0]).dot(ancestors)
+        closure.data[:] = 1
+        by_term = closure.transpose().tocsr()
+        self.annotations = annotations
+        self.indptr = by_term.indptr
+        self.indices = by_term.indices
+        self.sizes = np.diff(closure.indptr)
+        self.sum_ic = None
+        self._closure = closure
+        if ic is not None:
+            self.set_ic(ic)
+
+    def __len__(self):
+        return len(self.annotations)
+
+    def set_ic(self, ic):
+        self.sum_ic = self._closure.dot(ic)
+        self._closure = None
+
+    def annotated(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def counts(self):
+        """
+        Number of profiles annotated to each term
+        """
+        return np.diff(self.indptr)
+
+
+class LocalSimApi(SimApi, FilteredSearchable):
+    """
+    Similarity search and comparison of phenotype profiles, scored in
+    process from a ClosureIndex and a list of Profiles
+    """
+    def __init__(self, index, ont, profiles):
+        started = time.perf_counter()
+        self.index = index
+        self.ont = ont
+        closure = index.get_closure(RELATIONS)
+        n = len(index)
+        self.ancestors = csr_matrix(
+            (np.ones(len(closure.ancestors_indices), dtype=np.float32),
+             closure.ancestors_indices, closure.ancestors_indptr),
+            shape=(n, n)
+        ) + identity(n, dtype=np.float32, format='csr')
+
+        annotations = []
+        kept = []
+        missing = 0
+        for profile in profiles:
+            terms = [index.index[id] for id in profile.phenotypes if id in index.index]
+            missing += len(profile.phenotypes) - len(terms)
+            if terms:
+                annotations.append(np.unique(terms))
+                kept.append(profile)
+        if missing:
+            log.warning("{} profile phenotypes are not in the ontology".format(missing))
+
+        self.ids = [p.id for p in kept]
+        self.labels = [p.label for p in kept]
+        self.taxon_labels = [p.taxon_label for p in kept]
+        self.categories = np.array([p.category for p in kept])
+        self.taxa = np.array([p.taxon for p in kept])
+
+        self.profiles = ProfileSet(annotations, self.ancestors)
+        counts = self.profiles.counts()
+        max_ic = np.log2(max(len(kept), 1))
+        with np.errstate(divide='ignore'):
+            self.ic = np.where(counts > 0, -np.log2(counts / max(len(kept), 1)), max_ic)
+        self.max_max_ic = float(self.ic[counts > 0].max()) if len(kept) else 0.0
+        self.profiles.set_ic(self.ic)
+        log.info("Indexed {} phenotype profiles in {:.2f}s".format(len(kept), time.perf_counter() - started))
+
+    @classmethod
+    def from_config(cls):
+        from biolink.ontology.ontology_manager import get_ontology, get_closure_index
+        local_config = (get_biolink_config().get('sim') or {}).get('local') or {}
+        ontology = local_config.get('ontology', 'hp')
+        return cls(get_closure_index(ontology), get_ontology(ontology), read_profiles(local_config['profiles']))
+
+    @staticmethod
+    def matchers():
+        return [
+            SimAlgorithm.PHENODIGM,
+            SimAlgorithm.JACCARD,
+            SimAlgorithm.SIM_GIC,
+            SimAlgorithm.RESNIK
+        ]
+
+    def search(self, id_list, negated_classes, limit=100, method=SimAlgorithm.PHENODIGM):
+        return self.filtered_search(id_list, negated_classes, limit, None, None, method)
+
+    def filtered_search(self, id_list, negated_classes, limit=100, taxon_filter=None,
+                        category_filter=None, method=SimAlgorithm.PHENODIGM):
+        if negated_classes:
+            log.warning("Negated classes are not supported, ignoring {}".format(negated_classes))
+        query, unresolved = self.resolve(id_list)
+        matches = []
+        if len(query):
+            scores = self.score(query, self.profiles, method)
+            candidates = np.flatnonzero((scores > 0) & self.filter_mask(taxon_filter, category_filter))
+            ordered = self.ancestor_order(query)
+            matches = [
+                SimMatch(
+                    id=self.ids[j],
+                    label=self.labels[j],
+                    type=str(self.categories[j]),
+                    taxon=Node(str(self.taxa[j]), self.taxon_labels[j]),
+                    rank=rank,
+                    score=float(scores[j]),
+                    significance="NaN",
+                    pairwise_match=self.pairwise_matches(ordered, self.profiles, j)
+                )
+                for j, rank in ranked(scores, candidates, limit)
+            ]
+        return SimResult(
+            query=SimQuery(ids=self.nodes(query), unresolved_ids=unresolved, target_ids=[[]]),
+            matches=matches,
+            metadata=SimMetadata(max_max_ic=self.max_max_ic)
+        )
+
+    def compare(self, reference_classes, query_classes, method=SimAlgorithm.PHENODIGM):
+        return self.compare_profiles(reference_classes, [query_classes], method)
+
+    def compare_profiles(self, reference_classes, query_profiles, method=SimAlgorithm.PHENODIGM):
+        """
+        Compare a reference profile with each of a list of query profiles;
+        the reference closure and IC are computed once, and all the query
+        profiles are scored against it together
+
+        :return: SimResult with one match per query profile, in order
+        """
+        reference, unresolved = self.resolve(reference_classes)
+        resolved = [self.resolve(query_classes) for query_classes in query_profiles]
+        profiles = ProfileSet([query for query, _ in resolved], self.ancestors, self.ic)
+        if len(reference):
+            scores = self.score(reference, profiles, method)
+        else:
+            scores = np.zeros(len(profiles))
+        for _, query_unresolved in resolved:
+            unresolved.extend(query_unresolved)
+        ordered = self.ancestor_order(reference)
+        return SimResult(
+            query=SimQuery(
+                ids=self.nodes(reference),
+                unresolved_ids=unresolved,
+                target_ids=[self.nodes(query) for query, _ in resolved]
+            ),
+            matches=[
+                SimMatch(
+                    id="",
+                    label="",
+                    rank="NaN",
+                    score=float(scores[j]),
+                    significance="NaN",
+                    pairwise_match=self.pairwise_matches(ordered, profiles, j)
+                )
+                for j in range(len(profiles))
+            ],
+            metadata=SimMetadata(max_max_ic=self.max_max_ic)
+        )
+
+    def resolve(self, id_list):
+        """
+        Term indices of the ids in the ontology, and the ids that are not
+        """
+        found = [self.index.index[id] for id in id_list if id in self.index.index]
+        unresolved = [id for id in id_list if id not in self.index.index]
+        return np.unique(np.array(found, dtype=np.int32)), unresolved
+
+    def reflexive_ancestors(self, i):
+        return np.append(self.index.ancestor_indices(i, RELATIONS), i)
+
+    def query_closure(self, query):
+        return np.unique(np.concatenate([self.reflexive_ancestors(i) for i in query]))
+
+    def score(self, query, profiles, method):
+        """
+        Similarity of a query, as term indices, to every profile in a ProfileSet
+        """
+        if method == SimAlgorithm.JACCARD or method == SimAlgorithm.SIM_GIC:
+            closure = self.query_closure(query)
+            slices = [profiles.annotated(i) for i in closure]
+            matched = np.concatenate(slices)
+            if method == SimAlgorithm.JACCARD:
+                shared = np.bincount(matched, minlength=len(profiles))
+                union = len(closure) + profiles.sizes - shared
+            else:
+                weights = np.repeat(self.ic[closure], [len(s) for s in slices])
+                shared = np.bincount(matched, weights=weights, minlength=len(profiles))
+                union = self.ic[closure].sum() + profiles.sum_ic - shared
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.nan_to_num(shared / union)
+
+        best = self.best_matches(query, profiles)
+        resnik = best.mean(axis=0)
+        if method == SimAlgorithm.RESNIK:
+            return resnik
+        if method == SimAlgorithm.PHENODIGM:
+            optimal = self.ic[query]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.nan_to_num(100 * (best.max(axis=0) / optimal.max() + resnik / optimal.mean()) / 2)
+        raise NotImplementedError("Sim method {} not implemented in {}".format(method, self))
+
+    def best_matches(self, query, profiles):
+        """
+        query terms x profiles array of the IC of the most informative
+        ancestor of each query term in the closure of each profile
+        """
+        best = np.zeros((len(query), len(profiles)), dtype=np.float64)
+        for row, i in enumerate(query):
+            ancestors = self.reflexive_ancestors(i)
+            # most informative last, so that it overwrites the others
+            for t in ancestors[np.argsort(self.ic[ancestors], kind='stable')]:
+                best[row, profiles.annotated(t)] = self.ic[t]
+        return best
+
+    def ancestor_order(self, query):
+        """
+        (term, reflexive ancestors most informative first) for each query
+        term; the term itself comes first among equally informative ones
+        """
+        ordered = []
+        for i in query:
+            ancestors = np.append(i, self.index.ancestor_indices(i, RELATIONS))
+            ordered.append((i, ancestors[np.argsort(-self.ic[ancestors], kind='stable')].tolist()))
+        return ordered
+
+    def pairwise_matches(self, ordered, profiles, j):
+        """
+        The best match in profile j for each query term, and their most
+        informative common ancestor
+
+        :param ordered: ancestor_order of the query
+        """
+        closures = {p: set(self.reflexive_ancestors(p).tolist()) for p in profiles.annotations[j].tolist()}
+        closure = set().union(*closures.values())
+        matches = []
+        for i, ancestors in ordered:
+            lcs = next((t for t in ancestors if t in closure), None)
+            if lcs is None:
+                continue
+            match = max((p for p, ancestors in closures.items() if lcs in ancestors), key=lambda p: self.ic[p])
+            matches.append(PairwiseMatch(
+                reference=self.ic_node(i),
+                match=self.ic_node(match),
+                lcs=self.ic_node(lcs)
+            ))
+        return matches
+
+    def filter_mask(self, taxon_filter=None, category_filter=None):
+        """
+        Profiles of a taxon and category; as owlsim2, a taxon without a
+        category means human diseases or the genes of other species
+        """
+        if taxon_filter is None:
+            if category_filter is not None:
+                raise ValueError("Must provide taxon filter along with category")
+            return np.ones(len(self.ids), dtype=bool)
+        taxon = taxon_filter if ':' in taxon_filter else 'NCBITaxon:' + taxon_filter
+        if category_filter is None:
+            category_filter = 'disease' if taxon == HUMAN else 'gene'
+        return (self.taxa == taxon) & (self.categories == category_filter.lower())
+
+    def nodes(self, indices):
+        return [Node(self.index.ids[i], self.ont.label(self.index.ids[i])) for i in indices]
+
+    def ic_node(self, i):
+        id = self.index.ids[i]
+        return ICNode(id=id, label=self.ont.label(id), IC=float(self.ic[i]))
+
+    def __str__(self):
+        return "local sim api: {} profiles".format(len(self.ids))
+
+
+def ranked(scores, candidates, limit=None):
+    """
+    (index, rank) of the highest scoring candidates, best first; equal
+    scores share a rank, as owlsim2 ranks results
+    """
+    order = candidates[np.argsort(-scores[candidates], kind='stable')]
+    if limit is not None:
+        order = order[:limit]
+    rank = 0
+    previous = None
+    for j in order:
+        if previous is None or scores[j] < previous:
+            rank += 1
+        previous = scores[j]
+        yield j, rank
+
+
+def export_profiles(path, sources=DEFAULT_SOURCES):
+    """
+    Write the phenotype profiles of the given (category, taxon) sources
+    from the association Solr to a TSV file
+    """
+    from biolink.api.mart.export import iterate_pages, tsv_row
+
+    with open(path, 'w') as f:
+        f.write(tsv_row(COLUMNS))
+        for category, taxon in sources:
+            log.info("Exporting {} {} phenotype profiles".format(taxon, category))
+            pages = iterate_pages(subject_category=category, object_category='phenotype', subject_taxon=taxon)
+            for docs, query, cursor in pages:
+                for doc in docs:
+                    f.write(tsv_row([
+                        doc.get(M.SUBJECT), doc.get(M.SUBJECT_LABEL), category,
+                        doc.get(M.SUBJECT_TAXON), doc.get(M.SUBJECT_TAXON_LABEL), doc.get(M.OBJECT)
+                    ]))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export phenotype profiles for the local sim engine')
+    parser.add_argument('path', help='TSV file to write')
+    parser.add_argument('--source', action='append', metavar='CATEGORY:TAXON',
+                        help='e.g. gene:NCBITaxon:10090; defaults to diseases and model organism genes')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sources = [tuple(s.split(':', 1)) for s in args.source] if args.source else DEFAULT_SOURCES
+    export_profiles(args.path, sources)
+
+
+if __name__ == "__main__":
+    main()
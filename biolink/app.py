@@ -1,5 +1,8 @@
 #!/usr/bin/env python
 
+import time
+started = time.perf_counter()
+
 import logging.config
 from os import path
 
@@ -8,10 +11,14 @@ from flask import render_template
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from biolink import settings
+from biolink import settings, transport, routing, metrics, http_cache
 from biolink.api.restplus import api
 from biolink.database import db
-from biolink.ontology.ontology_manager import get_ontology
+# registers the api error handlers, which endpoint modules otherwise import
+import biolink.error_handlers
+
+# route ontobio's upstream HTTP clients through the pooled transports
+transport.install()
 
 app = Flask(__name__)
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1)
@@ -37,26 +44,36 @@ app.config['ERROR_INCLUDE_MESSAGE'] = settings.ERROR_INCLUDE_MESSAGE
 blueprint = Blueprint('api', __name__, url_prefix='/api')
 api.init_app(blueprint)
 
+startup_config = settings.get_biolink_config().get('startup') or {}
 mapping = settings.get_route_mapping().get('route_mapping')
+routing.register_routes(api, mapping, lazy=startup_config.get('lazy_routes', False))
+
+
+@blueprint.before_request
+def load_documented_resources():
+    # the swagger docs are generated from the resource classes
+    if request.endpoint == 'api.specs':
+        routing.load_all()
 
-for ns in mapping['namespace']:
-    namespace = api.namespace(ns['name'], description=ns['description'])
-    routes = ns['routes']
-    for r in routes:
-        route = r['route']
-        resource = r['resource']
-        log.debug("Registering Resource: {} to route: {}".format(resource, route))
-        module_name = '.'.join(resource.split('.')[0:-1])
-        resource_class_name = resource.split('.')[-1]
-        module = __import__(module_name, fromlist=[resource_class_name])
-        resource_class = getattr(module, resource_class_name)
-        namespace.add_resource(resource_class, route)
 
 app.register_blueprint(blueprint)
 db.init_app(app)
+metrics.init_app(app)
+http_cache.init_app(app)
+
+import_time = time.perf_counter() - started
+log.info("Imported biolink.app in {:.2f}s".format(import_time))
+if import_time > startup_config.get('import_time_budget', float('inf')):
+    log.warning("Importing biolink.app took {:.2f}s, over the {}s budget; slowest endpoint modules: {}".format(
+        import_time,
+        startup_config['import_time_budget'],
+        ', '.join('{} ({:.2f}s)'.format(module, seconds) for module, seconds in
+                  sorted(routing.import_times.items(), key=lambda item: -item[1])[:5])
+    ))
 
 
 def preload_ontologies():
+    from biolink.ontology.ontology_manager import get_ontology
     ontologies = settings.get_biolink_config().get('ontologies')
     for ontology in ontologies:
         handle = ontology['handle']
@@ -0,0 +1,176 @@
+"""
+Response cache for results fetched from upstream services
+
+Results are cached per namespace, each with its own size limit and
+time to live, configured under cache in config.yaml. The backend class
+is pluggable in the same way as identifier_converter, and defaults to
+the in-process LRUCache below. All namespaces are flushed when the
+data release (see biolink.release) changes.
+
+Usage:
+
+    search_associations = cached('bioentity')(search_associations)
+"""
+import copy
+import importlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import has_request_context, request
+from biolink.settings import get_biolink_config
+from biolink.release import get_data_release
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'biolink.cache.LRUCache'
+DEFAULT_MAX_SIZE = 1000
+DEFAULT_TTL = 3600
+
+
+class LRUCache(object):
+    """
+    Bounded in-memory cache with least-recently-used and time-to-live eviction
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        """
+        Returns a (found, value) tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+caches = {}
+cached_release = None
+lock = threading.Lock()
+
+
+def get_cache_config():
+    return get_biolink_config().get('cache') or {}
+
+
+def is_enabled():
+    return get_cache_config().get('enabled', True)
+
+
+def get_cache(namespace):
+    """
+    Get (creating if necessary) the cache backend for a namespace
+    """
+    with lock:
+        if namespace not in caches:
+            cache_config = get_cache_config()
+            options = dict(cache_config.get('default') or {})
+            options.update((cache_config.get('namespaces') or {}).get(namespace) or {})
+            module_name, class_name = cache_config.get('backend', DEFAULT_BACKEND).rsplit(".", 1)
+            backend = getattr(importlib.import_module(module_name), class_name)
+            caches[namespace] = backend(
+                max_size=options.get('max_size', DEFAULT_MAX_SIZE),
+                ttl=options.get('ttl', DEFAULT_TTL)
+            )
+        return caches[namespace]
+
+
+def invalidate(namespace=None):
+    """
+    Flush one namespace, or all namespaces if none is given
+    """
+    with lock:
+        targets = [caches[namespace]] if namespace in caches else []
+        if namespace is None:
+            targets = list(caches.values())
+    for cache in targets:
+        cache.clear()
+
+
+def check_release():
+    """
+    Flush all namespaces if the data release has changed since last checked
+    """
+    global cached_release
+    release = get_data_release()
+    if release != cached_release:
+        if cached_release is not None:
+            log.info("Data release changed from {} to {}, flushing caches".format(cached_release, release))
+        invalidate()
+        cached_release = release
+
+
+def cache_key(args, kwargs, per_route=True):
+    """
+    Canonical key for a call: the current route plus the call arguments,
+    with unset (None) keyword arguments dropped
+    """
+    route = None
+    if per_route and has_request_context() and request.url_rule is not None:
+        route = request.url_rule.rule
+    normalized = {k: v for k, v in kwargs.items() if v is not None}
+    return json.dumps([route, args, normalized], sort_keys=True, default=str)
+
+
+def cached(namespace, per_route=True):
+    """
+    Decorator caching the results of a function in a namespace
+
+    Callers frequently modify results in place (e.g. facet counts), so
+    values are copied going into and coming out of the cache. Set
+    per_route to False to share results between routes (and with calls
+    made outside of the request context, e.g. from run_concurrently)
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            check_release()
+            cache = get_cache(namespace)
+            key = cache_key(args, kwargs, per_route)
+            found, value = cache.get(key)
+            if found:
+                return copy.deepcopy(value)
+            value = func(*args, **kwargs)
+            cache.set(key, copy.deepcopy(value))
+            return value
+        return wrapper
+    return decorator
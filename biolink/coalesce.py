@@ -0,0 +1,101 @@
+"""
+Single-flight coalescing of identical in-flight upstream calls
+
+When many greenlets make the same upstream call at the same moment
+(e.g. a popular entity linked from a front page), only the first call
+is sent; the others wait for it and share its result or exception.
+Nothing is retained once the call completes - see biolink.cache for
+caching.
+"""
+import copy
+import json
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+# seconds callers wait for a call they joined before making it themselves
+DEFAULT_WAIT_TIMEOUT = 120
+
+
+class Flight(object):
+    """
+    A call in progress, and the callers waiting on it
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+        # set if the call ended without a result or exception to share,
+        # e.g. its greenlet was killed
+        self.aborted = False
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls that share a key
+
+    If copy_result is set, waiting callers receive a deep copy of the
+    result taken as the call completed, so that callers modifying their
+    results in place (e.g. pysolr Results) do not affect one another.
+    Callers that have waited wait_timeout seconds, or whose call was
+    aborted, make the call themselves.
+    """
+    def __init__(self, copy_result=False, wait_timeout=DEFAULT_WAIT_TIMEOUT):
+        self.copy_result = copy_result
+        self.wait_timeout = wait_timeout
+        self.calls = {}
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            flight = self.calls.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self.calls[key] = Flight()
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+
+        if not is_leader:
+            if not flight.event.wait(self.wait_timeout) or flight.aborted:
+                log.warning("Call for {} did not complete, making it again".format(key))
+                return func()
+            if flight.error is not None:
+                raise flight.error
+            if self.copy_result:
+                return copy.deepcopy(flight.result)
+            return flight.result
+
+        completed = False
+        try:
+            result = func()
+            completed = True
+            return result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            # also on BaseException (gevent.Timeout, GreenletExit), so
+            # waiting callers are always released
+            with self._lock:
+                if self.calls.get(key) is flight:
+                    del self.calls[key]
+                waiters = flight.waiters
+            if completed:
+                if waiters:
+                    log.debug("Coalesced {} calls for {}".format(waiters, key))
+                    flight.result = copy.deepcopy(result) if self.copy_result else result
+            elif flight.error is None:
+                flight.aborted = True
+            flight.event.set()
+
+
+def call_key(*args, **kwargs):
+    """
+    Canonical key for a call, with unset (None) keyword arguments dropped
+    """
+    normalized = {k: v for k, v in kwargs.items() if v is not None}
+    return json.dumps([args, normalized], sort_keys=True, default=str)
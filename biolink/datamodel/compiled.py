@@ -0,0 +1,265 @@
+"""
+Compiled marshalling of flask-restplus models
+
+flask-restplus marshal resolves every field of a model, and every
+nested model, anew for each object, which for association results of
+1000 rows with evidence graphs costs more than the Solr query. Here a
+model is compiled once into a function: each field becomes a getter
+specialised to its type, attribute and default, applied to plain
+dicts, as returned by ontobio. Anything else (objects, masks, dotted
+attributes, wildcards, field types with their own output) is handed
+to flask-restplus, so the output is always identical to marshal and
+the models in biolink.datamodel.serializers remain the only schema.
+
+Responses are encoded with orjson when it is installed.
+
+Usage, in place of api.marshal_with:
+
+    @marshal_with(association_results)
+    def get(self, id):
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, has_app_context, make_response, request
+from flask_restplus import fields, marshal
+from flask_restplus.fields import MarshallingError
+from flask_restplus.utils import unpack
+
+from biolink.api.restplus import api
+from biolink.datamodel.fieldsets import trimmed_model
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+# model id to (model, marshal function); the models are kept so that
+# their ids are not reused while cached. Trimmed models (see
+# biolink.datamodel.fieldsets) are made per request, so this is bounded
+MAX_MODELS = 1024
+compiled = OrderedDict()
+lock = threading.RLock()
+
+
+def get_marshaller(model):
+    """
+    The compiled marshal function of a model, compiling it on first use
+    """
+    with lock:
+        entry = compiled.get(id(model))
+        if entry is not None:
+            compiled.move_to_end(id(model))
+            return entry[1]
+        marshal_model = compile_model(model)
+        while len(compiled) > MAX_MODELS:
+            compiled.popitem(last=False)
+        return marshal_model
+
+
+def compile_model(model):
+    """
+    Compile a model into a function marshalling dicts
+
+    The function is generated source with the scalar fields inlined,
+    e.g. for a model with a String id and a Nested subject:
+
+        def marshal_dict(obj, get):
+            return {
+                'id': (default_0 if (value := get('id')) is None else format_0(value)),
+                'subject': getter_1(obj),
+            }
+    """
+    resolved = getattr(model, 'resolved', model)
+    # set once compiled; with no generic getters, None marshals as {}
+    # does, every field taking its default
+    state = {'marshal_dict': None, 'none_as_empty': False}
+
+    def marshal_model(obj):
+        if obj is None and state['none_as_empty']:
+            obj = {}
+        marshal_dict = state['marshal_dict']
+        if type(obj) is not dict or marshal_dict is None:
+            return marshal(obj, model)
+        try:
+            return marshal_dict(obj, obj.get)
+        except MarshallingError:
+            # raised again by marshal, with its message
+            return marshal(obj, model)
+
+    # registered before compiling nested models, which may refer back to it
+    compiled[id(model)] = (model, marshal_model)
+    if getattr(model, '__mask__', None) or any(isinstance(field, fields.Wildcard) for field in resolved.values()):
+        return marshal_model
+
+    namespace = {}
+    items = []
+    has_generic = False
+    for i, (key, field) in enumerate(resolved.items()):
+        getter = compile_field(key, field)
+        if isinstance(getter, Scalar):
+            namespace['format_{}'.format(i)] = getter.format
+            namespace['default_{}'.format(i)] = getter.default
+            items.append('{0!r}: (default_{1} if (value := get({0!r})) is None else format_{1}(value)),'.format(key, i))
+        else:
+            namespace['getter_{}'.format(i)] = getter
+            items.append('{!r}: getter_{}(obj),'.format(key, i))
+            has_generic = has_generic or getattr(getter, 'generic', False)
+    source = 'def marshal_dict(obj, get):\n    return {\n' + ''.join('        {}\n'.format(item) for item in items) + '    }\n'
+    exec(compile(source, '<marshal {}>'.format(getattr(model, 'name', 'model')), 'exec'), namespace)
+    state['none_as_empty'] = not has_generic
+    state['marshal_dict'] = namespace['marshal_dict']
+    return marshal_model
+
+
+class Scalar(object):
+    """
+    A field marshalled by its format, or its (formatted) default if unset
+    """
+    def __init__(self, format, default):
+        self.format = format
+        self.default = default
+
+
+def compile_field(key, field):
+    """
+    A function getting the marshalled value of a field from a dict
+    """
+    if isinstance(field, type):
+        field = field()
+
+    def generic(obj):
+        if isinstance(field, dict):
+            return marshal(obj, field)
+        return field.output(key, obj)
+    generic.generic = True
+
+    if isinstance(field, dict) or field.attribute is not None or field.mask or hasattr(dict, key):
+        return generic
+    if type(field) is fields.Nested:
+        return compile_nested(key, field, generic)
+    if type(field) is fields.List:
+        return compile_list(key, field, generic)
+    if type(field).output is not fields.Raw.output:
+        return generic
+
+    if callable(field.default):
+        return generic
+    return Scalar(field.format, field.format(field.default) if field.default else field.default)
+
+
+def nested_output(field):
+    """
+    Marshal a value as Nested.output does once it has been got
+    """
+    if field.skip_none:
+        return lambda value: field.output(0, [value])
+    nested = field.nested
+    marshal_nested = get_marshaller(nested)
+    allow_null = field.allow_null
+    default = field.default
+
+    def output(value):
+        if value is None:
+            if allow_null:
+                return None
+            elif default is not None:
+                return default
+        return marshal_nested(value)
+    return output
+
+
+def compile_nested(key, field, generic):
+    output = nested_output(field)
+
+    def nested(obj):
+        return output(obj.get(key))
+    return nested
+
+
+def compile_list(key, field, generic):
+    container = field.container
+    default = field.default
+    if callable(default):
+        return generic
+    if container.attribute is not None or container.mask:
+        format_items = field.format
+    elif type(container) is fields.Nested:
+        output = nested_output(container)
+
+        def format_items(value):
+            return [output(item) for item in value]
+    elif type(container).output is fields.Raw.output and not callable(container.default):
+        format_item = container.format
+        item_default = format_item(container.default) if container.default else container.default
+        # as in List.format, dicts are only passed through by Raw
+        is_raw = type(container) is fields.Raw
+
+        def format_items(value):
+            if not is_raw and any(isinstance(item, dict) for item in value):
+                return field.format(value)
+            return [item_default if item is None else format_item(item) for item in value]
+    else:
+        format_items = field.format
+
+    def items(obj):
+        value = obj.get(key)
+        if type(value) is list or type(value) is tuple:
+            return format_items(value)
+        if value is None:
+            return default
+        return generic(obj)
+    return items
+
+
+def dumps(data):
+    """
+    JSON encode a response as flask-restplus output_json would
+    """
+    settings = current_app.config.get('RESTPLUS_JSON', {})
+    if orjson is not None and not settings and not current_app.debug:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    if current_app.debug:
+        settings = dict(settings)
+        settings.setdefault('indent', 4)
+    return json.dumps(data, **settings) + "\n"
+
+
+def marshal_with(model, code=200, description=None, as_list=False):
+    """
+    api.marshal_with, using the compiled marshaller of model
+
+    Documents the response model as api.marshal_with does. Requests with
+    a field mask header are marshalled by flask-restplus. Associations
+    are trimmed to the fields request parameter, if given.
+    """
+    def decorator(func):
+        documented = api.doc(responses={str(code): (description, [model] if as_list else model)},
+                             __mask__=True)(func)
+
+        @wraps(documented)
+        def wrapper(*args, **kwargs):
+            resp = func(*args, **kwargs)
+            data, status, headers = unpack(resp) if isinstance(resp, tuple) else (resp, 200, {})
+            mask = None
+            response_model = model
+            if has_app_context():
+                mask = request.headers.get(current_app.config['RESTPLUS_MASK_HEADER'])
+                if request.args.get('fields'):
+                    response_model = trimmed_model(model, request.args['fields'])
+            if mask:
+                return marshal(data, response_model, mask=mask), status, headers
+            response = make_response(dumps(get_marshaller(response_model)(data)), status)
+            response.headers.extend(headers or {})
+            response.mimetype = 'application/json'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,176 @@
+"""
+Sparse fieldsets for association results
+
+Association routes take a fields parameter listing the association
+fields to return, with dotted paths for the fields of nested objects:
+
+    ?fields=id,subject.id,subject.label,object.id,object.label
+
+The list is used twice: the Solr field list (select_fields) is cut down
+to the stored fields those association fields are built from, so
+evidence graphs etc. are not fetched, and the marshal model is trimmed
+to the fields asked for (see biolink.datamodel.compiled.marshal_with).
+Other fields of the results, such as numFound and facet_counts, are
+always returned.
+"""
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask_restplus import fields as restplus_fields
+from flask_restplus.mask import Mask
+from ontobio.golr.golr_query import GolrFields
+
+from biolink.error_handlers import BadRequestException
+
+M = GolrFields()
+
+ASSOCIATIONS = 'associations'
+
+FIELDS_HELP = 'Comma separated association fields to return, using dots for nested ' \
+              'fields, e.g. id,subject.id,subject.label,object.id; all fields by default'
+
+
+def node_fields(field):
+    return OrderedDict([
+        ('id', [field]),
+        ('iri', [field]),
+        ('label', [M.label_field(field)]),
+        ('category', ['{}_category'.format(field)]),
+        ('taxon', ['{}_taxon'.format(field), '{}_taxon_label'.format(field)]),
+    ])
+
+
+# Solr fields each association field is translated from by ontobio;
+# fields missing here are not stored in Solr
+SOLR_FIELDS = {
+    'id': [M.ID],
+    'type': [M.ASSOCIATION_TYPE],
+    'subject': node_fields(M.SUBJECT),
+    'object': node_fields(M.OBJECT),
+    'relation': [M.RELATION, M.RELATION_LABEL],
+    'negated': [M.RELATION],
+    'qualifiers': [M.RELATION],
+    'evidence_graph': [M.EVIDENCE_GRAPH],
+    'evidence_types': [M.EVIDENCE, M.EVIDENCE_CLOSURE_MAP],
+    'provided_by': [M.IS_DEFINED_BY],
+    'publications': [M.SOURCE],
+    'frequency': [M.FREQUENCY, M.FREQUENCY_LABEL],
+    'onset': [M.ONSET, M.ONSET_LABEL],
+}
+
+# Solr fields ontobio's compact translation reads from every document;
+# subject and object are both listed as invert_subject_object swaps them
+COMPACT_FIELDS = [M.SUBJECT, M.SUBJECT_LABEL, M.RELATION, M.OBJECT, M.OBJECT_LABEL]
+# also read with slim (object closure) and map_identifiers (subject closure)
+COMPACT_CLOSURE_FIELDS = [M.SUBJECT_CLOSURE, M.OBJECT_CLOSURE]
+
+MAX_MODELS = 256
+trimmed_models = OrderedDict()
+lock = threading.Lock()
+
+
+def parse_fields(value):
+    """
+    Parse a fields parameter into a dict of field to the list of its
+    subfields (empty for the whole field)
+
+    :raises BadRequestException: if the parameter lists no fields
+    """
+    paths = OrderedDict()
+    for path in (value or '').split(','):
+        path = path.strip()
+        if not path:
+            continue
+        field, _, subfield = path.partition('.')
+        if not subfield:
+            paths[field] = []
+        elif field not in paths:
+            paths[field] = [subfield]
+        elif paths[field] and subfield not in paths[field]:
+            # an empty list (the whole field) stays whole
+            paths[field].append(subfield)
+    if not paths:
+        raise BadRequestException("fields must list at least one field")
+    return paths
+
+
+def select_fields(value):
+    """
+    Solr fields to fetch for a fields parameter
+    """
+    selected = [M.ID]
+    for field, subfields in parse_fields(value).items():
+        solr_fields = SOLR_FIELDS.get(field, [])
+        if isinstance(solr_fields, dict):
+            solr_fields = [f for name in (subfields or solr_fields) for f in solr_fields.get(name, [])]
+        selected += [f for f in solr_fields if f not in selected]
+    return selected
+
+
+def with_fieldset(search_associations):
+    """
+    Wrap search_associations to take a fields parameter, see select_fields
+
+    Compact associations are built from fixed fields, which are fetched
+    whatever the fields parameter lists
+    """
+    @wraps(search_associations)
+    def wrapper(*args, fields=None, **kwargs):
+        if fields:
+            selected = select_fields(fields)
+            if kwargs.get('use_compact_associations'):
+                required = list(COMPACT_FIELDS)
+                if kwargs.get('slim') or kwargs.get('map_identifiers'):
+                    required += COMPACT_CLOSURE_FIELDS
+                selected += [f for f in required if f not in selected]
+            kwargs['select_fields'] = selected
+        return search_associations(*args, **kwargs)
+    return wrapper
+
+
+def trimmed_model(model, value):
+    """
+    model, with its associations trimmed to the fields parameter
+
+    model is returned unchanged if it has no associations
+    """
+    resolved = getattr(model, 'resolved', model)
+    if ASSOCIATIONS not in resolved:
+        return model
+    paths = parse_fields(value)
+    key = (id(model), tuple((field, tuple(subfields)) for field, subfields in paths.items()))
+    with lock:
+        if key in trimmed_models:
+            trimmed_models.move_to_end(key)
+            return trimmed_models[key]
+    mask = Mask(','.join(
+        name if name != ASSOCIATIONS else '{}{{{}}}'.format(name, association_mask(resolved[name], paths))
+        for name in resolved
+    ))
+    trimmed = mask.apply(resolved)
+    with lock:
+        trimmed_models[key] = trimmed
+        while len(trimmed_models) > MAX_MODELS:
+            trimmed_models.popitem(last=False)
+    return trimmed
+
+
+def association_mask(field, paths):
+    association = field.container.nested
+    masks = []
+    unknown = [name for name in paths if name not in association]
+    for name, subfield in association.items():
+        if name not in paths:
+            continue
+        nested = subfield.container if isinstance(subfield, restplus_fields.List) else subfield
+        if paths[name] and isinstance(nested, restplus_fields.Nested):
+            unknown += ['{}.{}'.format(name, s) for s in paths[name] if s not in nested.nested]
+            masks.append('{}{{{}}}'.format(name, ','.join(paths[name])))
+        elif paths[name]:
+            unknown += ['{}.{}'.format(name, s) for s in paths[name]]
+        else:
+            masks.append(name)
+    if unknown:
+        raise BadRequestException("Unknown association fields: {}".format(', '.join(unknown)))
+    return ','.join(masks)
@@ -136,6 +136,22 @@ disease_object = api.inherit('DiseaseObject', bio_object, {
     'clinical_modifiers': fields.List(fields.Nested(named_object_core), description='Clinical modifiers such as age of onset, pace of progression, and temporal patterns'),
 })
 
+bioentity_batch_input = api.model('BioentityBatchInput', {
+    'ids': fields.List(fields.String, required=True, description='CURIEs, e.g. NCBIGene:84570'),
+    'type': fields.String(description='bioentity type, e.g. gene; if set, objects are returned as for /bioentity/<type>/<id>'),
+})
+
+bioentity_batch_results = api.model('BioentityBatchResults', {
+    'objects': fields.Raw(description='Mapping between id and BioObject (or DiseaseObject)'),
+    'errors': fields.Raw(description='Mapping between id and the error looking it up'),
+})
+
+association_counts_batch_input = api.model('AssociationCountsBatchInput', {
+    'ids': fields.List(fields.String, required=True, description='CURIEs, e.g. HGNC:1100'),
+    'type': fields.String(required=True, description='bioentity type of the ids, e.g. gene'),
+    'distinct_counts': fields.Boolean(default=False, description='Get distinct counts for associations'),
+})
+
 # Assoc
 
 annotation_extension = api.model('AnnotationExtension', {
@@ -184,7 +200,8 @@ compact_association_set = api.model('CompactAssociationSet', {
 association_results = api.inherit('AssociationResults', search_result, {
     'associations': fields.List(fields.Nested(association), description='Complete representation of full association object, plus evidence'),
     'compact_associations': fields.List(fields.Nested(compact_association_set), description='Compact representation in which objects (e.g. phenotypes) are collected for subject-predicate pairs'),
-    'objects': fields.List(fields.String, description='List of distinct objects used')
+    'objects': fields.List(fields.String, description='List of distinct objects used'),
+    'next_cursor': fields.String(description='Cursor of the next page, if paging with cursor; null on the last page')
 })
 
 d2p_association = api.inherit('D2PAssociation', association, {
@@ -207,7 +224,8 @@ d2p_association_results = api.inherit('D2PAssociationResults', search_result, {
                                         description='Compact representation in which objects '
                                                     '(e.g. phenotypes) are collected '
                                                     'for subject-predicate pairs'),
-    'objects': fields.List(fields.String, description='List of distinct objects used')
+    'objects': fields.List(fields.String, description='List of distinct objects used'),
+    'next_cursor': fields.String(description='Cursor of the next page, if paging with cursor; null on the last page')
 })
 
 
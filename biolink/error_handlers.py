@@ -36,6 +36,23 @@ class UnrecognizedBioentityTypeException(CustomException):
     def __init__(self, message, status_code=400, debug=None):
         CustomException.__init__(self, message, status_code, debug)
 
+class BadRequestException(CustomException):
+    """
+    Use this exception when a request is well formed but cannot be served
+    as given, e.g. it asks for too many objects
+    """
+    def __init__(self, message, status_code=400, debug=None):
+        CustomException.__init__(self, message, status_code, debug)
+
+class UpstreamUnavailableException(CustomException):
+    """
+    Use this exception when an upstream service is failing and calls to
+    it are not attempted, see biolink.resilience
+    """
+    def __init__(self, message, status_code=503, debug=None, retry_after=None):
+        CustomException.__init__(self, message, status_code, debug)
+        self.retry_after = retry_after
+
 class RouteNotImplementedException(CustomException):
     """
     Use this exception for routes that have yet to be implemented
@@ -86,6 +103,25 @@ def unrecognized_bioentity_type_exception(e):
     logging.error(message)
     return e.to_dict(), e.status_code
 
+@api.errorhandler(BadRequestException)
+def bad_request_exception_handler(e):
+    """
+    Error handler to handle BadRequestException
+    """
+    message = e.message
+    logging.error(message)
+    return e.to_dict(), e.status_code
+
+@api.errorhandler(UpstreamUnavailableException)
+def upstream_unavailable_exception_handler(e):
+    """
+    Error handler to handle UpstreamUnavailableException
+    """
+    message = e.message
+    logging.error(message)
+    headers = {'Retry-After': str(int(e.retry_after))} if e.retry_after else {}
+    return e.to_dict(), e.status_code, headers
+
 @api.errorhandler(RouteNotImplementedException)
 def route_not_implemented_exception(e):
     """
@@ -0,0 +1,87 @@
+"""
+Bounded fan-out of blocking upstream calls (Solr, SciGraph, etc.)
+
+When running under gunicorn's gevent worker the socket module is
+monkey patched, in which case calls are spawned on a gevent pool;
+otherwise a thread pool is used. In both cases results are returned
+in the order the calls were given, so callers can merge them
+deterministically.
+
+CPU-bound work that should not hold up requests is started with
+run_in_background, on a real OS thread even under gevent.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def get_max_workers():
+    """
+    Maximum number of concurrent calls, configured under executor.max_workers
+    """
+    executor_config = get_biolink_config().get('executor') or {}
+    return executor_config.get('max_workers', DEFAULT_MAX_WORKERS)
+
+
+def is_gevent_patched():
+    """
+    True if gevent has monkey patched the socket module
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+
+def run_concurrently(calls, max_workers=None):
+    """
+    Run a list of zero-argument callables concurrently
+
+    At most max_workers calls are in flight at once. Returns the list of
+    results in the same order as calls; if any call raises, the first
+    exception (in call order) is re-raised once all calls have finished.
+    """
+    calls = list(calls)
+    if len(calls) == 0:
+        return []
+    if len(calls) == 1:
+        return [calls[0]()]
+
+    if max_workers is None:
+        max_workers = get_max_workers()
+    pool_size = max(1, min(max_workers, len(calls)))
+
+    if is_gevent_patched():
+        import gevent
+        from gevent.pool import Pool
+        pool = Pool(pool_size)
+        greenlets = [pool.spawn(call) for call in calls]
+        gevent.joinall(greenlets)
+        return [greenlet.get() for greenlet in greenlets]
+
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        futures = [executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def run_in_background(func, *args):
+    """
+    Start func(*args) on an OS thread without waiting for it
+
+    Under gevent, threading.Thread starts a greenlet, which would block
+    every other greenlet of the worker for as long as func computes, so
+    func is run on the gevent hub's thread pool instead.
+    """
+    if is_gevent_patched():
+        import gevent
+        return gevent.get_hub().threadpool.spawn(func, *args)
+    thread = threading.Thread(target=func, args=args, daemon=True)
+    thread.start()
+    return thread
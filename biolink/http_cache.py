@@ -0,0 +1,137 @@
+"""
+ETag and Cache-Control headers for GET routes of the API
+
+API responses are a function of the route, its arguments and the data
+release being served (biolink.release), so their ETag is a hash of
+those, the code version and the headers responses vary on (X-Fields,
+Accept). A request whose If-None-Match holds the current ETag is
+answered with a 304 before its handler runs.
+
+Successful responses get the Cache-Control of their route, or else of
+their namespace (the first path segment after /api), configured under
+http_cache in config.yaml, e.g.
+
+    http_cache:
+      namespaces:
+        bioentity: "public, max-age=86400"
+      routes:
+        /bioentity/disease/<id>/treatment: null
+
+Only routes whose responses change with the data release should be
+cached: routes and namespaces that are not configured, or set to null,
+get neither header unless a default is configured, and nor do requests
+for a category answered from AmiGO (use_amigo_for). No ETag is sent
+while the data release is unknown, which includes the time a worker
+takes to fetch it in the background.
+"""
+import hashlib
+import json
+import logging
+
+from flask import request
+
+from biolink import VERSION
+from biolink.release import UNKNOWN_RELEASE, get_data_release
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+API_PREFIX = '/api/'
+VARY = ['Accept', 'X-Fields']
+METHODS = {'GET', 'HEAD'}
+
+
+def get_http_cache_config():
+    return get_biolink_config().get('http_cache') or {}
+
+
+def namespace_of(rule):
+    """
+    Namespace of a route, e.g. bioentity for /api/bioentity/<id>
+    """
+    return rule[len(API_PREFIX):].split('/', 1)[0]
+
+
+def get_cache_control(rule):
+    """
+    Cache-Control for a route, or None if its responses are not cached
+    """
+    config = get_http_cache_config()
+    routes = config.get('routes') or {}
+    route = rule[len(API_PREFIX) - 1:]
+    if route in routes:
+        return routes[route]
+    namespaces = config.get('namespaces') or {}
+    return namespaces.get(namespace_of(rule), config.get('default'))
+
+
+def uses_amigo():
+    """
+    True if the current request is for a category listed under
+    use_amigo_for, e.g. /association/find/gene/function
+    """
+    amigo_categories = get_biolink_config().get('use_amigo_for') or []
+    categories = [value for name, value in (request.view_args or {}).items() if name.endswith('category')]
+    categories += [value for name in request.args if name.endswith('category') for value in request.args.getlist(name)]
+    return any(category in amigo_categories for category in categories)
+
+
+def compute_etag():
+    """
+    ETag of the current request, or None if the data release is unknown
+    """
+    release = get_data_release(wait=False)
+    if release == UNKNOWN_RELEASE:
+        return None
+    args = [(key, request.args.getlist(key)) for key in sorted(request.args)]
+    key = json.dumps([
+        request.url_rule.rule, request.view_args, args, release, VERSION,
+        [request.headers.get(header) for header in VARY]
+    ], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def cacheable_request():
+    """
+    Cache-Control for the current request, or None if it is not cacheable
+    """
+    if request.method not in METHODS or request.url_rule is None:
+        return None
+    if not request.url_rule.rule.startswith(API_PREFIX):
+        return None
+    if not get_http_cache_config().get('enabled', True) or uses_amigo():
+        return None
+    return get_cache_control(request.url_rule.rule)
+
+
+def set_headers(response, etag, cache_control):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.update(VARY)
+
+
+def init_app(app):
+    """
+    Answer conditional requests and send validators for API routes
+    """
+    @app.before_request
+    def check_etag():
+        cache_control = cacheable_request()
+        if cache_control is None:
+            return None
+        etag = compute_etag()
+        if etag is None:
+            return None
+        request.environ['biolink.etag'] = (etag, cache_control)
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            set_headers(response, etag, cache_control)
+            return response
+        return None
+
+    @app.after_request
+    def add_headers(response):
+        cached = request.environ.get('biolink.etag')
+        if cached is not None and response.status_code == 200 and 'ETag' not in response.headers:
+            set_headers(response, *cached)
+        return response
@@ -0,0 +1,191 @@
+"""
+Persistent cache of identifier conversions (e.g. gene to protein)
+
+Mappings are stored in a SQLite database under identifier_cache.path in
+config.yaml, so they are shared by all workers and survive restarts.
+Each row maps an id in a namespace (the conversion) to a list of ids:
+
+ - rows expire after ttl seconds, or negative_ttl seconds for ids that
+   could not be converted, so those are not looked up on every request
+ - once there are more than max_entries rows, the least recently used
+   are deleted; the access time of a row is only written when it is
+   more than ACCESS_RESOLUTION seconds old, so that most reads do not
+   write to the database
+
+Usage:
+
+    cache = get_identifier_cache()
+    mappings = cache.lookup('gene_to_protein', ids, fetch)
+
+where fetch takes the ids not in the cache and returns a dict of those
+it could convert (with an empty list for unknown ids); ids missing
+from that dict, e.g. after an upstream error, are not cached.
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'biolink-identifiers.sqlite')
+DEFAULT_MAX_ENTRIES = 1000000
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+
+# below SQLite's default limit on host parameters per statement
+CHUNK_SIZE = 500
+# number of rows written between checks of max_entries
+EVICT_INTERVAL = 1000
+# seconds within which repeated reads of a row record a single access
+ACCESS_RESOLUTION = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mappings (
+    namespace TEXT NOT NULL,
+    id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (namespace, id)
+)
+"""
+
+
+def get_cache_config():
+    return get_biolink_config().get('identifier_cache') or {}
+
+
+def chunks(items, size=CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class IdentifierCache(object):
+    """
+    SQLite backed map of (namespace, id) to a list of ids
+    """
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.writes = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(SCHEMA)
+
+    def get_many(self, namespace, ids):
+        """
+        Unexpired mappings for ids in a namespace, as a dict
+        """
+        found = {}
+        now = time.time()
+        with self._lock:
+            for chunk in chunks(list(ids)):
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._connection.execute(
+                    'SELECT id, value, accessed FROM mappings WHERE namespace = ? AND expires > ? AND id IN ({})'.format(placeholders),
+                    [namespace, now] + chunk
+                ).fetchall()
+                touched = [id for id, _, accessed in rows if accessed < now - ACCESS_RESOLUTION]
+                if touched:
+                    self._connection.execute(
+                        'UPDATE mappings SET accessed = ? WHERE namespace = ? AND id IN ({})'.format(','.join('?' * len(touched))),
+                        [now, namespace] + touched
+                    )
+                found.update((id, json.loads(value)) for id, value, _ in rows)
+        return found
+
+    def set_many(self, namespace, mappings):
+        now = time.time()
+        rows = [
+            (namespace, id, json.dumps(value), now + (self.ttl if value else self.negative_ttl), now)
+            for id, value in mappings.items()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, ?, ?)', rows)
+            self.writes += len(rows)
+            if self.writes >= EVICT_INTERVAL:
+                self.writes = 0
+                self.evict()
+
+    def evict(self):
+        """
+        Delete expired rows, then the least recently used rows over max_entries
+        """
+        self._connection.execute('DELETE FROM mappings WHERE expires <= ?', (time.time(),))
+        count = self._connection.execute('SELECT COUNT(*) FROM mappings').fetchone()[0]
+        if count > self.max_entries:
+            self._connection.execute(
+                'DELETE FROM mappings WHERE rowid IN (SELECT rowid FROM mappings ORDER BY accessed LIMIT ?)',
+                (count - self.max_entries,)
+            )
+            log.info("Evicted {} identifier mappings".format(count - self.max_entries))
+
+    def lookup(self, namespace, ids, fetch):
+        """
+        Mappings for ids, calling fetch with those not in the cache
+
+        :return: dict of each of ids to a list of ids
+        """
+        ids = list(dict.fromkeys(ids))
+        found = self.get_many(namespace, ids)
+        missing = [id for id in ids if id not in found]
+        if missing:
+            fetched = fetch(missing)
+            self.set_many(namespace, {id: fetched[id] for id in missing if id in fetched})
+            found.update(fetched)
+        return {id: found.get(id, []) for id in ids}
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM mappings')
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM mappings').fetchone()[0]
+
+
+class NoCache(object):
+    """
+    Stand-in for IdentifierCache when identifier_cache is disabled
+    """
+    def lookup(self, namespace, ids, fetch):
+        ids = list(dict.fromkeys(ids))
+        fetched = fetch(ids) if ids else {}
+        return {id: fetched.get(id, []) for id in ids}
+
+
+cache = None
+lock = threading.Lock()
+
+
+def get_identifier_cache():
+    global cache
+    with lock:
+        if cache is None:
+            config = get_cache_config()
+            if config.get('enabled', True):
+                cache = IdentifierCache(
+                    path=config.get('path', DEFAULT_PATH),
+                    max_entries=config.get('max_entries', DEFAULT_MAX_ENTRIES),
+                    ttl=config.get('ttl', DEFAULT_TTL),
+                    negative_ttl=config.get('negative_ttl', DEFAULT_NEGATIVE_TTL)
+                )
+            else:
+                cache = NoCache()
+        return cache
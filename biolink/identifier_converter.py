@@ -1,82 +1,189 @@
 import logging
-from biolink.settings import get_biolink_config
-from ontobio.util.scigraph_util import SciGraph
-from biothings_client import get_client
+from abc import ABC, abstractmethod
+from functools import partial
 
+from requests import HTTPError
 
-class SciGraphIdentifierConverter(object):
+from biolink.transport import get_scigraph
+from biolink.metrics import instrument
+from biolink.executor import run_concurrently
+from biolink.identifier_cache import get_identifier_cache
+
+GENE_TO_PROTEIN = 'gene_to_protein'
+PROTEIN_TO_GENE = 'protein_to_gene'
+
+
+class IdentifierConverter(ABC):
+    """
+    Base class for ID conversion
+
+    Conversions go through the persistent identifier cache (see
+    biolink.identifier_cache); subclasses fetch the ids missing from it
+    in fetch_genes_to_proteins and fetch_proteins_to_genes, returning a
+    dict of each id they could look up to a list of ids
+    """
+    def convert_gene_to_protein(self, identifier):
+        """
+        Get the UniProtKB IDs corresponding to a gene ID
+        """
+        return self.convert_genes_to_proteins([identifier])[identifier]
+
+    def convert_protein_to_gene(self, identifier):
+        """
+        Get the gene IDs corresponding to a UniProtKB ID
+        """
+        return self.convert_proteins_to_genes([identifier])[identifier]
+
+    def convert_genes_to_proteins(self, identifiers):
+        """
+        Map each of a list of gene IDs to its UniProtKB IDs
+        """
+        return get_identifier_cache().lookup(GENE_TO_PROTEIN, identifiers, self.fetch_genes_to_proteins)
+
+    def convert_proteins_to_genes(self, identifiers):
+        """
+        Map each of a list of UniProtKB IDs to its gene IDs
+        """
+        return get_identifier_cache().lookup(PROTEIN_TO_GENE, identifiers, self.fetch_proteins_to_genes)
+
+    @abstractmethod
+    def fetch_genes_to_proteins(self, identifiers):
+        pass
+
+    @abstractmethod
+    def fetch_proteins_to_genes(self, identifiers):
+        pass
+
+
+class SciGraphIdentifierConverter(IdentifierConverter):
     """
     Class for performing ID conversion using SciGraph
+
+    SciGraph has no batch lookup for these conversions, so the ids
+    of a batch are looked up concurrently
     """
     def __init__(self):
-        self.scigraph = SciGraph(get_biolink_config()['scigraph_data']['url'])
+        self.scigraph = get_scigraph('scigraph_data')
 
-    def convert_gene_to_protein(self, identifier):
+    def fetch_genes_to_proteins(self, identifiers):
         """
-        Query SciGraph with a gene ID and get its corresponding UniProtKB ID
+        Query SciGraph with gene IDs and get their corresponding UniProtKB IDs
         """
-        protein_ids = self.scigraph.gene_to_uniprot_proteins(identifier)
-        return protein_ids
+        return self._fetch_all(self.scigraph.gene_to_uniprot_proteins, identifiers)
 
-    def convert_protein_to_gene(self, identifier):
+    def fetch_proteins_to_genes(self, identifiers):
         """
-        Query SciGraph with UniProtKB ID and get its corresponding HGNC gene ID
+        Query SciGraph with UniProtKB IDs and get their corresponding HGNC gene IDs
         """
-        gene_ids = self.scigraph.uniprot_protein_to_genes(identifier)
-        return gene_ids
+        return self._fetch_all(self.scigraph.uniprot_protein_to_genes, identifiers)
 
+    @staticmethod
+    def _fetch_all(convert, identifiers):
+        results = run_concurrently([partial(SciGraphIdentifierConverter._fetch_one, convert, id) for id in identifiers])
+        return dict(zip(identifiers, results))
 
-class MyGeneInfoIdentifierConverter(object):
+    @staticmethod
+    def _fetch_one(convert, identifier):
+        try:
+            return convert(identifier)
+        except HTTPError:
+            # unknown to SciGraph
+            return []
+
+
+class MyGeneInfoIdentifierConverter(IdentifierConverter):
     """
     Class for performing ID conversion using MyGeneInfo
+
+    Batches are converted with querymany, one request per id prefix
     """
+    # MyGeneInfo fields queried for gene ID prefixes
+    GENE_SCOPES = {
+        'NCBIGene': 'entrezgene',
+        'HGNC': 'HGNC',
+        'ENSEMBL': 'ensembl.gene'
+    }
+
     def __init__(self):
+        # biothings_client is only imported when this converter is configured
+        from biothings_client import get_client
         self.mygene_client = get_client('gene')
 
-    def convert_gene_to_protein(self, identifier):
+    def fetch_genes_to_proteins(self, identifiers):
         """
-        Query MyGeneInfo with a gene ID and get its corresponding UniProtKB ID
+        Query MyGeneInfo with gene IDs and get their corresponding UniProtKB IDs
         """
-        uniprot_ids = []
-        if identifier.startswith('NCBIGene:'):
-            # MyGeneInfo uses 'entrezgene' prefix instead of 'NCBIGene'
-            identifier = identifier.replace('NCBIGene', 'entrezgene')
-        try:
-            results = self.mygene_client.query(identifier, fields='uniprot')
-            if results['hits']:
-                for hit in results['hits']:
-                    if 'Swiss-Prot' in hit['uniprot']:
-                        uniprot_id = hit['uniprot']['Swiss-Prot']
-                        if not uniprot_id.startswith('UniProtKB'):
-                            uniprot_id = "UniProtKB:{}".format(uniprot_id)
-                        uniprot_ids.append(uniprot_id)
-                    else:
-                        trembl_ids = hit['uniprot']['TrEMBL']
-                        for x in trembl_ids:
-                            if not x.startswith('UniProtKB'):
-                                x = "UniProtKB:{}".format(x)
-                            uniprot_ids.append(x)
-        except ConnectionError:
-            logging.error("ConnectionError while querying MyGeneInfo with {}".format(identifier))
+        by_scope = {}
+        others = []
+        for identifier in identifiers:
+            prefix, _, local_id = identifier.partition(':')
+            if prefix in self.GENE_SCOPES and local_id:
+                by_scope.setdefault(self.GENE_SCOPES[prefix], {})[local_id] = identifier
+            else:
+                others.append(identifier)
 
+        uniprot_ids = {}
+        for scope, local_ids in by_scope.items():
+            hits = self._querymany(list(local_ids.keys()), scope, 'uniprot')
+            if hits is None:
+                continue
+            for local_id, identifier in local_ids.items():
+                uniprot_ids[identifier] = [x for hit in hits.get(local_id, []) for x in self.uniprot_ids(hit)]
+        for identifier in others:
+            try:
+                with instrument('mygene'):
+                    results = self.mygene_client.query(identifier, fields='uniprot')
+            except ConnectionError:
+                logging.error("ConnectionError while querying MyGeneInfo with {}".format(identifier))
+                continue
+            uniprot_ids[identifier] = [x for hit in results['hits'] for x in self.uniprot_ids(hit)]
         return uniprot_ids
 
-    def convert_protein_to_gene(self, identifier):
+    def fetch_proteins_to_genes(self, identifiers):
         """
-        Query MyGeneInfo with UniProtKB ID and get its corresponding HGNC gene ID
+        Query MyGeneInfo with UniProtKB IDs and get their corresponding HGNC gene IDs
         """
-        gene_id = None
-        if identifier.startswith('UniProtKB'):
-            identifier = identifier.split(':', 1)[1]
+        accessions = {}
+        for identifier in identifiers:
+            accession = identifier.split(':', 1)[1] if identifier.startswith('UniProtKB') else identifier
+            accessions[accession] = identifier
 
-        try:
-            results = self.mygene_client.query(identifier, fields='HGNC')
-            if results['hits']:
-                hit = results['hits'][0]
-                gene_id = hit['HGNC']
+        hits = self._querymany(list(accessions.keys()), 'uniprot', 'HGNC')
+        if hits is None:
+            return {}
+        gene_ids = {}
+        for accession, identifier in accessions.items():
+            gene_ids[identifier] = []
+            for hit in hits.get(accession, [])[:1]:
+                gene_id = str(hit['HGNC'])
                 if not gene_id.startswith('HGNC'):
                     gene_id = 'HGNC:{}'.format(gene_id)
+                gene_ids[identifier].append(gene_id)
+        return gene_ids
+
+    def _querymany(self, ids, scope, fields):
+        """
+        Hits by query term, or None if MyGeneInfo could not be reached
+        """
+        try:
+            with instrument('mygene'):
+                results = self.mygene_client.querymany(ids, scopes=scope, fields=fields, verbose=False)
         except ConnectionError:
-            logging.error("ConnectionError while querying MyGeneInfo with {}".format(identifier))
+            logging.error("ConnectionError while querying MyGeneInfo with {} ids".format(len(ids)))
+            return None
+        hits = {}
+        for hit in results:
+            if not hit.get('notfound') and fields in hit:
+                hits.setdefault(str(hit['query']), []).append(hit)
+        return hits
 
-        return [gene_id]
+    @staticmethod
+    def uniprot_ids(hit):
+        """
+        Swiss-Prot IDs of a MyGeneInfo hit, or its TrEMBL IDs if there are none
+        """
+        uniprot = hit.get('uniprot') or {}
+        ids = uniprot.get('Swiss-Prot') or uniprot.get('TrEMBL') or []
+        if isinstance(ids, str):
+            ids = [ids]
+        return [x if x.startswith('UniProtKB') else "UniProtKB:{}".format(x) for x in ids]
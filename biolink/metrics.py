@@ -0,0 +1,175 @@
+"""
+Prometheus metrics for upstream calls and API requests
+
+Every request made through the pooled transports (Solr, SciGraph,
+OwlSim) is timed, sized and counted by upstream service and API route.
+Upstreams reached without those transports (SPARQL endpoints,
+MyGeneInfo) are instrumented with instrumented/instrument. The service
+name of a URL is the longest matching url in config.yaml (solr_assocs,
+scigraph_data, ...), falling back to the host.
+
+Metrics are served in Prometheus text format from /metrics. Under
+gunicorn each worker has its own counters; to aggregate them set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers
+before starting the server (see start-server.sh), as described in
+https://github.com/prometheus/client_python#multiprocess-mode-eg-gunicorn
+"""
+import functools
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from flask import has_request_context, request
+from prometheus_client import (CollectorRegistry, Counter, Histogram, REGISTRY,
+                               CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+
+from biolink.settings import get_biolink_config
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+upstream_latency = Histogram(
+    'biolink_upstream_request_seconds',
+    'Time taken by calls to upstream services',
+    ['upstream', 'route'],
+    buckets=LATENCY_BUCKETS
+)
+upstream_size = Histogram(
+    'biolink_upstream_response_bytes',
+    'Size of upstream response payloads',
+    ['upstream', 'route'],
+    buckets=SIZE_BUCKETS
+)
+upstream_errors = Counter(
+    'biolink_upstream_errors_total',
+    'Failed calls to upstream services, by HTTP status or exception',
+    ['upstream', 'route', 'error']
+)
+request_latency = Histogram(
+    'biolink_request_seconds',
+    'Time taken to handle API requests',
+    ['route', 'method', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+
+service_urls = None
+
+
+def get_service_urls():
+    """
+    (url, service) for the services in config.yaml, longest url first
+    """
+    global service_urls
+    if service_urls is None:
+        services = [(v['url'].rstrip('/'), k) for k, v in get_biolink_config().items()
+                    if isinstance(v, dict) and isinstance(v.get('url'), str)]
+        service_urls = sorted(services, key=lambda s: -len(s[0]))
+    return service_urls
+
+
+def service_url_for(url):
+    """
+    (url, service) of the service in config.yaml a url belongs to, or
+    (None, host) if none
+    """
+    for prefix, service in get_service_urls():
+        if url.startswith(prefix):
+            return prefix, service
+    return None, urlparse(url).netloc
+
+
+def upstream_for_url(url):
+    return service_url_for(url)[1]
+
+
+def current_route():
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return 'none'
+
+
+def observe(upstream, seconds, size=None, error=None):
+    route = current_route()
+    upstream_latency.labels(upstream, route).observe(seconds)
+    if size is not None:
+        upstream_size.labels(upstream, route).observe(size)
+    if error is not None:
+        upstream_errors.labels(upstream, route, error).inc()
+
+
+@contextmanager
+def instrument(upstream):
+    """
+    Time and count a call to an upstream service, e.g.
+
+        with instrument('mygene'):
+            results = client.query(...)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        observe(upstream, time.perf_counter() - started, error=type(e).__name__)
+        raise
+    observe(upstream, time.perf_counter() - started)
+
+
+def instrumented(upstream):
+    """
+    Decorator instrumenting every call to a function as a call to upstream
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with instrument(upstream):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_response(response, seconds, stream=False):
+    """
+    Record a response received through the pooled transports
+    """
+    if stream:
+        size = response.headers.get('Content-Length')
+        size = int(size) if size is not None else None
+    else:
+        size = len(response.content)
+    error = str(response.status_code) if response.status_code >= 400 else None
+    observe(upstream_for_url(response.url), seconds, size=size, error=error)
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ or 'prometheus_multiproc_dir' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_response():
+    """
+    Body and headers for the /metrics endpoint
+    """
+    return generate_latest(get_registry()), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_app(app):
+    """
+    Time every request handled by the app and serve /metrics
+    """
+    @app.before_request
+    def start_timer():
+        request.environ['biolink.started'] = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = request.environ.get('biolink.started')
+        if started is not None and request.url_rule is not None:
+            request_latency.labels(request.url_rule.rule, request.method, str(response.status_code)) \
+                .observe(time.perf_counter() - started)
+        return response
+
+    app.add_url_rule('/metrics', 'metrics', metrics_response)
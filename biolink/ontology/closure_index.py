@@ -0,0 +1,294 @@
+"""
+Integer-indexed ancestor and descendant closures for an ontology
+
+Term ids are interned to integers and the ontology graph is stored as
+one child -> parent edge list per relation. For a set of relations the
+transitive closure is computed once and kept as a CSR matrix whose row
+i holds the sorted indices of the ancestors of term i (its transpose
+holds the descendants), so ancestry lookups are an array slice rather
+than a walk over the networkx graph.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.csgraph import connected_components
+
+log = logging.getLogger(__name__)
+
+# relations used by the subgraph endpoints unless others are requested
+DEFAULT_RELATIONS = ['subClassOf', 'BFO:0000050']
+
+# number of distinct relation sets to keep closures for
+MAX_CLOSURES = 8
+
+
+class Closure(object):
+    """
+    Ancestor and descendant closures of every term over a set of relations,
+    as CSR index arrays: the ancestors of term i are
+    ancestors_indices[ancestors_indptr[i]:ancestors_indptr[i + 1]]
+    """
+    ARRAYS = ['ancestors_indptr', 'ancestors_indices', 'descendants_indptr', 'descendants_indices']
+
+    def __init__(self, ancestors_indptr, ancestors_indices, descendants_indptr, descendants_indices):
+        self.ancestors_indptr = ancestors_indptr
+        self.ancestors_indices = ancestors_indices
+        self.descendants_indptr = descendants_indptr
+        self.descendants_indices = descendants_indices
+
+    @classmethod
+    def from_matrix(cls, ancestors):
+        descendants = ancestors.transpose().tocsr()
+        descendants.sort_indices()
+        return cls(ancestors.indptr, ancestors.indices, descendants.indptr, descendants.indices)
+
+    def ancestors(self, i):
+        return self.ancestors_indices[self.ancestors_indptr[i]:self.ancestors_indptr[i + 1]]
+
+    def descendants(self, i):
+        return self.descendants_indices[self.descendants_indptr[i]:self.descendants_indptr[i + 1]]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+
+class ClosureIndex(object):
+    """
+    Ancestry index over the graph of an ontobio Ontology
+
+    Ancestors and descendants follow ontobio conventions: a parent is
+    reached by a single hop along an edge from subject to object, and
+    relations=None means all relations.
+    """
+    def __init__(self, ont, relations=DEFAULT_RELATIONS):
+        graph = ont.get_graph()
+        self.ids = list(graph.nodes())
+        self.index = {id: i for i, id in enumerate(self.ids)}
+
+        edges = {}
+        for parent, child, data in graph.edges(data=True):
+            children, parents = edges.setdefault(data.get('pred'), ([], []))
+            children.append(self.index[child])
+            parents.append(self.index[parent])
+        self.edges = {
+            pred: (np.array(children, dtype=np.int32), np.array(parents, dtype=np.int32))
+            for pred, (children, parents) in edges.items()
+        }
+
+        self.closures = OrderedDict()
+        self._lock = threading.Lock()
+        if relations is not None:
+            self.get_closure(relations)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def save(self, path):
+        """
+        Write the index to a directory, as index.json plus one .npy file
+        per array so that load can memory-map them
+        """
+        preds = list(self.edges.keys())
+        for k, pred in enumerate(preds):
+            children, parents = self.edges[pred]
+            np.save(os.path.join(path, 'edges{}_children.npy'.format(k)), children)
+            np.save(os.path.join(path, 'edges{}_parents.npy'.format(k)), parents)
+        closures = []
+        for k, (key, closure) in enumerate(self.closures.items()):
+            for name in Closure.ARRAYS:
+                np.save(os.path.join(path, 'closure{}_{}.npy'.format(k, name)), getattr(closure, name))
+            closures.append(None if key is None else sorted(key))
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump({'ids': self.ids, 'relations': preds, 'closures': closures}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Read an index written by save
+        """
+        mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, 'index.json'), 'r') as f:
+            saved = json.load(f)
+
+        index = cls.__new__(cls)
+        index.ids = saved['ids']
+        index.index = {id: i for i, id in enumerate(index.ids)}
+        index.edges = {
+            pred: (np.load(os.path.join(path, 'edges{}_children.npy'.format(k)), mmap_mode=mmap_mode),
+                   np.load(os.path.join(path, 'edges{}_parents.npy'.format(k)), mmap_mode=mmap_mode))
+            for k, pred in enumerate(saved['relations'])
+        }
+        index.closures = OrderedDict()
+        for k, relations in enumerate(saved['closures']):
+            key = None if relations is None else frozenset(relations)
+            index.closures[key] = Closure(*[
+                np.load(os.path.join(path, 'closure{}_{}.npy'.format(k, name)), mmap_mode=mmap_mode)
+                for name in Closure.ARRAYS
+            ])
+        index._lock = threading.Lock()
+        return index
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.closures.values()) + \
+            sum(children.nbytes + parents.nbytes for children, parents in self.edges.values())
+
+    def relations(self):
+        return list(self.edges.keys())
+
+    def adjacency(self, relations=None):
+        """
+        child -> parent adjacency matrix over the given relations
+        """
+        preds = self.edges.keys() if relations is None else [r for r in relations if r in self.edges]
+        n = len(self.ids)
+        if not preds:
+            return csr_matrix((n, n), dtype=np.int32)
+        rows = np.concatenate([self.edges[pred][0] for pred in preds])
+        cols = np.concatenate([self.edges[pred][1] for pred in preds])
+        adjacency = csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+        adjacency.sum_duplicates()
+        return adjacency
+
+    def get_closure(self, relations=None):
+        """
+        Get the Closure over a set of relations, computing it if needed
+        """
+        key = None if relations is None else frozenset(relations)
+        with self._lock:
+            if key in self.closures:
+                self.closures.move_to_end(key)
+                return self.closures[key]
+            log.info("Computing closure over {} for {} terms".format(relations, len(self.ids)))
+            closure = Closure.from_matrix(transitive_closure(self.adjacency(relations)))
+            self.closures[key] = closure
+            while len(self.closures) > MAX_CLOSURES:
+                self.closures.popitem(last=False)
+            return closure
+
+    def ancestor_indices(self, i, relations=None):
+        return self.get_closure(relations).ancestors(i)
+
+    def descendant_indices(self, i, relations=None):
+        return self.get_closure(relations).descendants(i)
+
+    def ancestors(self, id, relations=None, reflexive=False):
+        """
+        Ancestors of a term, as ids
+        """
+        return self._lookup(self.ancestor_indices, id, relations, reflexive)
+
+    def descendants(self, id, relations=None, reflexive=False):
+        """
+        Descendants of a term, as ids
+        """
+        return self._lookup(self.descendant_indices, id, relations, reflexive)
+
+    def is_ancestor(self, ancestor, id, relations=None):
+        if ancestor not in self.index or id not in self.index:
+            return False
+        found = self.ancestor_indices(self.index[id], relations)
+        i = np.searchsorted(found, self.index[ancestor])
+        return i < len(found) and found[i] == self.index[ancestor]
+
+    def traverse_nodes(self, qids, up=True, down=False, relations=None):
+        """
+        The query terms plus, optionally, all their ancestors and
+        descendants; equivalent to Ontology.traverse_nodes
+        """
+        nodes = set(qids)
+        found = []
+        for id in qids:
+            i = self.index.get(id)
+            if i is None:
+                continue
+            if up:
+                found.append(self.ancestor_indices(i, relations))
+            if down:
+                found.append(self.descendant_indices(i, relations))
+        if found:
+            nodes.update(self.ids[j] for j in np.unique(np.concatenate(found)))
+        return nodes
+
+    def _lookup(self, indices, id, relations, reflexive):
+        i = self.index.get(id)
+        found = [] if i is None else [self.ids[j] for j in indices(i, relations)]
+        if reflexive:
+            found.append(id)
+        return found
+
+
+def transitive_closure(adjacency):
+    """
+    Transitive closure of a child -> parent adjacency matrix
+
+    Cycles are condensed into their strongly connected components, whose
+    closures are then computed parents first. A term is not its own
+    ancestor, but is an ancestor of the other terms in a cycle it is in.
+    """
+    n = adjacency.shape[0]
+    ncomponents, labels = connected_components(adjacency, directed=True, connection='strong')
+
+    edges = adjacency.tocoo()
+    rows, cols = labels[edges.row], labels[edges.col]
+    between = rows != cols
+    condensed = csr_matrix((np.ones(between.sum(), dtype=np.int32), (rows[between], cols[between])),
+                           shape=(ncomponents, ncomponents))
+    condensed.sum_duplicates()
+
+    closures = [None] * ncomponents
+    for c in parents_first(condensed):
+        parents = condensed.indices[condensed.indptr[c]:condensed.indptr[c + 1]]
+        if len(parents) == 0:
+            closures[c] = parents
+        else:
+            closures[c] = np.unique(np.concatenate([parents] + [closures[p] for p in parents]))
+
+    lengths = np.array([len(c) for c in closures], dtype=np.int64)
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    indices = np.concatenate(closures) if indptr[-1] else np.array([], dtype=np.int32)
+    component_closure = csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr),
+                                   shape=(ncomponents, ncomponents))
+
+    if ncomponents == n:
+        # no cycles: components are single terms
+        members = csr_matrix((np.ones(n, dtype=np.int32), (np.arange(n), labels)), shape=(n, n))
+        closure = members @ component_closure @ members.transpose()
+    else:
+        members = csr_matrix((np.ones(n, dtype=np.int32), (np.arange(n), labels)), shape=(n, ncomponents))
+        closure = members @ (component_closure + identity(ncomponents, dtype=np.int32, format='csr')) \
+            @ members.transpose()
+        closure = closure.tocoo()
+        off_diagonal = closure.row != closure.col
+        closure = csr_matrix((closure.data[off_diagonal], (closure.row[off_diagonal], closure.col[off_diagonal])),
+                             shape=(n, n))
+
+    closure = closure.tocsr()
+    closure.sum_duplicates()
+    closure.sort_indices()
+    return closure
+
+
+def parents_first(condensed):
+    """
+    Order the nodes of an acyclic child -> parent adjacency matrix so
+    that every node comes after all of its parents
+    """
+    remaining = np.diff(condensed.indptr)
+    children = condensed.transpose().tocsr()
+    ready = list(np.flatnonzero(remaining == 0))
+    order = []
+    while ready:
+        c = ready.pop()
+        order.append(c)
+        for child in children.indices[children.indptr[c]:children.indptr[c + 1]]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    return order
@@ -1,23 +1,45 @@
 import logging
 
-from ontobio.ontol_factory import OntologyFactory
+from biolink.coalesce import SingleFlight
 from biolink.settings import get_biolink_config
+from biolink.ontology.snapshot import load_ontology
 
 cfg = get_biolink_config()
 omap = {}
+# closure index built alongside each loaded ontology, by handle
+imap = {}
+# one load per handle at a time in this process; loads take minutes, and
+# always release their waiters when they end
+loads = SingleFlight(wait_timeout=None)
 
-def get_ontology(id):
+def get_handle(id):
     handle = id
     for c in cfg['ontologies']:
         if c['id'] == id:
             logging.info("getting handle for id: {} from cfg".format(id))
             handle = c['handle']
+    return handle
+
+def get_ontology(id):
+    handle = get_handle(id)
 
     if handle not in omap:
-        logging.info("Creating a new ontology object for {}".format(handle))
-        ofa = OntologyFactory()
-        omap[handle] = ofa.create(handle)
+        loads.do(handle, lambda: create_ontology(handle))
     else:
         logging.info("Using cached for {}".format(handle))
     return omap[handle]
 
+def create_ontology(handle):
+    if handle in omap:
+        return
+    logging.info("Creating a new ontology object for {}".format(handle))
+    ont, index = load_ontology(handle)
+    imap[handle] = index
+    omap[handle] = ont
+
+def get_closure_index(id):
+    """
+    Get the ClosureIndex for an ontology, loading the ontology if needed
+    """
+    get_ontology(id)
+    return imap[get_handle(id)]
@@ -0,0 +1,225 @@
+"""
+On-disk snapshots of loaded ontologies and their closure indexes
+
+Building an ontology (e.g. fetching GO over SPARQL) takes minutes, so
+the first worker to build one writes a snapshot under
+ontology_snapshots.path and other workers, and later restarts, load
+that instead. A snapshot is a directory holding
+
+    meta.json         format version, library versions and source version
+    ontology.pickle   the ontobio Ontology object
+    index.json, *.npy the ClosureIndex, memory-mapped on load
+
+A snapshot is rebuilt when any of the recorded versions change. The
+source version of an ontology is the version given for it in
+config.yaml, or the size and mtime of its file for file handles;
+ontologies fetched remotely without a configured version are rebuilt
+after ontology_snapshots.max_age seconds.
+
+Snapshots are written by this service only and are unpickled, so the
+snapshot directory must not be writable by anyone else.
+
+To build snapshots ahead of deployment:
+
+    python -m biolink.ontology.snapshot go hp
+"""
+import fcntl
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import networkx as nx
+import ontobio
+from ontobio.ontol_factory import OntologyFactory
+
+from biolink.settings import get_biolink_config
+from biolink.ontology.closure_index import ClosureIndex
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'biolink-ontologies')
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+# seconds between attempts to take a snapshot lock held elsewhere
+LOCK_POLL_INTERVAL = 0.1
+
+
+def get_snapshot_config():
+    return get_biolink_config().get('ontology_snapshots') or {}
+
+
+def is_enabled():
+    return get_snapshot_config().get('enabled', False)
+
+
+def snapshot_path(handle):
+    root = get_snapshot_config().get('path', DEFAULT_PATH)
+    return os.path.join(root, quote(handle, safe=''))
+
+
+def source_version(handle):
+    """
+    Version of the source an ontology is built from, or None if unknown
+    """
+    for ontology in get_biolink_config().get('ontologies') or []:
+        if ontology['handle'] == handle and ontology.get('version'):
+            return str(ontology['version'])
+    versions = []
+    for part in handle.split('+'):
+        if part.find('.') > 0 and os.path.isfile(part):
+            stat = os.stat(part)
+            versions.append('{}:{}:{}'.format(part, stat.st_size, int(stat.st_mtime)))
+        else:
+            return None
+    return ' '.join(versions)
+
+
+def snapshot_meta(handle):
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'handle': handle,
+        'source': source_version(handle),
+        'ontobio': getattr(ontobio, '__version__', None),
+        'networkx': nx.__version__
+    }
+
+
+def is_current(saved, meta):
+    for key, value in meta.items():
+        if saved.get(key) != value:
+            return False
+    if meta['source'] is None:
+        max_age = get_snapshot_config().get('max_age', DEFAULT_MAX_AGE)
+        return time.time() - saved.get('created', 0) < max_age
+    return True
+
+
+def has_current_snapshot(handle):
+    try:
+        with open(os.path.join(snapshot_path(handle), 'meta.json'), 'r') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return is_current(saved, snapshot_meta(handle))
+
+
+def load_snapshot(handle):
+    """
+    Load the snapshot of an ontology, returning (ontology, closure index),
+    or None if there is no current snapshot
+    """
+    path = snapshot_path(handle)
+    if not has_current_snapshot(handle):
+        log.info("No current snapshot of {}".format(handle))
+        return None
+
+    started = time.perf_counter()
+    with open(os.path.join(path, 'ontology.pickle'), 'rb') as f:
+        ont = pickle.load(f)
+    index = ClosureIndex.load(path)
+    log.info("Loaded snapshot of {} in {:.2f}s".format(handle, time.perf_counter() - started))
+    return ont, index
+
+
+def save_snapshot(handle, ont, index):
+    """
+    Write the snapshot of an ontology, replacing any existing one
+    """
+    path = snapshot_path(handle)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix='.staging-')
+    try:
+        with open(os.path.join(staging, 'ontology.pickle'), 'wb') as f:
+            pickle.dump(ont, f, protocol=pickle.HIGHEST_PROTOCOL)
+        index.save(staging)
+        meta = snapshot_meta(handle)
+        meta['created'] = time.time()
+        # written last: a snapshot without meta.json is never loaded
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(staging, path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    log.info("Wrote snapshot of {} to {}".format(handle, path))
+
+
+@contextmanager
+def snapshot_lock(handle):
+    """
+    Exclusive lock on the snapshot of an ontology across processes, so
+    that one worker builds it while the others wait and then load it
+
+    The lock is polled rather than blocked on, as a blocking flock would
+    stall every greenlet of a gevent worker (time.sleep yields to them
+    once monkey patched).
+    """
+    path = snapshot_path(handle)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.lock', 'w') as f:
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def build(handle):
+    ont = OntologyFactory().create(handle)
+    log.info("Building closure index for {}".format(handle))
+    return ont, ClosureIndex(ont)
+
+
+def load_ontology(handle):
+    """
+    Create an ontology and its closure index, from its snapshot if
+    snapshots are enabled
+    """
+    if not is_enabled():
+        return build(handle)
+
+    with snapshot_lock(handle):
+        snapshot = load_snapshot(handle)
+        if snapshot is not None:
+            return snapshot
+        ont, index = build(handle)
+        try:
+            save_snapshot(handle, ont, index)
+        except (OSError, pickle.PicklingError) as e:
+            log.warning("Could not write snapshot of {}: {}".format(handle, e))
+        return ont, index
+
+
+def main():
+    import argparse
+    from biolink.ontology.ontology_manager import get_handle
+
+    parser = argparse.ArgumentParser(description='Build ontology snapshots')
+    parser.add_argument('ontologies', nargs='+', help='ontology ids or handles, e.g. go hp')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the snapshot is current')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for id in args.ontologies:
+        handle = get_handle(id)
+        with snapshot_lock(handle):
+            if args.force or not has_current_snapshot(handle):
+                save_snapshot(handle, *build(handle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cursor paging of association searches, with Solr cursorMark
+
+Solr pages with start by collecting and skipping the first start
+documents, so each page is slower than the last; a crawler paging
+through the 100k associations of a phenotype makes Solr sort them all
+again and again. A cursorMark instead records the sort values of the
+last document returned, so every page costs as much as the first.
+
+Association routes take an opaque cursor parameter: * for the first
+page, then the next_cursor of the previous response. next_cursor is
+null on the last page. cursorMark needs a total order, so the sort of
+the query (relevance by default) is followed by the association id.
+start still pages as before, but cannot be combined with cursor.
+"""
+from functools import wraps
+
+from ontobio.golr.golr_query import GolrAssociationQuery, GolrFields
+from pysolr import SolrError
+
+from biolink.error_handlers import BadRequestException
+
+M = GolrFields()
+
+START_CURSOR = '*'
+
+CURSOR_HELP = 'Cursor for deep paging: * for the first page, then the next_cursor of the previous page; ' \
+              'cannot be combined with start'
+
+
+def stable_sort(sort=None):
+    """
+    sort, followed by the unique key as cursorMark requires
+    """
+    sort = sort or 'score desc'
+    fields = [clause.split()[0] for clause in sort.split(',') if clause.strip()]
+    if M.ID in fields:
+        return sort
+    return '{},{} asc'.format(sort, M.ID)
+
+
+class CursorAssociationQuery(GolrAssociationQuery):
+    """
+    GolrAssociationQuery fetching the page after a cursorMark
+    """
+    def __init__(self, cursor=START_CURSOR, **kwargs):
+        kwargs['include_raw'] = True
+        super().__init__(**kwargs)
+        self.cursor = cursor
+
+    def solr_params(self):
+        params = super().solr_params()
+        params.pop('start', None)
+        params['sort'] = stable_sort(params.get('sort'))
+        params['cursorMark'] = self.cursor
+        return params
+
+
+def search_associations_after(cursor, **kwargs):
+    """
+    search_associations, for the page after cursor
+
+    :return: the results of search_associations, with next_cursor
+    """
+    try:
+        results = CursorAssociationQuery(cursor=cursor, **kwargs).exec()
+    except SolrError as e:
+        if 'cursorMark' in str(e):
+            raise BadRequestException("Invalid cursor: {}".format(cursor))
+        raise
+    raw = results.pop('raw')
+    next_cursor = getattr(raw, 'nextCursorMark', None)
+    results['next_cursor'] = next_cursor if next_cursor != cursor else None
+    return results
+
+
+def with_cursor(search_associations):
+    """
+    Wrap search_associations to take a cursor parameter, see
+    search_associations_after
+    """
+    @wraps(search_associations)
+    def wrapper(*args, cursor=None, **kwargs):
+        if not cursor:
+            return search_associations(*args, **kwargs)
+        if kwargs.get('start'):
+            raise BadRequestException("cursor cannot be combined with start")
+        return search_associations_after(cursor, **kwargs)
+    return wrapper
@@ -0,0 +1,89 @@
+"""
+Token identifying the data release currently being served
+
+Caches are invalidated when the token changes. Set data_release in
+config.yaml to pin it, otherwise it is derived from the SciGraph
+dataset metadata and re-checked in the background every
+data_release_check_interval seconds.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from requests import RequestException
+from biolink.coalesce import SingleFlight
+from biolink.error_handlers import UpstreamUnavailableException
+from biolink.settings import get_biolink_config
+from biolink.transport import get_scigraph
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 600
+UNKNOWN_RELEASE = 'unknown'
+
+data_release = None
+checked_at = 0
+refreshing = False
+lock = threading.Lock()
+# concurrent first checks in a worker share one SciGraph request
+first_check = SingleFlight()
+
+
+def fetch_data_release():
+    """
+    Release token from the SciGraph dataset metadata, or None if it
+    could not be fetched
+    """
+    try:
+        datasets = get_scigraph('scigraph_data').get_datasets()
+    except (RequestException, UpstreamUnavailableException, ValueError) as e:
+        log.warning("Could not determine data release from SciGraph: {}".format(e))
+        return None
+    digest = hashlib.sha1(json.dumps(datasets, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def refresh_data_release():
+    global data_release, checked_at, refreshing
+    try:
+        release = fetch_data_release()
+        with lock:
+            if release is not None:
+                data_release = release
+            elif data_release is None:
+                data_release = UNKNOWN_RELEASE
+            checked_at = time.time()
+    finally:
+        with lock:
+            refreshing = False
+
+
+def get_data_release(wait=True):
+    """
+    Get the current data release token
+
+    The first call in a worker waits for SciGraph, unless wait is false,
+    in which case UNKNOWN_RELEASE is returned while it is fetched in the
+    background; later calls return the last known token, refreshing it
+    in the background once it is older than data_release_check_interval
+    """
+    global refreshing
+
+    config = get_biolink_config()
+    if config.get('data_release'):
+        return str(config['data_release'])
+
+    if data_release is None and wait:
+        first_check.do('data_release', refresh_data_release)
+        return data_release or UNKNOWN_RELEASE
+
+    interval = config.get('data_release_check_interval', DEFAULT_CHECK_INTERVAL)
+    with lock:
+        stale = not refreshing and (data_release is None or time.time() - checked_at > interval)
+        if stale:
+            refreshing = True
+    if stale:
+        threading.Thread(target=refresh_data_release, daemon=True).start()
+    return data_release or UNKNOWN_RELEASE
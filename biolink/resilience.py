@@ -0,0 +1,300 @@
+"""
+Circuit breakers and hedged requests for upstream services
+
+When an upstream degrades, every request waiting on it holds a worker
+for up to the timeout of the service (60s for solr_assocs), and the
+whole API stalls. Each upstream service (named as in biolink.metrics:
+solr_assocs, scigraph_data, wikidata, ...) has a circuit breaker:
+
+ - closed: calls go through; failure_threshold consecutive failures
+   (connection errors, timeouts, 5xx responses) open the circuit
+ - open: calls fail at once with UpstreamUnavailableException (503)
+   for reset_timeout seconds
+ - half open: up to half_open_probes calls are let through as probes;
+   a success closes the circuit, a failure opens it again. Probes that
+   end without a result (e.g. killed by gevent.Timeout) free their
+   slot, and probes not heard from in reset_timeout seconds are
+   replaced
+
+Results of calls let through before the circuit last opened are
+ignored, so a slow call from before an outage cannot close it.
+
+Idempotent requests (GET, HEAD) to an upstream with a hedge_url are
+hedged: if no response has arrived after the p95 latency of the
+upstream (at least hedge_min_delay seconds), the request is also sent
+to hedge_url, e.g. a Solr replica, and the first response wins.
+
+    resilience:
+      failure_threshold: 5
+      reset_timeout: 30
+      upstreams:
+        solr_assocs:
+          hedge_url: "https://solr-replica.monarchinitiative.org/solr/golr"
+
+Requests through biolink.transport are guarded automatically; other
+upstream calls (SPARQL endpoints) with guarded/guard. Breakers are
+kept per worker process.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from biolink.error_handlers import UpstreamUnavailableException
+from biolink.settings import get_biolink_config
+
+log = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULTS = {
+    'enabled': True,
+    'failure_threshold': 5,
+    'reset_timeout': 30,
+    'half_open_probes': 1,
+    'hedge_url': None,
+    'hedge_quantile': 0.95,
+    'hedge_min_delay': 0.05,
+    'hedge_workers': 16
+}
+# latencies kept per upstream for the hedge delay, and needed before hedging
+LATENCY_WINDOW = 1000
+MIN_SAMPLES = 20
+IDEMPOTENT_METHODS = {'GET', 'HEAD'}
+
+breakers = {}
+lock = threading.Lock()
+hedge_pool = None
+
+
+def get_resilience_config(upstream):
+    """
+    Settings for an upstream: defaults overlaid with resilience settings
+    from config.yaml, then with any per-upstream settings
+    """
+    resilience_config = get_biolink_config().get('resilience') or {}
+    options = dict(DEFAULTS)
+    options.update({k: v for k, v in resilience_config.items() if k != 'upstreams'})
+    options.update((resilience_config.get('upstreams') or {}).get(upstream) or {})
+    return options
+
+
+def get_breaker(upstream):
+    with lock:
+        if upstream not in breakers:
+            options = get_resilience_config(upstream)
+            breakers[upstream] = CircuitBreaker(
+                upstream,
+                enabled=options['enabled'],
+                failure_threshold=options['failure_threshold'],
+                reset_timeout=options['reset_timeout'],
+                half_open_probes=options['half_open_probes'],
+                hedge_quantile=options['hedge_quantile'],
+                hedge_min_delay=options['hedge_min_delay']
+            )
+        return breakers[upstream]
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker for one upstream, see the module docstring
+    """
+    def __init__(self, upstream, enabled=True, failure_threshold=5, reset_timeout=30, half_open_probes=1,
+                 hedge_quantile=0.95, hedge_min_delay=0.05):
+        self.upstream = upstream
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_at = None
+        self.probes = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        :return: the time the call was let through, to pass to
+                 record_success, record_failure or release
+        :raises UpstreamUnavailableException: if the circuit is open
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                log.info("Probing {} after {}s".format(self.upstream, self.reset_timeout))
+                self.state = HALF_OPEN
+                self.half_open_at = now
+                self.probes = 0
+            elif self.state == HALF_OPEN and now - self.half_open_at >= self.reset_timeout:
+                log.info("No result from probes of {} after {}s, probing again".format(
+                    self.upstream, self.reset_timeout))
+                self.half_open_at = now
+                self.probes = 0
+            if self.state == OPEN or (self.state == HALF_OPEN and self.probes >= self.half_open_probes):
+                retry_after = max(1, self.reset_timeout - (now - self.opened_at))
+                raise UpstreamUnavailableException("{} is unavailable, try again later".format(self.upstream),
+                                                   retry_after=retry_after)
+            if self.state == HALF_OPEN:
+                self.probes += 1
+            return now
+
+    def is_outdated(self, admitted):
+        """
+        True if a call let through at admitted started before the
+        circuit last opened
+        """
+        return admitted is not None and self.opened_at is not None and admitted < self.opened_at
+
+    def record_success(self, seconds=None, admitted=None):
+        with self._lock:
+            if seconds is not None:
+                self.latencies.append(seconds)
+            if self.is_outdated(admitted):
+                return
+            if self.state != CLOSED:
+                log.info("Closing circuit of {}".format(self.upstream))
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self, admitted=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.is_outdated(admitted):
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                log.warning("Opening circuit of {} after {} failures".format(self.upstream, self.failures))
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self, admitted=None):
+        """
+        Record that a call ended without a result, freeing its probe slot
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and admitted is not None and admitted >= self.half_open_at:
+                self.probes = max(0, self.probes - 1)
+
+    def hedge_delay(self):
+        """
+        Seconds to wait before hedging, or None until enough latencies are known
+        """
+        latencies = sorted(self.latencies)
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return max(self.hedge_min_delay, latencies[int(self.hedge_quantile * (len(latencies) - 1))])
+
+
+@contextmanager
+def guard(upstream):
+    """
+    Call an upstream through its circuit breaker, e.g.
+
+        with guard('wikidata'):
+            results = sparql.query()
+    """
+    breaker = get_breaker(upstream)
+    admitted = breaker.before_call()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        breaker.record_failure(admitted)
+        raise
+    except BaseException:
+        # e.g. gevent.Timeout or GreenletExit: nothing is known of the upstream
+        breaker.release(admitted)
+        raise
+    breaker.record_success(time.perf_counter() - started, admitted)
+
+
+def guarded(upstream):
+    """
+    Decorator guarding every call to a function as a call to upstream
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with guard(upstream):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_hedge_pool():
+    global hedge_pool
+    with lock:
+        if hedge_pool is None:
+            hedge_pool = ThreadPoolExecutor(max_workers=get_resilience_config(None)['hedge_workers'],
+                                            thread_name_prefix='biolink-hedge')
+        return hedge_pool
+
+
+def send(upstream, request, send_request, prefix=None, hedge=True):
+    """
+    Send a requests PreparedRequest to upstream with send_request,
+    through the circuit breaker of upstream, hedging it if configured
+
+    :param prefix: url of upstream in config.yaml, replaced with
+                   hedge_url in hedged requests
+    """
+    breaker = get_breaker(upstream)
+    admitted = breaker.before_call()
+    started = time.perf_counter()
+    try:
+        response = send_hedged(breaker, request, send_request, prefix) if hedge else send_request(request)
+    except Exception:
+        breaker.record_failure(admitted)
+        raise
+    except BaseException:
+        breaker.release(admitted)
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure(admitted)
+    else:
+        breaker.record_success(time.perf_counter() - started, admitted)
+    return response
+
+
+def send_hedged(breaker, request, send_request, prefix):
+    hedge_url = get_resilience_config(breaker.upstream)['hedge_url']
+    delay = breaker.hedge_delay()
+    if not hedge_url or prefix is None or delay is None or request.method not in IDEMPOTENT_METHODS:
+        return send_request(request)
+
+    pool = get_hedge_pool()
+    primary = pool.submit(send_request, request)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    replica_request = request.copy()
+    replica_request.url = hedge_url.rstrip('/') + request.url[len(prefix):]
+    log.info("Hedging request to {} after {:.3f}s".format(breaker.upstream, delay))
+    pending = {primary, pool.submit(send_request, replica_request)}
+    response = error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as e:
+                error = e
+                continue
+            if response.status_code < 500:
+                return response
+    if response is None:
+        raise error
+    return response
@@ -0,0 +1,114 @@
+"""
+Registration of the resources listed in conf/routes.yaml
+
+Resources are either imported and registered up front, or, with
+startup.lazy_routes set in config.yaml, registered as lightweight
+proxies that import their endpoint module on the first request to one
+of its routes. Endpoint modules pull in heavy dependencies (networkx,
+biothings_client, SPARQLWrapper, ontobio submodules) so deferring them
+keeps worker boot time down. The swagger docs need every resource, so
+all remaining modules are loaded when swagger.json is requested.
+"""
+import importlib
+import logging
+import threading
+import time
+
+from flask import request
+from flask_restplus import Resource
+from werkzeug.exceptions import MethodNotAllowed
+
+log = logging.getLogger(__name__)
+
+LAZY_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+# seconds taken to import each endpoint module
+import_times = {}
+lazy_resources = []
+lock = threading.RLock()
+
+
+def import_resource(resource):
+    """
+    Import a resource class from its dotted path, e.g.
+    biolink.api.bio.endpoints.bioentity.GenericObject
+    """
+    module_name, class_name = resource.rsplit('.', 1)
+    with lock:
+        if module_name not in import_times:
+            started = time.perf_counter()
+            importlib.import_module(module_name)
+            import_times[module_name] = time.perf_counter() - started
+            log.info("Imported {} in {:.2f}s".format(module_name, import_times[module_name]))
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class LazyResource(Resource):
+    """
+    Stands in for a resource until its first request
+
+    Subclasses are created by lazy_resource and named after the resource
+    they stand in for so that endpoint names are unchanged.
+    """
+    methods = LAZY_METHODS
+    resource = None
+    namespace = None
+    resource_class = None
+
+    @classmethod
+    def load(cls):
+        with lock:
+            if cls.resource_class is None:
+                resource_class = import_resource(cls.resource)
+                resource_class.mediatypes = cls.mediatypes
+                resource_class.endpoint = cls.endpoint
+                # swagger documents the real resource from here on
+                cls.namespace.resources = [
+                    route._replace(resource=resource_class) if route.resource is cls else route
+                    for route in cls.namespace.resources
+                ]
+                cls.resource_class = resource_class
+        return cls.resource_class
+
+    def dispatch_request(self, *args, **kwargs):
+        resource_class = self.load()
+        methods = set(resource_class.methods or [])
+        if 'GET' in methods:
+            methods.add('HEAD')
+        if request.method not in methods:
+            raise MethodNotAllowed(valid_methods=sorted(methods))
+        return resource_class(self.api).dispatch_request(*args, **kwargs)
+
+
+def lazy_resource(resource, namespace):
+    """
+    Create a LazyResource for the resource at a dotted path
+    """
+    class_name = resource.rsplit('.', 1)[1]
+    proxy = type(class_name, (LazyResource,), {'resource': resource, 'namespace': namespace})
+    lazy_resources.append(proxy)
+    return proxy
+
+
+def load_all():
+    """
+    Import every resource still behind a LazyResource
+    """
+    for proxy in list(lazy_resources):
+        proxy.load()
+
+
+def register_routes(api, mapping, lazy=False):
+    """
+    Add the namespaces and resources in a route mapping to the api
+    """
+    for ns in mapping['namespace']:
+        namespace = api.namespace(ns['name'], description=ns['description'])
+        for r in ns['routes']:
+            route = r['route']
+            resource = r['resource']
+            log.debug("Registering Resource: {} to route: {}".format(resource, route))
+            if lazy:
+                namespace.add_resource(lazy_resource(resource, namespace), route)
+            else:
+                namespace.add_resource(import_resource(resource), route)
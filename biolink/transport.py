@@ -0,0 +1,256 @@
+"""
+Registry of pooled HTTP transports for upstream services
+
+One requests.Session is kept per upstream host (scheme + netloc), each
+with a keep-alive connection pool and retry policy configured under
+transport in config.yaml, e.g.
+
+    transport:
+      pool_connections: 4
+      pool_maxsize: 20
+      retries: 2
+      backoff_factor: 0.2
+      hosts:
+        solr.monarchinitiative.org:
+          pool_maxsize: 50
+          retry_methods: [GET, HEAD, POST]
+
+Clients for the services listed in config.yaml should be obtained from
+here (get_scigraph, get_solr) rather than constructed directly.
+ontobio builds its own pysolr and requests calls internally, so install()
+routes those through the registry as well.
+
+Identical concurrent Solr searches and HTTP GETs are coalesced into a
+single upstream request (see biolink.coalesce) unless transport.coalesce
+is set to false. Every request sent is recorded in biolink.metrics, and
+goes through the circuit breaker of its upstream (biolink.resilience).
+"""
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+import pysolr
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+from ontobio.util.scigraph_util import SciGraph
+from ontobio.util.user_agent import get_user_agent
+
+from biolink import metrics, resilience
+from biolink.settings import get_biolink_config
+from biolink.coalesce import SingleFlight, call_key
+
+log = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'pool_connections': 4,
+    'pool_maxsize': 20,
+    'retries': 2,
+    'backoff_factor': 0.2,
+    'status_forcelist': [502, 503, 504],
+    # POST is not retried by default: a slow POST to a degraded upstream
+    # would be sent retries + 1 times
+    'retry_methods': ['GET', 'HEAD'],
+    'coalesce': True
+}
+
+sessions = {}
+scigraph_clients = {}
+solr_clients = {}
+lock = threading.Lock()
+
+# pysolr Results are modified in place by ontobio, so waiting callers get copies
+solr_flights = SingleFlight(copy_result=True)
+http_flights = SingleFlight()
+
+
+def get_transport_config(host):
+    """
+    Transport settings for a host: defaults overlaid with transport
+    settings from config.yaml, then with any per-host settings
+    """
+    transport_config = get_biolink_config().get('transport') or {}
+    options = dict(DEFAULTS)
+    options.update({k: v for k, v in transport_config.items() if k != 'hosts'})
+    options.update((transport_config.get('hosts') or {}).get(host) or {})
+    return options
+
+
+def host_key(url):
+    parsed = urlparse(url)
+    return "{}://{}".format(parsed.scheme, parsed.netloc)
+
+
+def create_session(host):
+    options = get_transport_config(host)
+    retry = Retry(
+        total=options['retries'],
+        backoff_factor=options['backoff_factor'],
+        status_forcelist=options['status_forcelist'],
+        allowed_methods=frozenset(options['retry_methods']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=options['pool_connections'],
+        pool_maxsize=options['pool_maxsize'],
+        max_retries=retry
+    )
+    session = InstrumentedSession()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(url):
+    """
+    Get the pooled session for the host of a URL
+    """
+    key = host_key(url)
+    with lock:
+        if key not in sessions:
+            log.info("Creating pooled session for {}".format(key))
+            sessions[key] = create_session(urlparse(url).netloc)
+        return sessions[key]
+
+
+def is_coalescing():
+    transport_config = get_biolink_config().get('transport') or {}
+    return transport_config.get('coalesce', DEFAULTS['coalesce'])
+
+
+def pooled_get(url, **kwargs):
+    """
+    GET through the pooled session for the host of url, coalescing
+    identical concurrent (non-streamed) requests
+    """
+    session = get_session(url)
+    if kwargs.get('stream') or not is_coalescing():
+        return session.get(url, **kwargs)
+    return http_flights.do(call_key(url, **kwargs), lambda: session.get(url, **kwargs))
+
+
+def get_service_config(service):
+    """
+    url and timeout of a service in config.yaml, e.g. solr_assocs
+    """
+    return get_biolink_config()[service]
+
+
+def get_solr(url, timeout=2):
+    """
+    pysolr client for a Solr core, sharing the pooled session for its host
+    """
+    key = (url, timeout)
+    session = get_session(url)
+    with lock:
+        if key not in solr_clients:
+            solr_clients[key] = CoalescingSolr(url=url, timeout=timeout, session=session)
+        return solr_clients[key]
+
+
+def get_scigraph(service='scigraph_data'):
+    """
+    SciGraph client for a service in config.yaml (scigraph_data or scigraph_ontology)
+    """
+    with lock:
+        if service not in scigraph_clients:
+            config = get_service_config(service)
+            scigraph_clients[service] = SciGraphClient(config['url'], timeout=config.get('timeout'))
+        return scigraph_clients[service]
+
+
+class InstrumentedSession(requests.Session):
+    """
+    Session recording the latency, size and errors of each request,
+    sent through the circuit breaker of its upstream
+    """
+    def send(self, request, **kwargs):
+        prefix, upstream = metrics.service_url_for(request.url)
+        return resilience.send(upstream, request, lambda r: self.send_instrumented(r, **kwargs),
+                               prefix=prefix, hedge=not kwargs.get('stream'))
+
+    def send_instrumented(self, request, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except RequestException as e:
+            metrics.observe(metrics.upstream_for_url(request.url), time.perf_counter() - started,
+                            error=type(e).__name__)
+            raise
+        metrics.observe_response(response, time.perf_counter() - started, stream=kwargs.get('stream', False))
+        return response
+
+
+class SciGraphClient(SciGraph):
+    """
+    SciGraph facade using the pooled session for its host and the
+    timeout configured for the service
+    """
+    def __init__(self, url=None, timeout=None):
+        super().__init__(url)
+        self.timeout = timeout
+        self.user_agent = get_user_agent(modules=[requests], caller_name=__name__)
+
+    def get_response(self, path="", q=None, format=None, http_method='get', **params):
+        url = self.url_prefix + path
+        if q is not None:
+            url += "/" + q
+        if format is not None:
+            url = url + "." + format
+        headers = {'User-Agent': self.user_agent}
+        if http_method == 'get':
+            return pooled_get(url, params=params, headers=headers, timeout=self.timeout)
+        elif http_method == 'post':
+            return get_session(url).post(url, data=params, headers=headers, timeout=self.timeout)
+        else:
+            raise RequestException
+
+
+class CoalescingSolr(pysolr.Solr):
+    """
+    pysolr client that coalesces identical concurrent searches
+    """
+    def search(self, q, search_handler=None, **kwargs):
+        if not is_coalescing():
+            return pysolr.Solr.search(self, q, search_handler=search_handler, **kwargs)
+        key = call_key(self.url, q, search_handler, **kwargs)
+        return solr_flights.do(
+            key,
+            lambda: pysolr.Solr.search(self, q, search_handler=search_handler, **kwargs)
+        )
+
+
+class PooledRequests(object):
+    """
+    Stand-in for the requests module inside ontobio modules that call
+    requests.get/requests.post directly; everything else is delegated
+    to requests
+    """
+    def get(self, url, **kwargs):
+        return pooled_get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return get_session(url).post(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def install():
+    """
+    Route the HTTP clients ontobio creates internally through the registry:
+    golr queries (pysolr), run_solr_on/run_solr_text_on, SciGraph and OwlSim2
+    """
+    from ontobio.golr import golr_query
+    from ontobio.sim.api import owlsim2
+    from ontobio.util import scigraph_util
+
+    def _set_solr(query, url, timeout=2):
+        query.solr = get_solr(url, timeout)
+        return query.solr
+
+    golr_query.GolrAbstractQuery._set_solr = _set_solr
+    for module in (golr_query, owlsim2, scigraph_util):
+        module.requests = PooledRequests()
@@ -1,6 +1,8 @@
 import SPARQLWrapper, logging
 
 from biolink import NAME, VERSION
+from biolink.metrics import instrumented
+from biolink.resilience import guarded
 from ontobio.util.user_agent import get_user_agent
 
 USER_AGENT = get_user_agent(name=NAME, version=VERSION, modules=[SPARQLWrapper], caller_name=__name__)
@@ -30,6 +32,8 @@ prefix_map = PrefixMap()
 
 
 
+@guarded('uniprot')
+@instrumented('uniprot')
 def run_sparql_query(q,limit=10):
     full_sparql = "{}\n{}\nLIMIT {}".format(prefix_map.gen_header(),q,limit)
     logging.info("FULL:"+full_sparql)
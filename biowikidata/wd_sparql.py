@@ -14,6 +14,8 @@ Return objects following the biolink/OBAN association model
 import SPARQLWrapper, logging
 
 from biolink import NAME, VERSION
+from biolink.metrics import instrumented
+from biolink.resilience import guarded
 from ontobio.util.user_agent import get_user_agent
 
 USER_AGENT = get_user_agent(name=NAME, version=VERSION, modules=[SPARQLWrapper], caller_name=__name__)
@@ -60,6 +62,8 @@ class PrefixMap:
 
 prefix_map = PrefixMap()
 
+@guarded('wikidata')
+@instrumented('wikidata')
 def run_sparql_query(q,limit=10):
     """
     Run a given SPARQL query over the Wikidata SPARQL endpoint
@@ -1,6 +1,7 @@
 import SPARQLWrapper
 
 from biolink import NAME, VERSION
+from biolink.metrics import instrumented
 from ontobio.util.user_agent import get_user_agent
 
 USER_AGENT = get_user_agent(name=NAME, version=VERSION, modules=[SPARQLWrapper], caller_name=__name__)
@@ -28,6 +29,7 @@ class PrefixMap:
 
 prefix_map = PrefixMap()
 
+@instrumented('lego')
 def lego_query(q,limit=10):
     full_sparql = "{}\n{}\nLIMIT {}".format(prefix_map.gen_header(),q,limit)
     print("FULL:"+full_sparql)
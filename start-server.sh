@@ -6,4 +6,7 @@ source venv/bin/activate
 export PYTHONPATH=.:$PYTHONPATH
 pip install setuptools --upgrade #to avoid bdist_wheel errors
 pip install -r requirements.txt
+# aggregate /metrics across workers, see biolink/metrics.py
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/biolink-metrics}
+rm -rf $PROMETHEUS_MULTIPROC_DIR && mkdir -p $PROMETHEUS_MULTIPROC_DIR
 gunicorn -k gevent --worker-connections 5 --bind 0.0.0.0:8888 wsgi:app
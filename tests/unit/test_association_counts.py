@@ -0,0 +1,133 @@
+import pytest
+
+from biolink.api.bio import association_counts
+
+
+def bucket(association_type, count, distinct, taxa):
+    return {
+        'val': association_type,
+        'count': count,
+        'distinct': distinct,
+        'taxon': {
+            'buckets': [
+                {'val': taxon, 'count': taxon_count, 'distinct': taxon_distinct}
+                for taxon, taxon_count, taxon_distinct in taxa
+            ]
+        }
+    }
+
+
+FACETS = {
+    'count': 1000,
+    'subject': {
+        'count': 19,
+        'sources': {'buckets': [{'val': 'orphanet', 'count': 3}, {'val': 'clinvar', 'count': 2}]},
+        'association_type': {
+            'buckets': [
+                bucket('gene_phenotype', 10, 7, [('NCBITaxon:9606', 10, 7)]),
+                bucket('gene_homology', 5, 5, [('NCBITaxon:10090', 3, 3), ('NCBITaxon:7955', 2, 2)]),
+                bucket('gene_interaction', 4, 4, [('NCBITaxon:9606', 4, 4)]),
+            ]
+        }
+    },
+    'object': {
+        'count': 14,
+        'sources': {'buckets': [{'val': 'orphanet', 'count': 1}, {'val': 'mgi', 'count': 6}]},
+        'association_type': {
+            'buckets': [
+                bucket('gene_homology', 2, 2, [('NCBITaxon:10090', 2, 2)]),
+                bucket('gene_interaction', 4, 4, [('NCBITaxon:9606', 4, 4)]),
+                bucket('variant_gene', 8, 6, [('NCBITaxon:9606', 8, 6)]),
+            ]
+        }
+    },
+    'ortholog': {
+        'count': 30,
+        'association_type': {
+            'buckets': [
+                bucket('gene_phenotype', 30, 21, [('NCBITaxon:10090', 30, 21)]),
+            ]
+        }
+    }
+}
+
+
+@pytest.fixture
+def fake_solr(monkeypatch):
+    calls = []
+
+    def search_associations(**kwargs):
+        calls.append(kwargs)
+        return {'facets': {k: v for k, v in FACETS.items() if k == 'count' or k in kwargs['json_facet']}}
+
+    monkeypatch.setattr(association_counts, 'search_associations', search_associations)
+    return calls
+
+
+def test_gene_counts(fake_solr):
+    counts = association_counts.get_association_counts('HGNC:1', 'gene')
+
+    assert len(fake_solr) == 1
+    assert set(fake_solr[0]['json_facet'].keys()) == {'subject', 'object', 'ortholog'}
+    assert fake_solr[0]['json_facet']['subject']['q'] == 'subject_closure:"HGNC:1"'
+    assert counts == {
+        'phenotype': {'counts': 10, 'counts_by_taxon': {'NCBITaxon:9606': 10}},
+        'homolog': {'counts': 5, 'counts_by_taxon': {'NCBITaxon:10090': 3, 'NCBITaxon:7955': 2}},
+        'interaction': {'counts': 4, 'counts_by_taxon': {'NCBITaxon:9606': 4}},
+        'variant': {'counts': 8, 'counts_by_taxon': {'NCBITaxon:9606': 8}},
+        'ortholog-phenotype': {'counts': 30, 'counts_by_taxon': {'NCBITaxon:10090': 30}},
+        'sources': {'orphanet': 4, 'clinvar': 2, 'mgi': 6},
+    }
+    assert list(counts.keys()) == [
+        'phenotype', 'homolog', 'interaction', 'variant', 'ortholog-phenotype', 'sources'
+    ]
+
+
+def test_distinct_counts(fake_solr):
+    counts = association_counts.get_association_counts('HGNC:1', 'gene', distinct_counts=True)
+
+    type_facet = fake_solr[0]['json_facet']['subject']['facet']['association_type']
+    assert type_facet['facet']['distinct'] == 'unique(object)'
+    assert counts['phenotype'] == {'counts': 7, 'counts_by_taxon': {'NCBITaxon:9606': 7}}
+    assert counts['variant'] == {'counts': 6, 'counts_by_taxon': {'NCBITaxon:9606': 6}}
+    assert counts['ortholog-phenotype'] == {'counts': 21, 'counts_by_taxon': {'NCBITaxon:10090': 21}}
+
+
+def test_non_gene_skips_ortholog_domain(fake_solr):
+    counts = association_counts.get_association_counts('HP:0000001', 'phenotype')
+
+    assert 'ortholog' not in fake_solr[0]['json_facet']
+    assert 'ortholog-phenotype' not in counts
+
+
+def test_empty_domains():
+    counts = association_counts.parse_count_facets({'count': 0, 'subject': {'count': 0}}, 'gene')
+
+    assert counts == {'sources': {}}
+
+
+def test_batch_counts(monkeypatch):
+    calls = []
+
+    def search_associations(**kwargs):
+        calls.append(kwargs)
+        facets = {}
+        for name in kwargs['json_facet']:
+            domain = name.split('_')[0]
+            if domain in FACETS and not name.endswith('_1'):
+                facets[name] = FACETS[domain]
+        return {'facets': facets}
+
+    monkeypatch.setattr(association_counts, 'search_associations', search_associations)
+
+    counts = association_counts.get_batch_association_counts(
+        ['HGNC:1', 'HGNC:2', 'HGNC:1', 'HGNC:3'], 'gene', batch_size=2
+    )
+
+    assert len(calls) == 2
+    assert calls[0]['json_facet']['subject_1']['q'] == 'subject_closure:"HGNC:2"'
+    assert set(calls[1]['json_facet'].keys()) == {'subject_0', 'object_0', 'ortholog_0'}
+    assert list(counts.keys()) == ['HGNC:1', 'HGNC:2', 'HGNC:3']
+    assert counts['HGNC:1'] == association_counts.parse_count_facets(FACETS, 'gene')
+    assert counts['HGNC:3'] == counts['HGNC:1']
+    assert counts['HGNC:2'] == {'sources': {}}
@@ -0,0 +1,86 @@
+import time
+import types
+
+import networkx as nx
+from ontobio.assoc_factory import AssociationSetFactory
+from ontobio.ontol import Ontology
+
+from biolink.api.entityset import association_sets
+from biolink.api.entityset.association_sets import AssociationSetCache, Key
+
+KEY = Key('go', 'gene', 'function', 'NCBITaxon:9606')
+OTHER_KEY = Key('hp', 'gene', 'phenotype', 'NCBITaxon:9606')
+
+
+def create_aset(key):
+    graph = nx.MultiDiGraph()
+    graph.add_edge('GO:1', 'GO:2', pred='subClassOf')
+    return AssociationSetFactory().create_from_tuples([
+        ('NCBIGene:1', 'gene 1', 'GO:1'),
+        ('NCBIGene:2', 'gene 2', 'GO:2'),
+    ], ontology=Ontology(graph=graph))
+
+
+def test_sets_are_built_once_and_refreshed_in_background(monkeypatch):
+    release = ['1']
+    monkeypatch.setattr(association_sets, 'get_data_release', lambda: release[0])
+    builds = []
+
+    def create(key):
+        builds.append(key)
+        return create_aset(key)
+
+    cache = AssociationSetCache(create=create)
+    first = cache.get(KEY)
+    assert cache.get(KEY) is first
+    assert builds == [KEY]
+
+    release[0] = '2'
+    # the current set is served while the new release is fetched
+    assert cache.get(KEY) is first
+    for _ in range(500):
+        if cache.get(KEY) is not first:
+            break
+        time.sleep(0.01)
+    assert cache.get(KEY) is not first
+    assert builds == [KEY, KEY]
+
+
+def test_least_recently_used_sets_are_dropped(monkeypatch):
+    monkeypatch.setattr(association_sets, 'get_data_release', lambda: '1')
+    cache = AssociationSetCache(create=create_aset, max_bytes=1)
+
+    cache.get(KEY)
+    cache.get(OTHER_KEY)
+
+    assert len(cache) == 1
+    stats = cache.stats()
+    assert stats['sets'][0]['key']['ontology'] == 'hp'
+    assert stats['bytes'] > 0
+
+
+def test_failed_refresh_is_retried_after_the_interval(monkeypatch):
+    release = ['1']
+    monkeypatch.setattr(association_sets, 'get_data_release', lambda: release[0])
+    monkeypatch.setattr(association_sets, 'run_in_background', lambda func, *args: func(*args))
+    now = [1000.0]
+    monkeypatch.setattr(association_sets, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    builds = []
+
+    def create(key):
+        builds.append(key)
+        if len(builds) > 1:
+            raise IOError("golr is down")
+        return create_aset(key)
+
+    cache = AssociationSetCache(create=create, refresh_interval=60)
+    first = cache.get(KEY)
+
+    release[0] = '2'
+    assert cache.get(KEY) is first
+    assert cache.get(KEY) is first
+    assert len(builds) == 2
+
+    now[0] += 61
+    assert cache.get(KEY) is first
+    assert len(builds) == 3
@@ -0,0 +1,62 @@
+import json
+
+from biolink.api.search import autocomplete_index
+from biolink.api.search.autocomplete_index import AutocompleteIndex, build_index
+
+DOCS = [
+    {'id': 'HP:0003202', 'label': ['Skeletal muscle atrophy'], 'synonym': ['Muscle wasting'],
+     'category': ['phenotype'], 'leaf': 0},
+    {'id': 'MONDO:0020121', 'label': 'muscular dystrophy', 'category': ['disease'],
+     'equivalent_curie': ['DOID:9884', 'OMIM:310200'], 'leaf': 1},
+    {'id': 'HGNC:11998', 'label': ['MUSK'], 'synonym': ['muscle skeletal receptor tyrosine kinase'],
+     'category': ['gene'], 'taxon': 'NCBITaxon:9606', 'taxon_label': 'Homo sapiens', 'leaf': 1},
+]
+
+
+def get_index(tmpdir):
+    tmpdir.join('docs.jsonl').write(''.join(json.dumps(doc) + '\n' for doc in DOCS))
+    build_index(str(tmpdir))
+    return AutocompleteIndex.load(str(tmpdir))
+
+
+def ids(results):
+    return [doc['id'] for doc in results['docs']]
+
+
+def test_prefix_match(tmpdir):
+    index = get_index(tmpdir)
+    results = index.autocomplete('Musk')
+    assert ids(results) == ['HGNC:11998']
+    assert results['docs'][0]['highlight'] == '<em class="hilite">MUSK</em>'
+    assert results['docs'][0]['taxon_label'] == 'Homo sapiens'
+
+    # word prefixes of labels and synonyms, labels first
+    assert ids(index.autocomplete('atro')) == ['HP:0003202']
+    assert ids(index.autocomplete('musc')) == ['MONDO:0020121', 'HP:0003202', 'HGNC:11998']
+    assert index.autocomplete('atro')['docs'][0]['match'] == 'Skeletal muscle atrophy'
+
+    assert ids(index.autocomplete('doid:98')) == ['MONDO:0020121']
+    assert ids(index.autocomplete('musc', rows=1, start='1')) == ['HP:0003202']
+
+
+def test_filters(tmpdir):
+    index = get_index(tmpdir)
+    assert ids(index.autocomplete('musc', category=['gene', 'disease'])) == ['MONDO:0020121', 'HGNC:11998']
+    assert ids(index.autocomplete('musc', taxon=['NCBITaxon:9606'])) == ['HGNC:11998']
+    assert ids(index.autocomplete('musc', prefix=['-MONDO', '-HGNC'])) == ['HP:0003202']
+    assert ids(index.autocomplete('musc', prefix=['DOID'], include_eqs=True)) == ['MONDO:0020121']
+    assert ids(index.autocomplete('musc', exclude_groups=True)) == ['MONDO:0020121', 'HGNC:11998']
+
+    assert index.supports({'fq': None, 'category': ['gene']})
+    assert not index.supports({'fq': ['taxon:"NCBITaxon:9606"']})
+
+
+def test_candidate_window(tmpdir, monkeypatch):
+    index = get_index(tmpdir)
+    monkeypatch.setattr(autocomplete_index, 'MAX_CANDIDATES', 2)
+
+    # muscle atrophy, muscle skeletal..., muscle wasting, muscular dystrophy
+    assert len(ids(index.autocomplete('musc', rows=1))) == 1
+    assert index.autocomplete('musc', category=['disease'], rows=1) is None
+    # filtered while scanning the whole range when it fits
+    assert ids(index.autocomplete('muscu', category=['disease'])) == ['MONDO:0020121']
@@ -0,0 +1,33 @@
+from requests import HTTPError
+
+from biolink.api.bio.bioentity_batch import get_bioobjects, get_clique_leaders
+
+
+def test_get_bioobjects():
+    calls = []
+
+    def lookup(id, type=None):
+        calls.append((id, type))
+        if id == 'NCBIGene:0':
+            raise HTTPError
+        if id == 'NCBIGene:1':
+            raise ValueError('bad response')
+        return {'id': id, 'category': [type]}
+
+    objects, errors = get_bioobjects(lookup, ['NCBIGene:84570', 'NCBIGene:0', 'NCBIGene:84570', 'NCBIGene:1', ''], 'gene')
+
+    assert sorted(calls) == [('NCBIGene:0', 'gene'), ('NCBIGene:1', 'gene'), ('NCBIGene:84570', 'gene')]
+    assert objects == {'NCBIGene:84570': {'id': 'NCBIGene:84570', 'category': ['gene']}}
+    assert errors['NCBIGene:0'] == {'message': 'No result found for NCBIGene:0', 'code': 404}
+    assert errors['NCBIGene:1']['code'] == 500
+
+
+def test_get_clique_leaders():
+    def lookup(id, type=None):
+        if id == 'OMIM:0':
+            raise HTTPError
+        return {'OMIM:1': 'MONDO:1', 'DOID:1': 'MONDO:1'}.get(id, id)
+
+    leaders = get_clique_leaders(lookup, ['OMIM:1', 'DOID:1', 'MONDO:1', 'OMIM:0'])
+
+    assert leaders == {'OMIM:1': 'MONDO:1', 'DOID:1': 'MONDO:1', 'MONDO:1': 'MONDO:1', 'OMIM:0': 'OMIM:0'}
@@ -0,0 +1,75 @@
+import pytest
+
+from biolink import cache
+
+
+@pytest.fixture(autouse=True)
+def release(monkeypatch):
+    current = {'release': 'r1'}
+    monkeypatch.setattr(cache, 'get_data_release', lambda: current['release'])
+    monkeypatch.setattr(cache, 'caches', {})
+    monkeypatch.setattr(cache, 'cached_release', None)
+    return current
+
+
+def test_lru_eviction():
+    lru = cache.LRUCache(max_size=2, ttl=60)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.get('a')
+    lru.set('c', 3)
+
+    assert lru.get('a') == (True, 1)
+    assert lru.get('b') == (False, None)
+    assert lru.get('c') == (True, 3)
+
+
+def test_ttl_expiry():
+    lru = cache.LRUCache(max_size=2, ttl=-1)
+    lru.set('a', 1)
+
+    assert lru.get('a') == (False, None)
+    assert len(lru) == 0
+
+
+def test_cached_returns_copies():
+    calls = []
+
+    @cache.cached('test')
+    def search(subject=None, rows=None):
+        calls.append(subject)
+        return {'facet_counts': {'object_closure': {'HP:1': 1}}}
+
+    first = search(subject='HGNC:1')
+    first['facet_counts']['object_closure'] = {}
+    second = search(subject='HGNC:1', rows=None)
+
+    assert calls == ['HGNC:1']
+    assert second == {'facet_counts': {'object_closure': {'HP:1': 1}}}
+
+
+def test_release_change_flushes(release):
+    calls = []
+
+    @cache.cached('test')
+    def search(subject=None):
+        calls.append(subject)
+        return subject
+
+    search(subject='HGNC:1')
+    search(subject='HGNC:1')
+    release['release'] = 'r2'
+    search(subject='HGNC:1')
+
+    assert calls == ['HGNC:1', 'HGNC:1']
+
+
+def test_namespace_limits(monkeypatch):
+    monkeypatch.setattr(cache, 'get_cache_config', lambda: {
+        'default': {'max_size': 10, 'ttl': 60},
+        'namespaces': {'small': {'max_size': 1}}
+    })
+
+    assert cache.get_cache('small').max_size == 1
+    assert cache.get_cache('small').ttl == 60
+    assert cache.get_cache('other').max_size == 10
@@ -0,0 +1,66 @@
+import random
+
+import networkx as nx
+from ontobio.ontol import Ontology
+
+from biolink.ontology.closure_index import ClosureIndex
+
+
+def create_ontology(edges):
+    graph = nx.MultiDiGraph()
+    for child, pred, parent in edges:
+        graph.add_edge(parent, child, pred=pred)
+    return Ontology(graph=graph)
+
+
+ONT = create_ontology([
+    ('HP:3', 'subClassOf', 'HP:2'),
+    ('HP:2', 'subClassOf', 'HP:1'),
+    ('HP:4', 'subClassOf', 'HP:2'),
+    ('HP:4', 'BFO:0000050', 'HP:5'),
+    ('HP:5', 'subClassOf', 'HP:1'),
+    ('HP:6', 'RO:0002212', 'HP:3'),
+])
+
+
+def test_ancestors_and_descendants():
+    index = ClosureIndex(ONT)
+
+    assert sorted(index.ancestors('HP:4')) == ['HP:1', 'HP:2', 'HP:5']
+    assert sorted(index.ancestors('HP:4', relations=['subClassOf'])) == ['HP:1', 'HP:2']
+    assert sorted(index.descendants('HP:2', relations=['subClassOf'])) == ['HP:3', 'HP:4']
+    assert sorted(index.descendants('HP:3', relations=None, reflexive=True)) == ['HP:3', 'HP:6']
+    assert index.ancestors('HP:404') == []
+    assert index.is_ancestor('HP:1', 'HP:3')
+    assert not index.is_ancestor('HP:3', 'HP:1')
+
+
+def test_matches_ontobio_traversal():
+    rng = random.Random(0)
+    edges = []
+    for i in range(1, 200):
+        for parent in rng.sample(range(i), min(i, rng.randint(1, 3))):
+            edges.append(('T:{}'.format(i), rng.choice(['subClassOf', 'BFO:0000050', 'RO:0002212']), 'T:{}'.format(parent)))
+    ont = create_ontology(edges)
+    index = ClosureIndex(ont)
+    relations = ['subClassOf', 'BFO:0000050']
+
+    for node in rng.sample(list(ont.nodes()), 20):
+        assert set(index.ancestors(node, relations)) == set(ont.ancestors(node, relations))
+        assert set(index.descendants(node)) == set(ont.descendants(node))
+        assert index.traverse_nodes([node, 'T:0'], down=True, relations=relations) == \
+            ont.traverse_nodes([node, 'T:0'], down=True, relations=relations)
+
+
+def test_cycles():
+    ont = create_ontology([
+        ('A:1', 'subClassOf', 'A:2'),
+        ('A:2', 'subClassOf', 'A:3'),
+        ('A:3', 'subClassOf', 'A:1'),
+        ('A:4', 'subClassOf', 'A:1'),
+    ])
+    index = ClosureIndex(ont)
+
+    assert sorted(index.ancestors('A:1')) == ['A:2', 'A:3']
+    assert sorted(index.ancestors('A:4')) == ['A:1', 'A:2', 'A:3']
+    assert sorted(index.descendants('A:2')) == ['A:1', 'A:3', 'A:4']
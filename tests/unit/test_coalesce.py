@@ -0,0 +1,138 @@
+import threading
+import time
+
+from biolink.coalesce import SingleFlight, call_key
+
+
+def run_concurrently(flight, key, func, n=5):
+    results = [None] * n
+    errors = [None] * n
+
+    def target(i):
+        try:
+            results[i] = flight.do(key, func)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    return threads, results, errors
+
+
+def test_identical_calls_share_one_request():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return {'id': 'HGNC:1'}
+
+    threads, results, errors = run_concurrently(flight, 'bioobject', fetch)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert errors == [None] * 5
+    assert flight.calls == {}
+
+
+def test_exception_is_shared():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait()
+        raise ValueError('upstream down')
+
+    threads, results, errors = run_concurrently(flight, 'bioobject', fetch, n=3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flight.calls == {}
+
+
+def test_copy_result():
+    flight = SingleFlight(copy_result=True)
+    release = threading.Event()
+
+    def fetch():
+        release.wait()
+        return {'docs': [1]}
+
+    threads, results, errors = run_concurrently(flight, 'search', fetch, n=3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(result == {'docs': [1]} for result in results)
+    assert len({id(result) for result in results}) == 3
+
+
+def test_call_key_ignores_unset_arguments():
+    assert call_key('select', rows=0, start=None) == call_key('select', rows=0)
+    assert call_key('select', rows=0) != call_key('select', rows=1)
+
+
+def test_aborted_call_releases_waiters():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    class Killed(BaseException):
+        pass
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait()
+            raise Killed()
+        return 'retried'
+
+    results = []
+
+    def leader():
+        try:
+            flight.do('key', fetch)
+        except Killed:
+            results.append('killed')
+
+    threads = [threading.Thread(target=leader)]
+    threads[0].start()
+    time.sleep(0.01)
+    threads.append(threading.Thread(target=lambda: results.append(flight.do('key', fetch))))
+    threads[1].start()
+    time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(1)
+
+    assert sorted(results) == ['killed', 'retried']
+    assert flight.calls == {}
+
+
+def test_wait_is_bounded():
+    flight = SingleFlight(wait_timeout=0.01)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait()
+            return 'slow'
+        return 'fast'
+
+    threads, results, errors = run_concurrently(flight, 'key', fetch, n=2)
+    threads[1].join()
+    assert results[1] == 'fast'
+    release.set()
+    threads[0].join()
+    assert results[0] == 'slow'
@@ -0,0 +1,44 @@
+import json
+
+from flask_restplus import marshal
+
+from biolink.datamodel.compiled import get_marshaller
+from biolink.datamodel.serializers import association_results, d2p_association_results
+
+
+def association(i):
+    return {
+        'id': 'assoc{}'.format(i),
+        'type': 'gene_phenotype',
+        'subject': {'id': 'HGNC:{}'.format(i), 'label': 'gene', 'category': ['gene'],
+                    'taxon': {'id': 'NCBITaxon:9606', 'label': 'Homo sapiens'}},
+        'object': {'id': 'HP:1', 'label': 'phenotype', 'iri': None},
+        'relation': {'id': 'RO:1', 'label': None, 'inverse': False},
+        'negated': 'false',
+        'qualifiers': ('q1', 'q2'),
+        'slim': {'GO:1'},
+        'evidence_graph': {
+            'nodes': [{'id': 'ECO:1', 'lbl': 'evidence', 'meta': {'a': [1]}}],
+            'edges': [{'sub': 'HGNC:1', 'pred': 'RO:1', 'obj': 'HP:1'}, None]
+        },
+        'evidence_types': [{'id': 'ECO:1', 'label': 'evidence'}],
+        'provided_by': ['https://data.monarchinitiative.org/ttl/hpoa.ttl'],
+        'publications': [{'id': 'PMID:1'}, None],
+        'frequency': {'id': 'HP:0040283', 'label': 'Occasional'},
+        'onset': None,
+    }
+
+
+def test_same_as_marshal():
+    results = {
+        'numFound': 3,
+        'docs': [{'id': 'doc'}],
+        'facet_counts': {'object_closure': {'HP:1': 2}},
+        'associations': [association(1), association(2), {'id': 'assoc3', 'subject': None}],
+        'compact_associations': None,
+        'objects': ['HP:1'],
+    }
+    for model in (association_results, d2p_association_results):
+        # including the order of keys
+        assert json.dumps(get_marshaller(model)(results)) == json.dumps(marshal(results, model))
+    assert get_marshaller(association_results)({}) == marshal({}, association_results)
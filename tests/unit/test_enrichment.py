@@ -0,0 +1,51 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+from ontobio.assoc_factory import AssociationSetFactory
+from ontobio.ontol import Ontology
+
+from biolink.api.entityset.enrichment import EnrichmentIndex, benjamini_hochberg
+
+
+@pytest.fixture(scope='module')
+def aset():
+    rng = random.Random(0)
+    graph = nx.MultiDiGraph()
+    for i in range(1, 60):
+        graph.add_edge('GO:{}'.format(rng.randrange(max(1, i // 3))), 'GO:{}'.format(i), pred='subClassOf')
+    tuples = []
+    for g in range(300):
+        # the first 30 genes share GO:55
+        terms = rng.sample(range(60), 3) + ([55] if g < 30 else [])
+        tuples.extend(('NCBIGene:{}'.format(g), 'gene', 'GO:{}'.format(t)) for t in terms)
+    return AssociationSetFactory().create_from_tuples(tuples, ontology=Ontology(graph=graph))
+
+
+def test_matches_ontobio(aset):
+    index = EnrichmentIndex(aset)
+    subjects = ['NCBIGene:{}'.format(g) for g in range(40)] + ['NCBIGene:unknown']
+    background = ['NCBIGene:{}'.format(g) for g in range(0, 300, 2)]
+
+    for bg in (None, background):
+        expected = aset.enrichment_test(subjects=subjects, background=bg, threshold=0.05)
+        found = index.enrichment_test(subjects=subjects, background=bg, threshold=0.05)
+        assert len(expected) > 0
+        assert [r['c'] for r in found] == [r['c'] for r in expected]
+        assert [r['p'] for r in found] == pytest.approx([r['p'] for r in expected])
+
+
+def test_benjamini_hochberg(aset):
+    p = np.array([0.01, 0.04, 0.03, 0.2])
+    assert benjamini_hochberg(p) == pytest.approx([0.04, 0.16 / 3, 0.16 / 3, 0.2])
+
+    index = EnrichmentIndex(aset)
+    subjects = ['NCBIGene:{}'.format(g) for g in range(40)]
+    bonferroni = index.enrichment_test(subjects=subjects, threshold=0.05)
+    bh = index.enrichment_test(subjects=subjects, threshold=0.05, correction='bh')
+    assert {r['c'] for r in bonferroni} <= {r['c'] for r in bh}
+    # pruning untestable terms does not change the adjusted p-values
+    everything = {r['c']: r['p'] for r in index.enrichment_test(subjects=subjects, threshold=1.1, correction='bh')}
+    for r in bh:
+        assert r['p'] == pytest.approx(everything[r['c']])
@@ -0,0 +1,56 @@
+import pytest
+
+from biolink.datamodel.compiled import get_marshaller
+from biolink.datamodel.fieldsets import parse_fields, select_fields, trimmed_model, with_fieldset, M
+from biolink.datamodel.serializers import association_results
+from biolink.error_handlers import BadRequestException
+
+
+ASSOCIATION = {
+    'id': 'assoc1',
+    'subject': {'id': 'HGNC:1', 'label': 'gene', 'category': ['gene']},
+    'object': {'id': 'HP:1', 'label': 'phenotype'},
+    'evidence_graph': {'nodes': [], 'edges': []},
+    'publications': [{'id': 'PMID:1'}],
+}
+
+
+def test_parse_fields():
+    assert parse_fields('id, subject.id,subject.label,object') == {
+        'id': [], 'subject': ['id', 'label'], 'object': []
+    }
+    assert parse_fields('subject,subject.id') == {'subject': []}
+    with pytest.raises(BadRequestException):
+        parse_fields(' , ')
+
+
+def test_select_fields():
+    assert select_fields('subject.id,subject.label,relation') == [
+        M.ID, M.SUBJECT, M.SUBJECT_LABEL, M.RELATION, M.RELATION_LABEL
+    ]
+    assert M.EVIDENCE_GRAPH not in select_fields('id,subject,object')
+
+
+
+def test_compact_fields():
+    search = with_fieldset(lambda **kwargs: kwargs['select_fields'])
+
+    assert search(fields='id') == [M.ID]
+    selected = search(fields='id', use_compact_associations=True)
+    assert {M.ID, M.SUBJECT, M.SUBJECT_LABEL, M.RELATION, M.OBJECT} <= set(selected)
+    assert M.OBJECT_CLOSURE not in selected
+    assert M.OBJECT_CLOSURE in search(fields='id', use_compact_associations=True, slim=['GO:1'])
+
+
+def test_trimmed_model():
+    model = trimmed_model(association_results, 'id,subject.id,subject.label,publications')
+    assert trimmed_model(association_results, 'id,subject.id,subject.label,publications') is model
+
+    results = get_marshaller(model)({'numFound': 1, 'associations': [ASSOCIATION]})
+    assert results['numFound'] == 1
+    assert results['associations'] == [
+        {'id': 'assoc1', 'subject': {'id': 'HGNC:1', 'label': 'gene'}, 'publications': [{'id': 'PMID:1', 'label': None}]}
+    ]
+
+    with pytest.raises(BadRequestException):
+        trimmed_model(association_results, 'id,subject.foo,bar')
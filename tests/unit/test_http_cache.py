@@ -0,0 +1,77 @@
+import pytest
+from flask import Flask
+
+from biolink import http_cache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    release = {'token': 'r1'}
+    monkeypatch.setattr(http_cache, 'get_data_release', lambda wait=True: release['token'])
+    monkeypatch.setattr(http_cache, 'get_biolink_config', lambda: {'use_amigo_for': ['function'], 'http_cache': {
+        'namespaces': {'bioentity': 'public, max-age=86400', 'association': 'public, max-age=60', 'sim': None},
+        'routes': {'/bioentity/disease/<id>/treatment': None}
+    }})
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/api/bioentity/<id>')
+    def bioentity(id):
+        calls.append(id)
+        return {'id': id}
+
+    @app.route('/api/bioentity/disease/<id>/treatment')
+    def treatment(id):
+        return {}
+
+    @app.route('/api/association/find/<subject_category>/<object_category>')
+    def find(subject_category, object_category):
+        return {}
+
+    @app.route('/api/sim/search')
+    def sim():
+        return {}
+
+    @app.route('/api/ontol/subgraph/<ontology>/<node>')
+    def subgraph(ontology, node):
+        return {}
+
+    http_cache.init_app(app)
+    client = app.test_client()
+    client.calls = calls
+    client.release = release
+    return client
+
+
+def test_not_modified(client):
+    response = client.get('/api/bioentity/HP:1?rows=10&start=0')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'public, max-age=86400'
+
+    # argument order does not matter
+    response = client.get('/api/bioentity/HP:1?start=0&rows=10', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert client.calls == ['HP:1']
+
+    assert client.get('/api/bioentity/HP:2', headers={'If-None-Match': etag}).status_code == 200
+
+    client.release['token'] = 'r2'
+    response = client.get('/api/bioentity/HP:1?start=0&rows=10', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_uncached(client):
+    response = client.get('/api/sim/search')
+    assert 'ETag' not in response.headers
+    assert 'Cache-Control' not in response.headers
+
+    # not configured, configured off, or answered from AmiGO
+    for path in ['/api/ontol/subgraph/go/GO:1', '/api/bioentity/disease/MONDO:1/treatment',
+                 '/api/association/find/gene/function']:
+        assert 'ETag' not in client.get(path).headers
+    assert 'ETag' in client.get('/api/association/find/gene/phenotype').headers
+
+    client.release['token'] = http_cache.UNKNOWN_RELEASE
+    assert 'ETag' not in client.get('/api/bioentity/HP:1').headers
@@ -0,0 +1,85 @@
+import time
+
+from biolink import identifier_cache
+from biolink.identifier_cache import IdentifierCache
+from biolink.identifier_converter import MyGeneInfoIdentifierConverter
+
+
+def test_lookup_caches_positive_and_negative(tmp_path):
+    cache = IdentifierCache(path=str(tmp_path / 'ids.sqlite'))
+    calls = []
+
+    def fetch(ids):
+        calls.append(ids)
+        # HGNC:3 is not returned, as if its lookup had failed
+        return {'HGNC:1': ['UniProtKB:P1', 'UniProtKB:P2'], 'HGNC:2': []}
+
+    first = cache.lookup('gene_to_protein', ['HGNC:1', 'HGNC:2', 'HGNC:3', 'HGNC:1'], fetch)
+    second = cache.lookup('gene_to_protein', ['HGNC:1', 'HGNC:2', 'HGNC:3'], fetch)
+
+    assert first == {'HGNC:1': ['UniProtKB:P1', 'UniProtKB:P2'], 'HGNC:2': [], 'HGNC:3': []}
+    assert second == first
+    assert calls == [['HGNC:1', 'HGNC:2', 'HGNC:3'], ['HGNC:3']]
+    # persisted across instances
+    assert IdentifierCache(path=str(tmp_path / 'ids.sqlite')).get_many('gene_to_protein', ['HGNC:1']) == \
+        {'HGNC:1': ['UniProtKB:P1', 'UniProtKB:P2']}
+
+
+def test_expiry_and_eviction(monkeypatch, tmp_path):
+    monkeypatch.setattr(identifier_cache, 'ACCESS_RESOLUTION', 0)
+    cache = IdentifierCache(path=str(tmp_path / 'ids.sqlite'), max_entries=2, negative_ttl=-1)
+    cache.set_many('ns', {'a': ['1'], 'b': []})
+    assert cache.get_many('ns', ['a', 'b']) == {'a': ['1']}
+
+    cache.set_many('ns', {'c': ['3']})
+    time.sleep(0.01)
+    cache.set_many('ns', {'d': ['4']})
+    cache.get_many('ns', ['a'])
+    cache.evict()
+
+    assert len(cache) == 2
+    assert set(cache.get_many('ns', ['a', 'c', 'd'])) == {'a', 'd'}
+
+
+
+def test_recent_access_is_not_rewritten(tmp_path):
+    cache = IdentifierCache(path=str(tmp_path / 'ids.sqlite'))
+    cache.set_many('ns', {'a': ['1']})
+    accessed = "SELECT accessed FROM mappings WHERE id = 'a'"
+    written = cache._connection.execute(accessed).fetchone()[0]
+    changes = cache._connection.total_changes
+
+    cache.get_many('ns', ['a'])
+    assert cache._connection.total_changes == changes
+    assert cache._connection.execute(accessed).fetchone()[0] == written
+
+
+class FakeMyGene(object):
+    def __init__(self):
+        self.calls = []
+
+    def querymany(self, ids, scopes=None, fields=None, verbose=True):
+        self.calls.append((ids, scopes, fields))
+        hits = {
+            'entrezgene': {'1': {'uniprot': {'Swiss-Prot': 'P1'}}, '2': {'uniprot': {'TrEMBL': ['T1', 'T2']}}},
+            'uniprot': {'P1': {'HGNC': '5'}},
+        }[scopes]
+        return [dict(hits[id], query=id) if id in hits else {'query': id, 'notfound': True} for id in ids]
+
+
+def test_mygene_batches(monkeypatch, tmp_path):
+    monkeypatch.setattr(identifier_cache, 'cache', IdentifierCache(path=str(tmp_path / 'ids.sqlite')))
+    converter = MyGeneInfoIdentifierConverter.__new__(MyGeneInfoIdentifierConverter)
+    converter.mygene_client = FakeMyGene()
+
+    proteins = converter.convert_genes_to_proteins(['NCBIGene:1', 'NCBIGene:2', 'NCBIGene:3'])
+    genes = converter.convert_proteins_to_genes(['UniProtKB:P1', 'UniProtKB:P9'])
+
+    assert proteins == {
+        'NCBIGene:1': ['UniProtKB:P1'],
+        'NCBIGene:2': ['UniProtKB:T1', 'UniProtKB:T2'],
+        'NCBIGene:3': []
+    }
+    assert genes == {'UniProtKB:P1': ['HGNC:5'], 'UniProtKB:P9': []}
+    assert converter.convert_gene_to_protein('NCBIGene:2') == ['UniProtKB:T1', 'UniProtKB:T2']
+    assert [call[1] for call in converter.mygene_client.calls] == ['entrezgene', 'uniprot']
@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+
+import networkx as nx
+import pytest
+from ontobio.model.similarity import TypedNode
+from ontobio.ontol import Ontology
+from ontobio.sim.phenosim_engine import PhenoSimEngine
+from ontobio.vocabulary.similarity import SimAlgorithm
+
+from biolink.api.sim import compare
+from biolink.api.sim.endpoints import owlsim
+from biolink.api.sim.local_sim import LocalSimApi, Profile
+from biolink.ontology.closure_index import ClosureIndex
+
+
+def create_api():
+    graph = nx.MultiDiGraph()
+    for child, parent in [('HP:2', 'HP:1'), ('HP:3', 'HP:2'), ('HP:4', 'HP:2'), ('HP:5', 'HP:1'), ('HP:6', 'HP:5')]:
+        graph.add_edge(parent, child, pred='subClassOf')
+    ont = Ontology(graph=graph)
+    profiles = [
+        Profile('MONDO:1', 'disease 1', 'disease', 'NCBITaxon:9606', 'Homo sapiens', ['HP:3', 'HP:4']),
+        Profile('MONDO:2', 'disease 2', 'disease', 'NCBITaxon:9606', 'Homo sapiens', ['HP:6']),
+        Profile('MGI:1', 'gene 1', 'gene', 'NCBITaxon:10090', 'Mus musculus', ['HP:3', 'HP:404']),
+        Profile('MGI:2', 'gene 2', 'gene', 'NCBITaxon:10090', 'Mus musculus', ['HP:404']),
+    ]
+    return LocalSimApi(ClosureIndex(ont), ont, profiles)
+
+
+def ic(api, id):
+    return api.ic[api.index.index[id]]
+
+
+def test_information_content():
+    api = create_api()
+
+    # MGI:2 has no known phenotypes and is dropped
+    assert api.ids == ['MONDO:1', 'MONDO:2', 'MGI:1']
+    assert ic(api, 'HP:1') == 0
+    assert ic(api, 'HP:3') == pytest.approx(math.log2(3 / 2))
+    assert ic(api, 'HP:4') == pytest.approx(math.log2(3))
+    assert api.max_max_ic == pytest.approx(math.log2(3))
+
+
+def test_search_scores():
+    api = create_api()
+
+    jaccard = api.search(['HP:3'], [], method=SimAlgorithm.JACCARD)
+    assert [(m.id, m.score, m.rank) for m in jaccard.matches] == [
+        ('MGI:1', 1.0, 1), ('MONDO:1', 0.75, 2), ('MONDO:2', 0.2, 3)
+    ]
+
+    resnik = api.search(['HP:4', 'HP:6'], [], method=SimAlgorithm.RESNIK)
+    scores = {m.id: m.score for m in resnik.matches}
+    assert scores['MONDO:1'] == pytest.approx((ic(api, 'HP:4') + 0) / 2)
+    assert scores['MONDO:2'] == pytest.approx((0 + ic(api, 'HP:6')) / 2)
+
+    gic = api.search(['HP:3'], [], method=SimAlgorithm.SIM_GIC)
+    union = ic(api, 'HP:2') + ic(api, 'HP:3') + ic(api, 'HP:4')
+    assert {m.id: m.score for m in gic.matches}['MONDO:1'] == \
+        pytest.approx((ic(api, 'HP:2') + ic(api, 'HP:3')) / union)
+
+    phenodigm = api.search(['HP:4'], [], method=SimAlgorithm.PHENODIGM)
+    assert [(m.id, m.score) for m in phenodigm.matches] == [('MONDO:1', 100), ('MGI:1', pytest.approx(
+        100 * ic(api, 'HP:2') / ic(api, 'HP:4')))]
+    pairwise = phenodigm.matches[0].pairwise_match[0]
+    assert (pairwise.reference.id, pairwise.match.id, pairwise.lcs.id) == ('HP:4', 'HP:4', 'HP:4')
+
+
+def test_filtered_search_and_compare():
+    api = create_api()
+
+    result = api.filtered_search(['HP:3', 'HP:999'], [], 10, '10090', None, SimAlgorithm.PHENODIGM)
+    assert [m.id for m in result.matches] == ['MGI:1']
+    assert result.matches[0].taxon.id == 'NCBITaxon:10090'
+    assert result.query.unresolved_ids == ['HP:999']
+
+    compared = api.compare(['HP:3'], ['HP:4'], SimAlgorithm.JACCARD)
+    assert compared.matches[0].score == pytest.approx(2 / 4)
+    assert [node.id for node in compared.query.target_ids[0]] == ['HP:4']
+    assert compared.matches[0].pairwise_match[0].lcs.id == 'HP:2'
+
+
+def test_batch_compare(monkeypatch):
+    api = create_api()
+    monkeypatch.setattr(compare, 'typed_node_from_id', lambda id: TypedNode(id=id, label=id.lower(), type='phenotype'))
+    profiles = [['HP:6'], ['HP:3', 'HP:4'], ['HP:4'], ['HP:5']]
+
+    result = compare.compare(PhenoSimEngine(api), ['HP:4'], profiles, SimAlgorithm.JACCARD)
+
+    assert [(m.id, m.rank) for m in result.matches] == [
+        ('HP:4', 1), ('HP:3 + HP:4', 2), ('HP:5', 3), ('HP:6', 4)
+    ]
+    assert result.matches[0].label == 'hp:4'
+    assert [[node.id for node in ids] for ids in result.query.target_ids] == [
+        ['HP:4'], ['HP:3', 'HP:4'], ['HP:5'], ['HP:6']
+    ]
+    assert result.query.reference.id == 'HP:4'
+    for match, profile in zip(result.matches, [['HP:4'], ['HP:3', 'HP:4'], ['HP:5'], ['HP:6']]):
+        assert match.score == api.compare(['HP:4'], profile, SimAlgorithm.JACCARD).matches[0].score
+
+
+def test_engine_created_once(monkeypatch):
+    monkeypatch.setattr(owlsim, 'sim_engine', None)
+    monkeypatch.setattr(owlsim, 'get_biolink_config', lambda: {'sim': {'engine': 'local'}})
+    created = []
+
+    def from_config():
+        created.append(1)
+        time.sleep(0.05)
+        return create_api()
+    monkeypatch.setattr(LocalSimApi, 'from_config', staticmethod(from_config))
+
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(owlsim.get_sim_engine())) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert created == [1]
+    assert engines == [engines[0]] * 3
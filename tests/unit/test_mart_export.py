@@ -0,0 +1,66 @@
+import json
+
+from biolink.api.mart.export import export
+
+DOCS = [
+    {'id': '1', 'subject': 'HGNC:1', 'subject_label': 'A', 'relation': 'RO:1', 'object': 'HP:1'},
+    {'id': '2', 'subject': 'HGNC:1', 'subject_label': 'A', 'relation': 'RO:1', 'object': 'HP:2'},
+    {'id': '3', 'subject': 'HGNC:1', 'subject_label': 'A', 'relation': 'RO:1', 'object': 'HP:3'},
+    {'id': '4', 'subject': 'HGNC:2', 'subject_label': 'B', 'relation': 'RO:1', 'object': 'HP:1'},
+    {'id': '5', 'subject': 'HGNC:3', 'subject_label': 'C', 'relation': 'RO:2', 'object': 'HP:4'},
+]
+
+
+class FakeResults(object):
+    def __init__(self, docs, next_cursor):
+        self.docs = docs
+        self.nextCursorMark = next_cursor
+
+
+class FakeSolr(object):
+    """
+    Pages through DOCS, with the offset as the cursor
+    """
+    def __init__(self):
+        self.requests = []
+
+    def search(self, cursorMark, rows, sort, **params):
+        self.requests.append(cursorMark)
+        start = 0 if cursorMark == '*' else int(cursorMark)
+        docs = [dict(d) for d in DOCS[start:start + rows]]
+        return FakeResults(docs, str(start + len(docs)))
+
+
+def run_export(solr, **kwargs):
+    return ''.join(export(subject_category='gene', object_category='phenotype',
+                          solr=solr, page_size=2, **kwargs))
+
+
+def test_json_groups_span_pages():
+    solr = FakeSolr()
+    associations = json.loads(run_export(solr))
+
+    assert [(a['subject'], sorted(a['objects'])) for a in associations] == [
+        ('HGNC:1', ['HP:1', 'HP:2', 'HP:3']),
+        ('HGNC:2', ['HP:1']),
+        ('HGNC:3', ['HP:4'])
+    ]
+    assert solr.requests == ['*', '2', '4', '5']
+
+
+def test_ndjson_resumes_from_cursor():
+    lines = [json.loads(line) for line in run_export(FakeSolr(), format='ndjson').splitlines()]
+    cursors = [line['cursor'] for line in lines if 'cursor' in line]
+    assert cursors == ['2', '4', '5', '5']
+    assert len([line for line in lines if 'cursor' not in line]) == 5
+
+    resumed = [json.loads(line) for line in run_export(FakeSolr(), format='ndjson', cursor='4').splitlines()]
+    assert [line['object'] for line in resumed if 'cursor' not in line] == ['HP:4']
+
+
+def test_tsv():
+    rows = run_export(FakeSolr(), format='tsv').splitlines()
+
+    assert rows[0] == 'subject\tsubject_label\trelation\tobject'
+    assert rows[1].startswith('HGNC:1\tA\tRO:1\tHP:')
+    assert rows[3] == '#cursor\t2'
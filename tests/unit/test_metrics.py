@@ -0,0 +1,67 @@
+import pytest
+from flask import Flask
+from prometheus_client import REGISTRY
+
+from biolink import metrics
+
+
+@pytest.fixture(autouse=True)
+def services(monkeypatch):
+    monkeypatch.setattr(metrics, 'service_urls', None)
+    monkeypatch.setattr(metrics, 'get_biolink_config', lambda: {
+        'solr_assocs': {'url': 'https://solr.example.org/solr/golr', 'timeout': 60},
+        'solr_search': {'url': 'https://solr.example.org/solr/search', 'timeout': 15},
+        'use_amigo_for': ['function']
+    })
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_upstream_for_url():
+    assert metrics.upstream_for_url('https://solr.example.org/solr/golr/select?q=*:*') == 'solr_assocs'
+    assert metrics.upstream_for_url('https://solr.example.org/solr/search/select') == 'solr_search'
+    assert metrics.upstream_for_url('https://mygene.info/v3/query') == 'mygene.info'
+
+
+def test_instrumented_records_route_and_errors():
+    app = Flask(__name__)
+
+    @metrics.instrumented('sparql')
+    def query(fail=False):
+        if fail:
+            raise ValueError('bad query')
+        return 'ok'
+
+    @app.route('/ontol/<id>')
+    def route(id):
+        query()
+        with pytest.raises(ValueError):
+            query(fail=True)
+        return 'done'
+
+    labels = {'upstream': 'sparql', 'route': '/ontol/<id>'}
+    calls = sample('biolink_upstream_request_seconds_count', **labels)
+    errors = sample('biolink_upstream_errors_total', error='ValueError', **labels)
+
+    app.test_client().get('/ontol/GO:1')
+
+    assert sample('biolink_upstream_request_seconds_count', **labels) == calls + 2
+    assert sample('biolink_upstream_errors_total', error='ValueError', **labels) == errors + 1
+
+
+def test_metrics_endpoint():
+    app = Flask(__name__)
+    metrics.init_app(app)
+
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+    client = app.test_client()
+    client.get('/ping')
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert b'biolink_request_seconds_count{method="GET",route="/ping",status="200"}' in response.data
@@ -0,0 +1,61 @@
+import pytest
+import ontobio.golr.golr_query
+
+from biolink.error_handlers import BadRequestException
+from biolink.pagination import CursorAssociationQuery, search_associations_after, stable_sort, with_cursor
+
+
+class Results(object):
+    def __init__(self, docs, next_cursor):
+        self.docs = docs
+        self.hits = 3
+        self.facets = {}
+        self.raw_response = {}
+        self.nextCursorMark = next_cursor
+
+
+class Solr(object):
+    """
+    Pages of one document, the cursor being the index of the next
+    """
+    def __init__(self):
+        self.calls = []
+
+    def search(self, **params):
+        self.calls.append(params)
+        i = 0 if params['cursorMark'] == '*' else int(params['cursorMark'])
+        docs = [{'id': 'assoc{}'.format(i), 'subject': 'X:1', 'object': 'X:{}'.format(i)}][:3 - i]
+        return Results(docs, str(min(i + 1, 3)))
+
+
+def test_stable_sort():
+    assert stable_sort() == 'score desc,id asc'
+    assert stable_sort('source_count desc') == 'source_count desc,id asc'
+    assert stable_sort('id desc') == 'id desc'
+
+
+def test_solr_params():
+    params = CursorAssociationQuery(cursor='abc', subject='HGNC:1', start=20, solr=Solr()).solr_params()
+    assert 'start' not in params
+    assert params['cursorMark'] == 'abc'
+    assert params['sort'].endswith(',id asc')
+
+
+def test_pages(monkeypatch):
+    monkeypatch.setattr(ontobio.golr.golr_query, 'get_curie_map', lambda url: {})
+    solr = Solr()
+    cursor = '*'
+    ids = []
+    while cursor is not None:
+        results = search_associations_after(cursor, subject_category='gene', rows=1, facet=False, solr=solr)
+        ids += [a['id'] for a in results['associations']]
+        cursor = results['next_cursor']
+    assert ids == ['assoc0', 'assoc1', 'assoc2']
+    assert 'raw' not in results
+
+
+def test_with_cursor():
+    search = with_cursor(lambda **kwargs: kwargs)
+    assert search(subject='HGNC:1', start=10) == {'subject': 'HGNC:1', 'start': 10}
+    with pytest.raises(BadRequestException):
+        search(subject='HGNC:1', start=10, cursor='*')
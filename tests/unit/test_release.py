@@ -0,0 +1,91 @@
+import threading
+import time
+import types
+
+import pytest
+
+from biolink import release
+
+
+class SciGraph(object):
+    """
+    get_datasets blocks until gate is set
+    """
+    def __init__(self):
+        self.calls = 0
+        self.datasets = [{'version': 1}]
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def get_datasets(self):
+        self.calls += 1
+        self.gate.wait(5)
+        return self.datasets
+
+
+@pytest.fixture
+def scigraph(monkeypatch):
+    scigraph = SciGraph()
+    monkeypatch.setattr(release, 'get_scigraph', lambda service: scigraph)
+    monkeypatch.setattr(release, 'data_release', None)
+    monkeypatch.setattr(release, 'checked_at', 0)
+    monkeypatch.setattr(release, 'refreshing', False)
+
+    scigraph.now = 1000.0
+    monkeypatch.setattr(release, 'time', types.SimpleNamespace(time=lambda: scigraph.now))
+
+    # background refreshes set refreshed when done
+    scigraph.refreshed = threading.Event()
+    refresh = release.refresh_data_release
+
+    def refresh_data_release():
+        refresh()
+        scigraph.refreshed.set()
+    monkeypatch.setattr(release, 'refresh_data_release', refresh_data_release)
+    return scigraph
+
+
+def test_data_release(monkeypatch, scigraph):
+    monkeypatch.setattr(release, 'get_biolink_config', lambda: {'data_release_check_interval': 10})
+
+    # concurrent first checks share one request
+    scigraph.gate.clear()
+    coalesced = release.first_check.coalesced
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(release.get_data_release())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        if release.first_check.coalesced - coalesced == 4:
+            break
+        time.sleep(0.01)
+    scigraph.gate.set()
+    for thread in threads:
+        thread.join()
+    assert scigraph.calls == 1
+    first = tokens[0]
+    assert tokens == [first] * 5
+
+    # stale tokens are served while refreshed in the background
+    scigraph.datasets = [{'version': 2}]
+    scigraph.refreshed.clear()
+    scigraph.gate.clear()
+    scigraph.now += 11
+    assert release.get_data_release() == first
+    assert release.get_data_release() == first
+    scigraph.gate.set()
+    assert scigraph.refreshed.wait(5)
+    assert release.get_data_release() != first
+    assert scigraph.calls == 2
+
+
+def test_data_release_without_waiting(monkeypatch, scigraph):
+    monkeypatch.setattr(release, 'get_biolink_config', lambda: {})
+    scigraph.refreshed.clear()
+    scigraph.gate.clear()
+
+    assert release.get_data_release(wait=False) == release.UNKNOWN_RELEASE
+    scigraph.gate.set()
+    assert scigraph.refreshed.wait(5)
+    assert release.get_data_release(wait=False) not in (None, release.UNKNOWN_RELEASE)
+    assert scigraph.calls == 1
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from requests import Request
+
+from biolink import resilience
+from biolink.error_handlers import UpstreamUnavailableException
+from biolink.resilience import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class Response(object):
+    def __init__(self, status_code=200, url=None):
+        self.status_code = status_code
+        self.url = url
+
+
+def test_breaker_opens_and_probes():
+    breaker = CircuitBreaker('solr', failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(UpstreamUnavailableException):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # one probe at a time
+    with pytest.raises(UpstreamUnavailableException):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+
+def test_aborted_probe_is_released(monkeypatch):
+    breaker = CircuitBreaker('killed', failure_threshold=1, reset_timeout=0.05)
+    monkeypatch.setitem(resilience.breakers, 'killed', breaker)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    with pytest.raises(KeyboardInterrupt):
+        with resilience.guard('killed'):
+            raise KeyboardInterrupt()
+    assert breaker.state == HALF_OPEN
+    with resilience.guard('killed'):
+        pass
+    assert breaker.state == CLOSED
+
+
+def test_lost_probe_times_out():
+    breaker = CircuitBreaker('hung', failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    with pytest.raises(UpstreamUnavailableException):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_results_from_before_opening_are_ignored():
+    breaker = CircuitBreaker('slow', failure_threshold=1, reset_timeout=0.05)
+    admitted = breaker.before_call()
+    breaker.record_failure(breaker.before_call())
+    assert breaker.state == OPEN
+
+    breaker.record_success(1.0, admitted)
+    assert breaker.state == OPEN
+    time.sleep(0.06)
+    probe = breaker.before_call()
+    breaker.record_failure(admitted)
+    assert breaker.state == HALF_OPEN
+    breaker.record_success(1.0, probe)
+    assert breaker.state == CLOSED
+
+
+def test_send_hedges_slow_requests(monkeypatch):
+    breaker = CircuitBreaker('slow', hedge_min_delay=0.01)
+    breaker.latencies.extend([0.01] * resilience.MIN_SAMPLES)
+    monkeypatch.setitem(resilience.breakers, 'slow', breaker)
+    monkeypatch.setattr(resilience, 'get_resilience_config',
+                        lambda upstream: dict(resilience.DEFAULTS, hedge_url='http://replica/solr'))
+
+    def send_request(request):
+        if request.url.startswith('http://primary'):
+            time.sleep(0.5)
+        return Response(url=request.url)
+
+    request = Request('GET', 'http://primary/solr/select?q=x').prepare()
+    response = resilience.send('slow', request, send_request, prefix='http://primary/solr')
+    assert response.url == 'http://replica/solr/select?q=x'
+
+    # not idempotent
+    request = Request('POST', 'http://primary/solr/select', data={'q': 'x'}).prepare()
+    assert resilience.send('slow', request, send_request, prefix='http://primary/solr').url.startswith('http://primary')
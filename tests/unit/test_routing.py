@@ -0,0 +1,52 @@
+from flask import Flask, Blueprint
+from flask_restplus import Api, Resource
+
+from biolink import routing
+
+
+class Greeting(Resource):
+    def get(self, name):
+        """
+        Greet someone
+        """
+        return {'greeting': 'hello {}'.format(name)}
+
+
+def create_app(lazy):
+    app = Flask(__name__)
+    blueprint = Blueprint('api', __name__, url_prefix='/api')
+    api = Api()
+    api.init_app(blueprint)
+    mapping = {'namespace': [{
+        'name': 'greeting',
+        'description': 'Greetings',
+        'routes': [{'route': '/<name>', 'resource': '{}.Greeting'.format(__name__)}]
+    }]}
+    routing.register_routes(api, mapping, lazy=lazy)
+    app.register_blueprint(blueprint)
+    return app, api
+
+
+def test_lazy_resource_loads_on_first_request():
+    app, api = create_app(lazy=True)
+    proxy = api.namespaces[-1].resources[0].resource
+
+    assert proxy is not Greeting
+    assert proxy.__name__ == 'Greeting'
+    assert proxy.resource_class is None
+
+    client = app.test_client()
+    response = client.get('/api/greeting/world')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'greeting': 'hello world'}
+    assert proxy.resource_class is Greeting
+    assert api.namespaces[-1].resources[0].resource is Greeting
+    assert client.post('/api/greeting/world').status_code == 405
+
+
+def test_lazy_and_eager_endpoints_match():
+    lazy_app, _ = create_app(lazy=True)
+    eager_app, _ = create_app(lazy=False)
+
+    assert sorted(lazy_app.view_functions) == sorted(eager_app.view_functions)
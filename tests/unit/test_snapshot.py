@@ -0,0 +1,100 @@
+import threading
+import time
+
+import networkx as nx
+import pytest
+from ontobio.ontol import Ontology
+
+from biolink.ontology import ontology_manager, snapshot
+from biolink.ontology.closure_index import ClosureIndex
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    config = {
+        'ontology_snapshots': {'enabled': True, 'path': str(tmp_path)},
+        'ontologies': [{'id': 'hp', 'handle': 'hp', 'version': '1'}]
+    }
+    monkeypatch.setattr(snapshot, 'get_biolink_config', lambda: config)
+    return config
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    builds = []
+
+    def build(handle):
+        graph = nx.MultiDiGraph()
+        graph.add_edge('HP:1', 'HP:2', pred='subClassOf')
+        graph.add_edge('HP:2', 'HP:3', pred='subClassOf')
+        ont = Ontology(handle=handle, graph=graph)
+        builds.append(handle)
+        return ont, ClosureIndex(ont)
+
+    monkeypatch.setattr(snapshot, 'build', build)
+    return builds
+
+
+def test_snapshot_is_reused(config, builds):
+    snapshot.load_ontology('hp')
+    ont, index = snapshot.load_ontology('hp')
+
+    assert builds == ['hp']
+    assert sorted(ont.nodes()) == ['HP:1', 'HP:2', 'HP:3']
+    assert sorted(index.ancestors('HP:3')) == ['HP:1', 'HP:2']
+    assert sorted(index.descendants('HP:1', relations=['subClassOf'])) == ['HP:2', 'HP:3']
+
+
+def test_snapshot_rebuilt_when_source_changes(config, builds):
+    snapshot.load_ontology('hp')
+    config['ontologies'][0]['version'] = '2'
+    snapshot.load_ontology('hp')
+
+    assert builds == ['hp', 'hp']
+    assert snapshot.has_current_snapshot('hp')
+
+
+def test_snapshot_expires_without_source_version(config, builds):
+    config['ontologies'][0].pop('version')
+    config['ontology_snapshots']['max_age'] = 0
+    snapshot.load_ontology('hp')
+    snapshot.load_ontology('hp')
+
+    assert builds == ['hp', 'hp']
+
+
+def test_lock_is_polled(config, monkeypatch):
+    monkeypatch.setattr(snapshot, 'LOCK_POLL_INTERVAL', 0.01)
+    events = []
+
+    def hold():
+        with snapshot.snapshot_lock('hp'):
+            events.append('first')
+            time.sleep(0.05)
+        events.append('released')
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    time.sleep(0.01)
+    with snapshot.snapshot_lock('hp'):
+        events.append('second')
+    thread.join()
+
+    assert events == ['first', 'released', 'second']
+
+
+def test_one_load_per_process(config, builds, monkeypatch):
+    monkeypatch.setattr(ontology_manager, 'cfg', config)
+    monkeypatch.setattr(ontology_manager, 'omap', {})
+    monkeypatch.setattr(ontology_manager, 'imap', {})
+    config['ontology_snapshots']['enabled'] = False
+    build = snapshot.build
+    monkeypatch.setattr(snapshot, 'build', lambda handle: time.sleep(0.05) or build(handle))
+    threads = [threading.Thread(target=ontology_manager.get_ontology, args=('hp',)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builds == ['hp']
+    assert 'hp' in ontology_manager.imap
@@ -0,0 +1,48 @@
+import pytest
+
+from biolink import transport
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(transport, 'sessions', {})
+    monkeypatch.setattr(transport, 'solr_clients', {})
+    monkeypatch.setattr(transport, 'scigraph_clients', {})
+    monkeypatch.setattr(transport, 'get_biolink_config', lambda: {
+        'scigraph_data': {'url': 'https://scigraph-data.example.org/scigraph/', 'timeout': 15},
+        'transport': {
+            'pool_maxsize': 10,
+            'hosts': {'solr.example.org': {'pool_maxsize': 50, 'retries': 0, 'retry_methods': ['GET', 'POST']}}
+        }
+    })
+
+
+def test_session_per_host():
+    a = transport.get_session('https://solr.example.org/solr/golr/select')
+    b = transport.get_session('https://solr.example.org/solr/search')
+    c = transport.get_session('https://scigraph-data.example.org/scigraph/graph')
+
+    assert a is b
+    assert a is not c
+
+
+def test_per_host_pool_config():
+    solr = transport.get_session('https://solr.example.org/solr/golr').get_adapter('https://solr.example.org')
+    other = transport.get_session('https://other.example.org').get_adapter('https://other.example.org')
+
+    assert solr._pool_maxsize == 50
+    assert solr.max_retries.total == 0
+    assert other._pool_maxsize == 10
+    assert other.max_retries.total == transport.DEFAULTS['retries']
+    assert solr.max_retries.allowed_methods == {'GET', 'POST'}
+    assert other.max_retries.allowed_methods == {'GET', 'HEAD'}
+
+
+def test_clients_share_sessions():
+    solr = transport.get_solr('https://solr.example.org/solr/golr', timeout=60)
+    scigraph = transport.get_scigraph('scigraph_data')
+
+    assert solr is transport.get_solr('https://solr.example.org/solr/golr', timeout=60)
+    assert solr.get_session() is transport.get_session('https://solr.example.org/')
+    assert scigraph is transport.get_scigraph('scigraph_data')
+    assert scigraph.timeout == 15
@@ -1,4 +1,13 @@
-from biolink.app import app
+from biolink.app import app, preload_ontologies
+from biolink.api.entityset.association_sets import warm_up
+
+# each gunicorn worker imports this module; ontologies with pre_load set
+# are loaded here, from their snapshots when ontology_snapshots is enabled
+preload_ontologies()
+
+# association sets listed under association_sets.warm_up (none by default) are
+# built on a background thread
+warm_up()
 
 if __name__ == "__main__":
     app.run()